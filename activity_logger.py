@@ -0,0 +1,391 @@
+# activity_logger.py — Batched async logger untuk admin_monitoring.db
+"""
+log_user_activity / log_admin_activity dulu membuka koneksi sqlite3 baru dan
+commit untuk setiap event — termasuk event berisik seperti VIEW_USERS di tiap
+auto-refresh. Sekarang event hanya dimasukkan ke antrean in-memory; satu
+writer thread menulisnya dalam satu transaksi setiap FLUSH_MS atau setiap
+BATCH_SIZE event, mana yang lebih dulu.
+
+Filter sebelum masuk antrean:
+- level: setiap action punya level (ACTION_LEVELS, default INFO; success=False
+  -> WARNING). Event di bawah LEVEL tidak dicatat.
+- sampling: SAMPLE_<ACTION>=0.1 berarti hanya ~10% event action itu dicatat.
+
+Semua diatur di section [monitoring] config.ini (lihat config.ini.example).
+
+Schema monitoring di-versi lewat PRAGMA user_version (MONITORING_MIGRATIONS).
+Setiap event user_activities diberi category (CATEGORY_RULES) dan trigger
+SQLite menjaga rollup per jam/per hari (activity_hourly, activity_daily),
+jadi statistik dashboard membaca agregat, bukan scan log mentah.
+
+    logger = get_activity_logger()
+    logger.log_user("budi", "LOGIN_SUCCESS", "Logged in with role: user")
+    logger.log_admin("admin", "VIEW_USERS", "Viewed user list")
+
+Jika FLEET aktif, event yang lolos filter juga dikirim ke Postgres
+(activity_shipper) supaya dashboard admin melihat aktivitas semua client.
+"""
+
+import atexit
+import queue
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import app_db
+from activity_shipper import get_activity_shipper
+
+MONITORING_DB = "admin_monitoring.db"
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+# Level default per action; action lain INFO (atau WARNING jika gagal)
+# Hanya aksi UI yang berisik diturunkan ke DEBUG. Aksi audit admin (copy data,
+# clear logs, ubah konfigurasi) tetap INFO supaya selalu tercatat.
+ACTION_LEVELS: Dict[str, int] = {
+    "VIEW_USERS": DEBUG,
+    "REGISTER_DIALOG_OPENED": DEBUG,
+    "MANUAL_REFRESH": DEBUG,
+}
+
+# (category, substring action) — urutan penting, rule pertama yang cocok dipakai
+CATEGORY_RULES = (
+    ("LOGIN", "LOGIN"),
+    ("LOGOUT", "LOGOUT"),
+    ("REGISTRATION", "REGISTER"),
+    ("DASHBOARD", "DASHBOARD"),
+)
+CATEGORY_OTHER = "OTHER"
+
+_FLUSH = object()  # marker di antrean: minta writer commit sekarang
+
+
+def categorize(action: str) -> str:
+    """Category untuk satu action (sama dengan _category_sql untuk data lama)."""
+    action = (action or "").upper()
+    for category, needle in CATEGORY_RULES:
+        if needle in action:
+            return category
+    return CATEGORY_OTHER
+
+
+def _category_sql(column: str = "action") -> str:
+    whens = " ".join(f"WHEN UPPER({column}) LIKE '%{needle}%' THEN '{category}'"
+                     for category, needle in CATEGORY_RULES)
+    return f"CASE {whens} ELSE '{CATEGORY_OTHER}' END"
+
+
+# ---------- Schema (PRAGMA user_version) ----------
+def _mon001_base_tables(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_activities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            username TEXT,
+            action TEXT,
+            details TEXT,
+            ip_address TEXT DEFAULT 'localhost',
+            success BOOLEAN DEFAULT 1
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS login_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            login_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            logout_time DATETIME,
+            session_duration INTEGER,
+            role TEXT,
+            ip_address TEXT DEFAULT 'localhost'
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS admin_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            admin_username TEXT,
+            action TEXT,
+            target_user TEXT,
+            details TEXT
+        )
+    """)
+
+
+def _mon002_categories_and_rollups(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(user_activities)")}
+    if "category" not in columns:
+        conn.execute("ALTER TABLE user_activities ADD COLUMN category TEXT")
+    conn.execute(f"UPDATE user_activities SET category = {_category_sql()} WHERE category IS NULL")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_activities_category_ts
+        ON user_activities(category, timestamp)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_activities_username_ts
+        ON user_activities(username, timestamp)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_actions_ts ON admin_actions(timestamp)")
+
+    # Rollup per (periode, category, username); username '' untuk event tanpa user
+    for table, bucket in (("activity_hourly", "bucket"), ("activity_daily", "day")):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {bucket}  TEXT NOT NULL,
+                category  TEXT NOT NULL,
+                username  TEXT NOT NULL,
+                events    INTEGER NOT NULL DEFAULT 0,
+                failures  INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({bucket}, category, username)
+            )
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_daily_category ON activity_daily(category, day)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_hourly_category ON activity_hourly(category, bucket)")
+
+    # Dijaga incremental di transaksi insert yang sama (batch writer)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_user_activities_rollup
+        AFTER INSERT ON user_activities
+        BEGIN
+            INSERT INTO activity_hourly (bucket, category, username, events, failures)
+            VALUES (strftime('%Y-%m-%d %H:00:00', NEW.timestamp), COALESCE(NEW.category, 'OTHER'),
+                    COALESCE(NEW.username, ''), 1, COALESCE(NEW.success, 1) = 0)
+            ON CONFLICT (bucket, category, username) DO UPDATE
+            SET events = events + 1, failures = failures + excluded.failures;
+
+            INSERT INTO activity_daily (day, category, username, events, failures)
+            VALUES (date(NEW.timestamp), COALESCE(NEW.category, 'OTHER'),
+                    COALESCE(NEW.username, ''), 1, COALESCE(NEW.success, 1) = 0)
+            ON CONFLICT (day, category, username) DO UPDATE
+            SET events = events + 1, failures = failures + excluded.failures;
+        END
+    """)
+
+    # Backfill dari log yang sudah ada (sekali, saat migrasi)
+    for table, bucket, expr in (("activity_hourly", "bucket", "strftime('%Y-%m-%d %H:00:00', timestamp)"),
+                                ("activity_daily", "day", "date(timestamp)")):
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} ({bucket}, category, username, events, failures)
+            SELECT {expr}, category, COALESCE(username, ''),
+                   COUNT(*), SUM(COALESCE(success, 1) = 0)
+            FROM user_activities
+            WHERE timestamp IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+
+
+def _mon003_retention(conn: sqlite3.Connection) -> None:
+    # Pemangkasan per umur (monitoring_retention) butuh index timestamp murni
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_activities_ts ON user_activities(timestamp)")
+    # Agregat admin_actions yang sudah dipangkas (baris mentah yang tersisa tidak ikut)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS admin_actions_rollup (
+            day             TEXT NOT NULL,
+            admin_username  TEXT NOT NULL,
+            action          TEXT NOT NULL,
+            events          INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, admin_username, action)
+        )
+    """)
+
+
+# (versi, fn(conn)) — urut, jangan diubah setelah rilis
+MONITORING_MIGRATIONS = (
+    (1, _mon001_base_tables),
+    (2, _mon002_categories_and_rollups),
+    (3, _mon003_retention),
+)
+MONITORING_SCHEMA_VERSION = MONITORING_MIGRATIONS[-1][0]
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Bawa admin_monitoring.db ke versi terbaru. Cepat (satu PRAGMA) jika sudah terbaru."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= MONITORING_SCHEMA_VERSION:
+        return
+    if version == 0 and conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None:
+        # DB baru: auto_vacuum hanya bisa diaktifkan sebelum tabel pertama dibuat
+        # (DB lama butuh VACUUM penuh, lihat monitoring_retention)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL;")
+    for number, migrate in MONITORING_MIGRATIONS:
+        if number <= version:
+            continue
+        # BEGIN IMMEDIATE: proses lain menunggu, lalu melihat user_version baru
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < number:
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _load_monitoring_settings() -> dict:
+    """
+    [monitoring] di config.ini: LEVEL, FLUSH_MS, BATCH_SIZE, MAX_QUEUE, SAMPLE_<ACTION>,
+    retensi: RETENTION_DAYS, PRUNE_BATCH, VACUUM_PAGES, dan log fleet (activity_shipper):
+    FLEET, SHIP_MS, SHIP_BATCH, SHIP_MAX_BUFFER.
+    """
+    settings = {"level": INFO, "flush_ms": 500, "batch_size": 200,
+                "max_queue": 10000, "sample": {},
+                "retention_days": 90, "prune_batch": 5000, "vacuum_pages": 2000,
+                "fleet": True, "ship_ms": 1000, "ship_batch": 2000, "ship_max_buffer": 50000}
+    cfg = app_db._read_config()
+    if cfg is not None and "monitoring" in cfg:
+        sec = cfg["monitoring"]
+        try:
+            level = sec.get("LEVEL", "INFO").strip().upper()
+            settings["level"] = LEVEL_NAMES.get(level, INFO)
+            settings["flush_ms"] = sec.getint("FLUSH_MS", settings["flush_ms"])
+            settings["batch_size"] = sec.getint("BATCH_SIZE", settings["batch_size"])
+            settings["max_queue"] = sec.getint("MAX_QUEUE", settings["max_queue"])
+            settings["retention_days"] = sec.getint("RETENTION_DAYS", settings["retention_days"])
+            settings["prune_batch"] = sec.getint("PRUNE_BATCH", settings["prune_batch"])
+            settings["vacuum_pages"] = sec.getint("VACUUM_PAGES", settings["vacuum_pages"])
+            settings["fleet"] = sec.getboolean("FLEET", settings["fleet"])
+            settings["ship_ms"] = sec.getint("SHIP_MS", settings["ship_ms"])
+            settings["ship_batch"] = sec.getint("SHIP_BATCH", settings["ship_batch"])
+            settings["ship_max_buffer"] = sec.getint("SHIP_MAX_BUFFER", settings["ship_max_buffer"])
+            for key in sec:
+                if key.upper().startswith("SAMPLE_"):
+                    settings["sample"][key[7:].upper()] = sec.getfloat(key)
+        except ValueError as e:
+            print(f"⚠️ Invalid [monitoring] setting in config.ini: {e}")
+    return settings
+
+
+def _now() -> str:
+    # Format sama dengan CURRENT_TIMESTAMP SQLite (UTC), diambil saat event terjadi
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ActivityLogger:
+    """Queue + single writer thread that batches monitoring inserts."""
+
+    def __init__(self, path: str = MONITORING_DB, settings: Optional[dict] = None):
+        self.path = path
+        self.settings = settings or _load_monitoring_settings()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.settings["max_queue"])
+        self.dropped = 0  # antrean penuh (disk sangat lambat)
+        self.written = 0
+        # Salinan event ke Postgres untuk dashboard fleet-wide (None = nonaktif)
+        self.shipper = get_activity_shipper(self.settings)
+        self._thread = threading.Thread(target=self._run, name="activity-logger", daemon=True)
+        self._thread.start()
+
+    # ---------- producer side (thread mana saja, tidak pernah blocking) ----------
+    def enabled_for(self, action: str, success: bool = True) -> bool:
+        """Level filter + sampling untuk satu event."""
+        level = ACTION_LEVELS.get(action, INFO)
+        if not success:
+            level = max(level, WARNING)
+        if level < self.settings["level"]:
+            return False
+        rate = self.settings["sample"].get(action.upper())
+        return rate is None or random.random() < rate
+
+    def _put(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def log_user(self, username: str, action: str, details: str = "", success: bool = True) -> bool:
+        """Returns False jika event difilter (level/sampling)."""
+        if not self.enabled_for(action, success):
+            return False
+        now, category = _now(), categorize(action)
+        self._put(("user", (now, username, action, details, bool(success), category)))
+        if self.shipper:
+            self.shipper.submit(now, "user", username, action, category, details, "", success)
+        return True
+
+    def log_admin(self, admin_username: str, action: str, details: str = "",
+                  target_user: str = "") -> bool:
+        if not self.enabled_for(action):
+            return False
+        now = _now()
+        self._put(("admin", (now, admin_username, action, target_user, details)))
+        if self.shipper:
+            self.shipper.submit(now, "admin", admin_username, action, categorize(action),
+                                details, target_user)
+        return True
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Tunggu sampai semua event sebelum panggilan ini sudah di-commit."""
+        done = threading.Event()
+        self._put((_FLUSH, done))
+        return done.wait(timeout)
+
+    # ---------- writer thread ----------
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        try:
+            ensure_schema(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️ Monitoring DB setup failed: {e}")
+
+        interval = self.settings["flush_ms"] / 1000.0
+        batch_size = self.settings["batch_size"]
+        while True:
+            kind, payload = self._queue.get()  # tunggu event pertama
+            users, admins, waiters = [], [], []
+            deadline = time.monotonic() + interval
+            while True:
+                if kind is _FLUSH:
+                    waiters.append(payload)
+                    break  # commit sekarang
+                (users if kind == "user" else admins).append(payload)
+                if len(users) + len(admins) >= batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    kind, payload = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._write(conn, users, admins)
+            for done in waiters:
+                done.set()
+
+    def _write(self, conn: sqlite3.Connection, users: list, admins: list) -> None:
+        if not users and not admins:
+            return
+        try:
+            with conn:
+                if users:
+                    conn.executemany("""
+                        INSERT INTO user_activities (timestamp, username, action, details, success, category)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, users)
+                if admins:
+                    conn.executemany("""
+                        INSERT INTO admin_actions (timestamp, admin_username, action, target_user, details)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, admins)
+            self.written += len(users) + len(admins)
+        except sqlite3.Error as e:
+            print(f"⚠️ Monitoring log write failed ({len(users) + len(admins)} events): {e}")
+
+
+_loggers: Dict[str, ActivityLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_activity_logger(path: str = MONITORING_DB) -> ActivityLogger:
+    """Satu logger (dan satu writer thread) per file database."""
+    with _loggers_lock:
+        logger = _loggers.get(path)
+        if logger is None:
+            logger = _loggers[path] = ActivityLogger(path)
+            atexit.register(logger.flush)
+        return logger
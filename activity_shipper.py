@@ -0,0 +1,113 @@
+# activity_shipper.py — Kirim activity log ke Postgres (activity_events) secara batch
+"""
+admin_monitoring.db hanya berisi aktivitas desktop ini. ActivityShipper
+menampung event yang sama (dari activity_logger) di buffer in-memory dan
+mengirimnya ke tabel activity_events di Postgres lewat
+app_db.ingest_activity_events (COPY + rollup harian, satu transaksi per batch),
+sehingga dashboard admin bisa menampilkan aktivitas seluruh kantor.
+
+- Batch dikirim tiap SHIP_MS atau saat buffer mencapai SHIP_BATCH event.
+- Gagal kirim (offline): batch dikembalikan ke depan buffer dan dicoba lagi
+  dengan backoff. Buffer dibatasi SHIP_MAX_BUFFER; event tertua dibuang
+  (tetap ada di admin_monitoring.db lokal).
+
+Diatur lewat [monitoring] config.ini: FLEET, SHIP_MS, SHIP_BATCH, SHIP_MAX_BUFFER.
+"""
+
+import atexit
+import collections
+import socket
+import threading
+import time
+from typing import Optional
+
+import app_db
+
+BACKOFF_MAX = 60.0  # detik
+
+
+class ActivityShipper:
+    """Bounded in-memory buffer drained to Postgres by one background thread."""
+
+    def __init__(self, ship_ms: int = 1000, batch_size: int = 2000, max_buffer: int = 50000):
+        self.interval = ship_ms / 1000.0
+        self.batch_size = batch_size
+        self.host = socket.gethostname()
+        self._buffer = collections.deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self.shipped = 0
+        self.failures = 0
+        self._retry_at = 0.0  # selama backoff, buffer penuh tidak membangunkan worker
+        self._thread = threading.Thread(target=self._run, name="activity-shipper", daemon=True)
+        self._thread.start()
+
+    def submit(self, occurred_at: str, source: str, username: Optional[str], action: str,
+               category: str, details: str = "", target_user: str = "", success: bool = True) -> None:
+        """occurred_at: 'YYYY-MM-DD HH:MM:SS' UTC (format activity_logger)."""
+        event = (f"{occurred_at}+00", source, username, action, category,
+                 details, target_user, bool(success), self.host)
+        with self._lock:
+            self._buffer.append(event)  # deque(maxlen): event tertua terbuang saat penuh
+            full = len(self._buffer) >= self.batch_size
+        self._idle.clear()
+        if full and time.monotonic() >= self._retry_at:
+            self._wake.set()
+
+    def flush(self, timeout: float = 3.0) -> bool:
+        """Minta kirim sekarang dan tunggu buffer kosong (maks timeout detik)."""
+        with self._lock:
+            if self._buffer:
+                self._idle.clear()
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def _take(self) -> list:
+        with self._lock:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _put_back(self, batch: list) -> None:
+        with self._lock:
+            room = self._buffer.maxlen - len(self._buffer)
+            # Yang tidak muat adalah event tertua dari batch ini
+            self._buffer.extendleft(reversed(batch[-room:] if room > 0 else []))
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            self._wake.wait(backoff or self.interval)
+            self._wake.clear()
+            while True:
+                batch = self._take()
+                if not batch:
+                    self._idle.set()
+                    break
+                if app_db.ingest_activity_events(batch):
+                    self.shipped += len(batch)
+                    backoff = 0.0
+                    continue
+                self._put_back(batch)
+                self.failures += 1
+                backoff = min(BACKOFF_MAX, max(self.interval, backoff * 2 or 2.0))
+                self._retry_at = time.monotonic() + backoff
+                self._idle.set()  # flush() tidak menunggu jaringan yang mati
+                break
+
+
+_instance: Optional[ActivityShipper] = None
+_instance_lock = threading.Lock()
+
+
+def get_activity_shipper(settings: dict) -> Optional[ActivityShipper]:
+    """Shipper proses ini, atau None jika FLEET dimatikan / DATABASE_URL kosong."""
+    global _instance
+    if not settings.get("fleet") or not app_db.DATABASE_URL:
+        return None
+    with _instance_lock:
+        if _instance is None:
+            _instance = ActivityShipper(settings["ship_ms"], settings["ship_batch"],
+                                        settings["ship_max_buffer"])
+            atexit.register(_instance.flush)
+        return _instance
@@ -1,12 +1,267 @@
 # enhanced_admin_dashboard.py - Admin Dashboard dengan Monitoring Terintegrasi
 from PyQt5 import QtWidgets, QtCore, QtGui
-from db import connect
+from db_notify import get_change_listener
+from activity_logger import MONITORING_DB, ensure_schema, get_activity_logger
+from monitoring_retention import run_retention
+from monitoring_report import write_detailed_report
+import monitoring_export
+from db_async import get_async_db
+import app_db
 import datetime
 import sqlite3
-import json
+import os
+import shutil
+import tempfile
+import threading
 from pathlib import Path
 
+class _BackgroundBridge(QtCore.QObject):
+    """Meneruskan progress dari thread background ke GUI thread (queued signal)."""
+    progress = QtCore.pyqtSignal(str)
+    step = QtCore.pyqtSignal(int, int)  # (done, total)
+    finished = QtCore.pyqtSignal(object)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class UserTableModel(QtCore.QAbstractTableModel):
+    """
+    Model tabel user untuk QTableView. set_rows() menerapkan diff per id
+    (insert/update/remove) sehingga refresh hanya menyentuh baris yang berubah;
+    baris diekspos ke view bertahap lewat canFetchMore/fetchMore, dan sorting
+    dilakukan di model (urutan tetap terjaga saat baris baru disisipkan).
+    """
+    HEADERS = ["ID", "Username", "Role", "Status", "Last Login"]
+    FETCH_BATCH = 200  # baris yang ditambahkan ke view per fetchMore
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []        # [(id, username, role)], terurut sesuai sort aktif
+        self._pos = {}         # id -> posisi di _rows
+        self._loaded = 0       # jumlah baris yang sudah diekspos ke view
+        self._new_ids = set()  # di-highlight sebagai user baru
+        self._sort_column = 0
+        self._sort_desc = True  # user terbaru di atas
+        
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+        
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+        
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+        
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        uid, uname, user_role = self._rows[index.row()]
+        column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return str(uid)
+            if column == 1:
+                return uname
+            if column == 2:
+                return user_role
+            if column == 3:
+                return "🆕 Baru" if uid in self._new_ids else "✅ Lama"
+            return "N/A"  # Last login: placeholder, belum ada login tracking
+        if role == QtCore.Qt.BackgroundRole and column == 3 and uid in self._new_ids:
+            return QtGui.QBrush(QtCore.Qt.yellow)
+        return None
+        
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+        
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+        
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_ids = [self._rows[index.row()][0] for index in old_indexes]
+        self._sort_column = column
+        self._sort_desc = order == QtCore.Qt.DescendingOrder
+        self._rows.sort(key=self._sort_key, reverse=self._sort_desc)
+        self._reindex()
+        new_indexes = []
+        for uid, index in zip(old_ids, old_indexes):
+            row = self._pos[uid]
+            # Baris yang pindah ke luar bagian yang sudah dimuat tidak bisa dipertahankan
+            new_indexes.append(self.index(row, index.column()) if row < self._loaded else QtCore.QModelIndex())
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+        
+    # ---------- data ----------
+    def _sort_key(self, record):
+        uid, uname, user_role = record
+        if self._sort_column == 1:
+            return ((uname or "").lower(), uid)
+        if self._sort_column == 2:
+            return ((user_role or "").lower(), uid)
+        if self._sort_column == 3:
+            return (uid in self._new_ids, uid)
+        return (uid, uid)
+        
+    def _reindex(self):
+        self._pos = {record[0]: row for row, record in enumerate(self._rows)}
+        
+    def _insert_position(self, key):
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = self._sort_key(self._rows[mid])
+            if (mid_key > key) if self._sort_desc else (mid_key < key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+        
+    def _insert(self, record):
+        row = self._insert_position(self._sort_key(record))
+        visible = row < self._loaded
+        if visible:
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._rows.insert(row, record)
+        if visible:
+            self._loaded += 1
+            self.endInsertRows()
+        
+    def _remove(self, row):
+        visible = row < self._loaded
+        if visible:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._rows[row]
+        if visible:
+            self._loaded -= 1
+            self.endRemoveRows()
+        
+    def _classify(self, rows):
+        """Pisahkan rows menjadi (changed, inserted) terhadap isi model."""
+        changed, inserted = [], []
+        for record in map(tuple, rows):
+            row = self._pos.get(record[0])
+            if row is None:
+                inserted.append(record)
+            elif self._rows[row] != record:
+                changed.append(record)
+        return changed, inserted
+        
+    def _apply_diff(self, removed, changed, inserted):
+        # Hapus dari bawah supaya posisi baris di atasnya tetap valid
+        for row in sorted((self._pos[uid] for uid in removed), reverse=True):
+            self._remove(row)
+        self._new_ids.difference_update(removed)
+        self._reindex()
+        
+        for record in changed:
+            row = self._pos[record[0]]
+            if self._sort_key(self._rows[row]) == self._sort_key(record):
+                self._rows[row] = record
+                if row < self._loaded:
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+            else:
+                # Kunci sort berubah: pindahkan ke posisi yang benar
+                self._remove(row)
+                self._insert(record)
+                self._reindex()
+                
+        for record in inserted:
+            self._insert(record)
+        if inserted:
+            self._reindex()
+        
+    def set_rows(self, rows, mark_new=True):
+        """
+        Terapkan snapshot [(id, username, role), ...] sebagai diff terhadap isi model.
+        Returns (inserted, updated, removed) jumlah baris. mark_new: id yang baru
+        muncul di-highlight (tidak untuk muatan pertama).
+        """
+        if not self._rows:
+            self.beginResetModel()
+            self._rows = [tuple(r) for r in rows]
+            self._rows.sort(key=self._sort_key, reverse=self._sort_desc)
+            self._reindex()
+            self._loaded = min(self.FETCH_BATCH, len(self._rows))
+            self.endResetModel()
+            return len(self._rows), 0, 0
+            
+        incoming = {r[0] for r in rows}
+        removed = [uid for uid in self._pos if uid not in incoming]
+        changed, inserted = self._classify(rows)
+        if not (removed or changed or inserted):
+            return 0, 0, 0
+        if mark_new:
+            self._new_ids.update(record[0] for record in inserted)
+        self._apply_diff(removed, changed, inserted)
+        return len(inserted), len(changed), len(removed)
+        
+    def add_rows(self, rows):
+        """
+        Terapkan feed incremental (baris baru/berubah, tanpa penghapusan).
+        Highlight "baru" diganti tepat dengan id yang baru masuk.
+        Returns daftar id yang baru masuk.
+        """
+        changed, inserted = self._classify(rows)
+        new_ids = [record[0] for record in inserted]
+        if not new_ids:
+            if changed:
+                self._apply_diff([], changed, [])
+            return new_ids
+        
+        previous = self._new_ids - set(new_ids)
+        self._new_ids = set(new_ids)
+        self._apply_diff([], changed, inserted)
+        if self._sort_column == 3:
+            # Status ikut menentukan urutan
+            self.sort(3, QtCore.Qt.DescendingOrder if self._sort_desc else QtCore.Qt.AscendingOrder)
+        else:
+            for uid in previous:
+                row = self._pos.get(uid)
+                if row is not None and row < self._loaded:
+                    self.dataChanged.emit(self.index(row, 3), self.index(row, 3))
+        return new_ids
+        
+    def index_of(self, uid):
+        """QModelIndex kolom pertama untuk user id (invalid jika belum dimuat ke view)."""
+        row = self._pos.get(uid)
+        if row is None or row >= self._loaded:
+            return QtCore.QModelIndex()
+        return self.index(row, 0)
+        
+    def record(self, row):
+        """(id, username, role, status) untuk baris view ke-row."""
+        uid, uname, user_role = self._rows[row]
+        return uid, uname, user_role, "🆕 Baru" if uid in self._new_ids else "✅ Lama"
+
+
 class EnhancedAdminDashboard(QtWidgets.QMainWindow):
+    # Saat push LISTEN/NOTIFY aktif, timer hanya jadi jaring pengaman
+    PUSH_FALLBACK_INTERVAL_MS = 60000
+    # Feed user baru: id sequence bisa commit tidak berurutan, jadi beberapa id
+    # terakhir diminta ulang; baris yang sudah tampil diabaikan oleh model
+    NEW_USER_ID_OVERLAP = 20
+    NEW_USER_BATCH = 500
+    # Retensi admin_monitoring.db: sekali setelah startup, lalu tiap 24 jam
+    RETENTION_FIRST_RUN_MS = 15000
+    RETENTION_INTERVAL_MS = 24 * 60 * 60 * 1000
+    
     def __init__(self, username="admin"):
         super().__init__()
         self.username = username
@@ -20,7 +275,12 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         self.auto_refresh_timer = QtCore.QTimer()
         self.auto_refresh_timer.timeout.connect(self.auto_check_new_users)
         self.auto_refresh_enabled = True
-        self.last_user_count = 0
+        self.push_active = False
+        self.last_user_id = None  # id user terbesar yang sudah tampil; None = belum dimuat
+        
+        # Export monitoring data di background
+        self.export_thread = None
+        self.export_cancel = threading.Event()
         
         # Setup UI
         self.setup_ui()
@@ -31,47 +291,36 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         self.start_auto_refresh()
         self.add_log("✅ Enhanced Admin dashboard dimulai - Monitoring aktif")
         
+        # Push: cek user baru begitu tabel users berubah (NOTIFY dari trigger)
+        listener = get_change_listener()
+        listener.users_changed.connect(self.on_users_changed)
+        listener.push_active.connect(self.on_push_status)
+        if listener.is_active:
+            self.on_push_status(True)
+        
+        # Retensi/kompaksi monitoring DB di background
+        self.retention_thread = None
+        self.retention_cancel = threading.Event()
+        self.retention_bridge = _BackgroundBridge(self)
+        self.retention_bridge.progress.connect(self.add_log)
+        self.retention_bridge.finished.connect(self.on_retention_finished)
+        self.retention_timer = QtCore.QTimer(self)
+        self.retention_timer.timeout.connect(self.run_retention)
+        self.retention_timer.start(self.RETENTION_INTERVAL_MS)
+        QtCore.QTimer.singleShot(self.RETENTION_FIRST_RUN_MS, self.run_retention)
+        
         # Log admin login
         self.log_admin_activity("ADMIN_LOGIN", f"Admin {username} logged into dashboard")
         
     def setup_monitoring_db(self):
         """Setup database untuk monitoring."""
-        self.monitoring_db = "admin_monitoring.db"
+        self.monitoring_db = MONITORING_DB
         with sqlite3.connect(self.monitoring_db) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS user_activities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    username TEXT,
-                    action TEXT,
-                    details TEXT,
-                    ip_address TEXT DEFAULT 'localhost',
-                    success BOOLEAN DEFAULT 1
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS login_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT,
-                    login_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    logout_time DATETIME,
-                    session_duration INTEGER,
-                    role TEXT,
-                    ip_address TEXT DEFAULT 'localhost'
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS admin_actions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    admin_username TEXT,
-                    action TEXT,
-                    target_user TEXT,
-                    details TEXT
-                )
-            """)
+            ensure_schema(conn)
+        # Event ditulis batch oleh writer thread (activity_logger)
+        self.activity_logger = get_activity_logger(self.monitoring_db)
+        # Event juga dikirim ke activity_events di Postgres -> statistik semua client
+        self.fleet_enabled = self.activity_logger.shipper is not None
         
     def setup_ui(self):
         central = QtWidgets.QWidget()
@@ -151,12 +400,15 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         toolbar.addStretch()
         layout.addLayout(toolbar)
         
-        # Tabel user
-        self.table = QtWidgets.QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "Username", "Role", "Status", "Last Login"])
+        # Tabel user (model/view: refresh hanya mengubah baris yang berbeda)
+        self.user_model = UserTableModel(self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.user_model)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, QtCore.Qt.DescendingOrder)  # user terbaru di atas
         
         # Set column widths
         self.table.setColumnWidth(0, 60)
@@ -191,18 +443,29 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
             QPushButton:hover { background: #047857; }
         """)
         
-        export_btn = QtWidgets.QPushButton("📊 Export Data")
-        export_btn.clicked.connect(self.export_monitoring_data)
-        export_btn.setStyleSheet("""
+        self.export_btn = QtWidgets.QPushButton("📊 Export Data")
+        self.export_btn.clicked.connect(self.export_monitoring_data)
+        self.export_btn.setStyleSheet("""
             QPushButton {
                 background: #7c3aed; color: white; font-weight: 600;
                 padding: 8px 16px; border-radius: 6px; border: none;
             }
             QPushButton:hover { background: #6d28d9; }
+            QPushButton:disabled { background: #94a3b8; }
         """)
         
+        # Progress export (tampil hanya saat export berjalan)
+        self.export_progress = QtWidgets.QProgressBar()
+        self.export_progress.setMaximumWidth(240)
+        self.export_progress.hide()
+        self.export_cancel_btn = QtWidgets.QPushButton("Cancel Export")
+        self.export_cancel_btn.clicked.connect(self.export_cancel.set)
+        self.export_cancel_btn.hide()
+        
         control_panel.addWidget(refresh_monitoring_btn)
-        control_panel.addWidget(export_btn)
+        control_panel.addWidget(self.export_btn)
+        control_panel.addWidget(self.export_progress)
+        control_panel.addWidget(self.export_cancel_btn)
         control_panel.addStretch()
         layout.addLayout(control_panel)
         
@@ -301,6 +564,19 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         self.log_text.setStyleSheet("background: #f8fafc; border: 1px solid #e2e8f0; border-radius: 6px; padding: 8px;")
         layout.addWidget(self.log_text)
         
+        # Retensi manual (otomatis juga jalan tiap 24 jam)
+        self.retention_btn = QtWidgets.QPushButton("🧹 Compact Monitoring DB")
+        self.retention_btn.clicked.connect(lambda: self.run_retention(manual=True))
+        self.retention_btn.setStyleSheet("""
+            QPushButton {
+                background: #0ea5e9; color: white; font-weight: 600;
+                padding: 8px 16px; border-radius: 6px; border: none;
+            }
+            QPushButton:hover { background: #0284c7; }
+            QPushButton:disabled { background: #94a3b8; }
+        """)
+        layout.addWidget(self.retention_btn)
+        
         # Clear logs button
         clear_btn = QtWidgets.QPushButton("🗑️ Clear Logs")
         clear_btn.clicked.connect(self.clear_logs)
@@ -341,49 +617,62 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         return {'widget': card_widget, 'value_label': value_label}
         
     def log_admin_activity(self, action, details="", target_user=""):
-        """Log admin activities untuk monitoring."""
-        with sqlite3.connect(self.monitoring_db) as conn:
-            conn.execute("""
-                INSERT INTO admin_actions (admin_username, action, target_user, details)
-                VALUES (?, ?, ?, ?)
-            """, (self.username, action, target_user, details))
+        """Log admin activities untuk monitoring (antre, ditulis batch di background)."""
+        self.activity_logger.log_admin(self.username, action, details, target_user)
         
         self.add_log(f"🔧 ADMIN: {action} - {details}")
         
     def log_user_activity(self, username, action, details="", success=True):
-        """Log user activities."""
-        with sqlite3.connect(self.monitoring_db) as conn:
-            conn.execute("""
-                INSERT INTO user_activities (username, action, details, success)
-                VALUES (?, ?, ?, ?)
-            """, (username, action, details, success))
+        """Log user activities (antre, ditulis batch di background)."""
+        self.activity_logger.log_user(username, action, details, success)
             
     def load_monitoring_data(self):
-        """Load monitoring data untuk tab monitoring."""
+        """Load monitoring data untuk tab monitoring (semua client jika log fleet aktif)."""
+        if self.fleet_enabled:
+            get_async_db().submit(
+                lambda: (app_db.fleet_activity_stats(), app_db.recent_activity_events(50)),
+                on_result=self._apply_fleet_monitoring,
+                owner=self, key="fleet-monitoring",
+            )
+            return
+        self._load_local_monitoring_data()
+        
+    def _apply_fleet_monitoring(self, result):
+        """Hasil query activity_events (GUI thread); fallback ke data lokal jika gagal."""
+        stats, activities = result
+        if stats is None or activities is None:
+            self.add_log("⚠️ Log fleet tidak tersedia - menampilkan aktivitas desktop ini saja")
+            self._load_local_monitoring_data()
+            return
+        for key, value in stats.items():
+            self.stats_cards[key].setText(str(value))
+        self._fill_activities(activities)
+        
+    def _load_local_monitoring_data(self):
+        """Statistik dari admin_monitoring.db lokal."""
         try:
             with sqlite3.connect(self.monitoring_db) as conn:
                 cursor = conn.cursor()
                 
-                # Total logins
-                cursor.execute("SELECT COUNT(*) FROM user_activities WHERE action LIKE '%LOGIN%'")
-                total_logins = cursor.fetchone()[0]
+                # Kartu statistik dari rollup harian (activity_logger), bukan scan log mentah
+                cursor.execute("""
+                    SELECT COALESCE(SUM(events), 0), COALESCE(SUM(failures), 0)
+                    FROM activity_daily WHERE category = 'LOGIN'
+                """)
+                total_logins, failed_attempts = cursor.fetchone()
                 
                 # Active today
                 cursor.execute("""
-                    SELECT COUNT(DISTINCT username) FROM user_activities 
-                    WHERE date(timestamp) = date('now') AND action LIKE '%LOGIN%'
+                    SELECT COUNT(DISTINCT username) FROM activity_daily
+                    WHERE category = 'LOGIN' AND day = date('now')
                 """)
                 active_today = cursor.fetchone()[0]
                 
-                # Failed attempts
+                # Admin actions (baris mentah + yang sudah dirangkum oleh retensi)
                 cursor.execute("""
-                    SELECT COUNT(*) FROM user_activities 
-                    WHERE action LIKE '%LOGIN%' AND success = 0
+                    SELECT (SELECT COUNT(*) FROM admin_actions)
+                         + (SELECT COALESCE(SUM(events), 0) FROM admin_actions_rollup)
                 """)
-                failed_attempts = cursor.fetchone()[0]
-                
-                # Admin actions
-                cursor.execute("SELECT COUNT(*) FROM admin_actions")
                 admin_actions = cursor.fetchone()[0]
                 
                 # Update statistics cards
@@ -396,35 +685,43 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
                 cursor.execute("""
                     SELECT timestamp, username, action, details, success
                     FROM user_activities 
-                    ORDER BY timestamp DESC 
+                    ORDER BY id DESC 
                     LIMIT 50
                 """)
-                
-                activities = cursor.fetchall()
-                self.activities_table.setRowCount(len(activities))
-                
-                for row, (timestamp, username, action, details, success) in enumerate(activities):
-                    # Format timestamp
-                    try:
-                        dt = datetime.datetime.fromisoformat(timestamp)
-                        time_str = dt.strftime('%H:%M:%S')
-                    except:
-                        time_str = timestamp.split(' ')[-1] if ' ' in timestamp else timestamp
-                    
-                    self.activities_table.setItem(row, 0, QtWidgets.QTableWidgetItem(time_str))
-                    self.activities_table.setItem(row, 1, QtWidgets.QTableWidgetItem(username or "N/A"))
-                    self.activities_table.setItem(row, 2, QtWidgets.QTableWidgetItem(action or "N/A"))
-                    self.activities_table.setItem(row, 3, QtWidgets.QTableWidgetItem(details or "N/A"))
-                    
-                    # Success indicator with color
-                    success_item = QtWidgets.QTableWidgetItem("✅" if success else "❌")
-                    if not success:
-                        success_item.setBackground(QtGui.QColor("#fecaca"))
-                    self.activities_table.setItem(row, 4, success_item)
+                self._fill_activities(cursor.fetchall())
                     
         except Exception as e:
             self.add_log(f"❌ Error loading monitoring data: {str(e)}")
             
+    def _fill_activities(self, activities):
+        """Isi tabel Recent User Activities; baris fleet membawa kolom host tambahan."""
+        self.activities_table.setRowCount(len(activities))
+        
+        for row, (timestamp, username, action, details, success, *host) in enumerate(activities):
+            # Format timestamp (UTC)
+            try:
+                if isinstance(timestamp, datetime.datetime):
+                    dt = timestamp.astimezone(datetime.timezone.utc)
+                else:
+                    dt = datetime.datetime.fromisoformat(timestamp)
+                time_str = dt.strftime('%H:%M:%S')
+            except:
+                time_str = timestamp.split(' ')[-1] if ' ' in timestamp else timestamp
+            
+            user_item = QtWidgets.QTableWidgetItem(username or "N/A")
+            if host and host[0]:
+                user_item.setToolTip(f"Client: {host[0]}")
+            self.activities_table.setItem(row, 0, QtWidgets.QTableWidgetItem(time_str))
+            self.activities_table.setItem(row, 1, user_item)
+            self.activities_table.setItem(row, 2, QtWidgets.QTableWidgetItem(action or "N/A"))
+            self.activities_table.setItem(row, 3, QtWidgets.QTableWidgetItem(details or "N/A"))
+            
+            # Success indicator with color
+            success_item = QtWidgets.QTableWidgetItem("✅" if success else "❌")
+            if not success:
+                success_item.setBackground(QtGui.QColor("#fecaca"))
+            self.activities_table.setItem(row, 4, success_item)
+            
     def update_statistics(self):
         """Update statistics based on selected period."""
         period_map = {
@@ -434,34 +731,63 @@ class EnhancedAdminDashboard(QtWidgets.QMainWindow):
         }
         days = period_map.get(self.period_combo.currentText(), 7)
         
+        if self.fleet_enabled:
+            period = self.period_combo.currentText()
+            get_async_db().submit(
+                app_db.fleet_activity_report, days,
+                on_result=lambda report: self._apply_fleet_statistics(days, period, report),
+                owner=self, key="fleet-statistics",
+            )
+            return
+        self._update_local_statistics(days)
+        
+    def _apply_fleet_statistics(self, days, period, report):
+        """Hasil fleet_activity_report (GUI thread)."""
+        if period != self.period_combo.currentText():
+            return  # period sudah diganti lagi
+        if report is None:
+            self._update_local_statistics(days)
+            return
+        self._render_statistics(report["total"], report["unique_users"], report["top_users"],
+                                "All clients (fleet-wide, daily precision)")
+        
+    def _update_local_statistics(self, days):
         try:
             with sqlite3.connect(self.monitoring_db) as conn:
                 cursor = conn.cursor()
                 
-                # Generate statistics report
+                # Generate statistics report dari rollup per jam (presisi 1 jam)
+                since = f"strftime('%Y-%m-%d %H:00:00', 'now', '-{days} days')"
                 cursor.execute(f"""
-                    SELECT COUNT(*) FROM user_activities 
-                    WHERE timestamp > datetime('now', '-{days} days')
+                    SELECT COALESCE(SUM(events), 0) FROM activity_hourly
+                    WHERE bucket >= {since}
                 """)
                 total_activities = cursor.fetchone()[0]
                 
                 cursor.execute(f"""
-                    SELECT COUNT(DISTINCT username) FROM user_activities 
-                    WHERE timestamp > datetime('now', '-{days} days') AND action LIKE '%LOGIN%'
+                    SELECT COUNT(DISTINCT username) FROM activity_hourly
+                    WHERE category = 'LOGIN' AND bucket >= {since}
                 """)
                 unique_users = cursor.fetchone()[0]
                 
                 cursor.execute(f"""
-                    SELECT username, COUNT(*) as count FROM user_activities 
-                    WHERE timestamp > datetime('now', '-{days} days')
+                    SELECT NULLIF(username, '') AS name, SUM(events) AS count FROM activity_hourly
+                    WHERE bucket >= {since}
                     GROUP BY username ORDER BY count DESC LIMIT 10
                 """)
                 top_users = cursor.fetchall()
                 
-                # Format report
-                report = f"""
+            self._render_statistics(total_activities, unique_users, top_users, "This desktop only")
+                
+        except Exception as e:
+            self.stats_text.setPlainText(f"Error generating statistics: {str(e)}")
+            
+    def _render_statistics(self, total_activities, unique_users, top_users, scope):
+        """Format report periode ke stats_text."""
+        report = f"""
 === CRYPTO INSIGHT MONITORING REPORT ===
 Period: {self.period_combo.currentText()}
+Scope: {scope}
 Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 📊 SUMMARY:
@@ -471,10 +797,10 @@ Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 👥 TOP ACTIVE USERS:
 """
-                for i, (username, count) in enumerate(top_users, 1):
-                    report += f"{i:2d}. {username}: {count} activities\n"
-                
-                report += f"""
+        for i, (username, count) in enumerate(top_users, 1):
+            report += f"{i:2d}. {username}: {count} activities\n"
+        
+        report += f"""
 
 📈 INSIGHTS:
 • Most active period: {self.period_combo.currentText()}
@@ -483,83 +809,92 @@ Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 === END REPORT ===
 """
-                
-                self.stats_text.setPlainText(report)
-                
-        except Exception as e:
-            self.stats_text.setPlainText(f"Error generating statistics: {str(e)}")
+        
+        self.stats_text.setPlainText(report)
             
     def generate_detailed_report(self):
-        """Generate detailed report in new window."""
-        try:
-            report_dialog = QtWidgets.QDialog(self)
-            report_dialog.setWindowTitle("Detailed Monitoring Report")
-            report_dialog.resize(800, 600)
-            
-            layout = QtWidgets.QVBoxLayout(report_dialog)
-            
-            # Generate comprehensive report
-            with sqlite3.connect(self.monitoring_db) as conn:
-                cursor = conn.cursor()
-                
-                # All activities
-                cursor.execute("""
-                    SELECT timestamp, username, action, details, success
-                    FROM user_activities 
-                    ORDER BY timestamp DESC
-                """)
-                all_activities = cursor.fetchall()
-                
-                # Admin actions
-                cursor.execute("""
-                    SELECT timestamp, admin_username, action, target_user, details
-                    FROM admin_actions 
-                    ORDER BY timestamp DESC
-                """)
-                admin_actions = cursor.fetchall()
-            
-            report_text = QtWidgets.QTextEdit()
-            report_text.setFont(QtGui.QFont("Courier New", 9))
-            
-            detailed_report = f"""
-=== COMPREHENSIVE MONITORING REPORT ===
-Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Admin: {self.username}
-
-📋 ALL USER ACTIVITIES ({len(all_activities)} total):
-"""
-            
-            for timestamp, username, action, details, success in all_activities[:100]:  # Limit to 100
-                status = "✅" if success else "❌"
-                detailed_report += f"{timestamp} | {username} | {action} | {details} {status}\n"
-            
-            detailed_report += f"""
-
-🔧 ADMIN ACTIONS ({len(admin_actions)} total):
-"""
-            
-            for timestamp, admin_user, action, target, details in admin_actions:
-                detailed_report += f"{timestamp} | {admin_user} | {action} | Target: {target} | {details}\n"
-            
-            report_text.setPlainText(detailed_report)
-            layout.addWidget(report_text)
-            
-            # Export button
-            export_btn = QtWidgets.QPushButton("💾 Export to File")
-            export_btn.clicked.connect(lambda: self.export_report_to_file(detailed_report))
-            layout.addWidget(export_btn)
-            
-            close_btn = QtWidgets.QPushButton("Close")
-            close_btn.clicked.connect(report_dialog.accept)
-            layout.addWidget(close_btn)
-            
-            report_dialog.exec_()
-            
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to generate report: {str(e)}")
+        """Report detail ditulis streaming ke file di background; dialog hanya preview halaman pertama."""
+        fd, report_path = tempfile.mkstemp(prefix="crypto_insight_report_", suffix=".txt")
+        os.close(fd)
+        cancel = threading.Event()
+        bridge = _BackgroundBridge(self)
+        
+        report_dialog = QtWidgets.QDialog(self)
+        report_dialog.setWindowTitle("Detailed Monitoring Report")
+        report_dialog.resize(800, 600)
+        layout = QtWidgets.QVBoxLayout(report_dialog)
+        
+        status_label = QtWidgets.QLabel("⏳ Menyusun report...")
+        layout.addWidget(status_label)
+        progress_bar = QtWidgets.QProgressBar()
+        layout.addWidget(progress_bar)
+        
+        report_text = QtWidgets.QTextEdit()
+        report_text.setReadOnly(True)
+        report_text.setFont(QtGui.QFont("Courier New", 9))
+        layout.addWidget(report_text)
+        
+        cancel_btn = QtWidgets.QPushButton("Cancel")
+        cancel_btn.clicked.connect(cancel.set)
+        layout.addWidget(cancel_btn)
+        
+        # Export button (aktif setelah report selesai)
+        export_btn = QtWidgets.QPushButton("💾 Export to File")
+        export_btn.setEnabled(False)
+        export_btn.clicked.connect(lambda: self.export_report_to_file(report_path))
+        layout.addWidget(export_btn)
+        
+        close_btn = QtWidgets.QPushButton("Close")
+        close_btn.clicked.connect(report_dialog.accept)
+        layout.addWidget(close_btn)
+        
+        def on_step(done, total):
+            progress_bar.setMaximum(max(total, 1))
+            progress_bar.setValue(done)
+            status_label.setText(f"⏳ Menyusun report... {done:,} / {total:,} baris")
+        
+        def on_finished(summary):
+            bridge.deleteLater()  # sinyal terakhir dari worker
+            cancel_btn.setEnabled(False)
+            if "error" in summary:
+                status_label.setText(f"❌ Failed to generate report: {summary['error']}")
+                return
+            if summary["cancelled"]:
+                status_label.setText("⚠️ Report dibatalkan")
+                return
+            rows = summary["user_activities"] + summary["admin_actions"]
+            preview = summary["preview"]
+            if summary["preview_truncated"]:
+                preview += "\n... (preview halaman pertama; report lengkap via Export to File)\n"
+            report_text.setPlainText(preview)
+            status_label.setText(f"✅ {rows:,} baris, {summary['bytes'] / 1024:,.0f} KB "
+                                 f"({summary['seconds']}s)")
+            export_btn.setEnabled(True)
+        
+        bridge.step.connect(on_step)
+        bridge.finished.connect(on_finished)
+        
+        def work():
+            try:
+                self.activity_logger.flush()  # event yang masih antre ikut masuk report
+                summary = write_detailed_report(report_path, self.monitoring_db, self.username,
+                                                progress=bridge.step.emit, cancel=cancel)
+            except Exception as e:
+                summary = {"error": str(e)}
+            if cancel.is_set():
+                # Dialog sudah ditutup selagi report ditulis
+                _remove_file(report_path)
+            bridge.finished.emit(summary)
+        
+        threading.Thread(target=work, name="monitoring-report", daemon=True).start()
+        report_dialog.exec_()
+        
+        # Dialog ditutup: hentikan worker (kalau masih jalan) dan buang file sementara
+        cancel.set()
+        _remove_file(report_path)
             
-    def export_report_to_file(self, report_content):
-        """Export report to text file."""
+    def export_report_to_file(self, report_path):
+        """Salin report yang sudah ditulis ke lokasi pilihan admin."""
         filename, _ = QtWidgets.QFileDialog.getSaveFileName(
             self, "Save Report", 
             f"crypto_insight_report_{datetime.date.today()}.txt",
@@ -568,52 +903,120 @@ Admin: {self.username}
         
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(report_content)
+                shutil.copyfile(report_path, filename)
                 QtWidgets.QMessageBox.information(self, "Success", f"Report exported to:\n{filename}")
                 self.log_admin_activity("EXPORT_REPORT", f"Exported monitoring report to {filename}")
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Error", f"Failed to export report: {str(e)}")
                 
+    def _ask_export_range(self):
+        """Dialog rentang waktu export. Returns (since, until) UTC, (None, None) = semua, atau None jika batal."""
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Export Monitoring Data")
+        form = QtWidgets.QFormLayout(dialog)
+        
+        all_time = QtWidgets.QCheckBox("Semua data")
+        all_time.setChecked(True)
+        today = QtCore.QDate.currentDate()
+        date_from = QtWidgets.QDateEdit(today.addDays(-30))
+        date_to = QtWidgets.QDateEdit(today)
+        for edit in (date_from, date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+            all_time.toggled.connect(lambda checked, e=edit: e.setEnabled(not checked))
+        form.addRow(all_time)
+        form.addRow("Dari (UTC):", date_from)
+        form.addRow("Sampai (UTC):", date_to)
+        
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+        
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return None
+        if all_time.isChecked():
+            return None, None
+        # Sampai = inklusif sampai akhir hari itu
+        since = date_from.date().toString("yyyy-MM-dd") + " 00:00:00"
+        until = date_to.date().addDays(1).toString("yyyy-MM-dd") + " 00:00:00"
+        return since, until
+        
     def export_monitoring_data(self):
-        """Export monitoring data to JSON."""
-        try:
-            filename, _ = QtWidgets.QFileDialog.getSaveFileName(
-                self, "Export Monitoring Data", 
-                f"monitoring_data_{datetime.date.today()}.json",
-                "JSON Files (*.json)"
-            )
-            
-            if filename:
-                with sqlite3.connect(self.monitoring_db) as conn:
-                    cursor = conn.cursor()
-                    
-                    # Get all data
-                    cursor.execute("SELECT * FROM user_activities ORDER BY timestamp DESC")
-                    activities = cursor.fetchall()
-                    
-                    cursor.execute("SELECT * FROM admin_actions ORDER BY timestamp DESC")
-                    admin_actions = cursor.fetchall()
-                
-                export_data = {
-                    'export_info': {
-                        'generated_at': datetime.datetime.now().isoformat(),
-                        'admin_user': self.username,
-                        'total_activities': len(activities),
-                        'total_admin_actions': len(admin_actions)
-                    },
-                    'user_activities': activities,
-                    'admin_actions': admin_actions
-                }
-                
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, default=str)
-                
-                QtWidgets.QMessageBox.information(self, "Export Complete", f"Data exported to:\n{filename}")
-                self.log_admin_activity("EXPORT_DATA", f"Exported monitoring data to JSON: {filename}")
-                
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
+        """Export monitoring data (JSONL/CSV, opsional gzip) secara streaming di background thread."""
+        if self.export_thread is not None and self.export_thread.is_alive():
+            return
+        time_range = self._ask_export_range()
+        if time_range is None:
+            return
+        since, until = time_range
+        
+        filters = {
+            "JSON Lines, gzip (*.jsonl.gz)": ".jsonl.gz",
+            "JSON Lines (*.jsonl)": ".jsonl",
+            "CSV, gzip (*.csv.gz)": ".csv.gz",
+            "CSV (*.csv)": ".csv",
+        }
+        filename, selected = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Monitoring Data", 
+            f"monitoring_data_{datetime.date.today()}.jsonl.gz",
+            ";;".join(filters)
+        )
+        if not filename:
+            return
+        if not filename.lower().endswith(tuple(filters.values())):
+            filename += filters.get(selected, ".jsonl.gz")
+        
+        self.export_cancel.clear()
+        self.export_btn.setEnabled(False)
+        self.export_progress.setValue(0)
+        self.export_progress.show()
+        self.export_cancel_btn.show()
+        range_text = f"{since} — {until} UTC" if since else "semua data"
+        self.add_log(f"📤 Export dimulai ({range_text}) -> {filename}")
+        
+        bridge = _BackgroundBridge(self)
+        bridge.progress.connect(self.add_log)
+        bridge.step.connect(self._on_export_step)
+        bridge.finished.connect(self.on_export_finished)
+        bridge.finished.connect(bridge.deleteLater)
+        
+        def work():
+            try:
+                self.activity_logger.flush()  # event yang masih antre ikut diexport
+                summary = monitoring_export.export_monitoring_data(filename, self.monitoring_db, since, until,
+                                                                   admin=self.username, progress=bridge.step.emit,
+                                                                   message=bridge.progress.emit,
+                                                                   cancel=self.export_cancel)
+            except Exception as e:
+                summary = {"path": filename, "error": str(e)}
+            bridge.finished.emit(summary)
+        
+        self.export_thread = threading.Thread(target=work, name="monitoring-export", daemon=True)
+        self.export_thread.start()
+        
+    def _on_export_step(self, done, total):
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(done)
+        
+    def on_export_finished(self, summary):
+        """Export selesai (GUI thread)."""
+        self.export_btn.setEnabled(True)
+        self.export_progress.hide()
+        self.export_cancel_btn.hide()
+        if "error" in summary:
+            self.add_log(f"❌ Export gagal: {summary['error']}")
+            QtWidgets.QMessageBox.critical(self, "Export Error", f"Failed to export data: {summary['error']}")
+            return
+        if summary["cancelled"]:
+            self.add_log("⚠️ Export dibatalkan")
+            return
+        rows = summary["user_activities"] + summary["admin_actions"]
+        self.add_log(f"✅ Export selesai: {rows:,} baris, {summary['bytes'] / 1048576:,.1f} MB "
+                     f"dalam {summary['seconds']}s ({summary['rows_per_sec']:,} baris/detik)")
+        QtWidgets.QMessageBox.information(self, "Export Complete", f"Data exported to:\n{summary['path']}")
+        self.log_admin_activity("EXPORT_DATA", f"Exported {rows} monitoring rows ({summary['format']}): {summary['path']}")
             
     def clear_logs(self):
         """Clear system logs display."""
@@ -628,10 +1031,46 @@ Admin: {self.username}
             self.add_log("🗑️ Log display cleared by admin")
             self.log_admin_activity("CLEAR_LOGS", "Cleared system log display")
             
+    def run_retention(self, manual=False):
+        """Pangkas & rangkum data monitoring lama di background thread.
+        manual: dari tombol; hanya di sini VACUUM penuh (sekali, DB lama) diizinkan."""
+        if self.retention_thread is not None and self.retention_thread.is_alive():
+            return
+        self.retention_btn.setEnabled(False)
+        bridge = self.retention_bridge
+        
+        def work():
+            try:
+                self.activity_logger.flush()  # event yang masih antre ikut dirangkum
+                summary = run_retention(self.monitoring_db, progress=bridge.progress.emit,
+                                        cancel=self.retention_cancel, full_vacuum=manual)
+            except Exception as e:
+                summary = {"error": str(e)}
+            bridge.finished.emit(summary)
+        
+        self.retention_thread = threading.Thread(target=work, name="monitoring-retention", daemon=True)
+        self.retention_thread.start()
+        
+    def on_retention_finished(self, summary):
+        """Retensi selesai (GUI thread)."""
+        self.retention_btn.setEnabled(True)
+        if "error" in summary:
+            self.add_log(f"❌ Retensi gagal: {summary['error']}")
+            return
+        if summary["user_activities"] or summary["admin_actions"]:
+            self.load_monitoring_data()
+            self.log_admin_activity(
+                "COMPACT_MONITORING_DB",
+                f"Pruned {summary['user_activities']} activities and {summary['admin_actions']} admin actions "
+                f"older than {summary['retention_days']} days"
+            )
+            
     # Existing methods with monitoring integration
     def start_auto_refresh(self):
         """Mulai auto-refresh dengan interval yang ditentukan."""
         interval = self.interval_spin.value() * 1000  # Convert to milliseconds
+        if self.push_active:
+            interval = max(interval, self.PUSH_FALLBACK_INTERVAL_MS)
         self.auto_refresh_timer.start(interval)
         self.auto_refresh_enabled = True
         
@@ -668,44 +1107,88 @@ Admin: {self.username}
             self.add_log(f"⚙️ Interval auto-check diubah menjadi {interval} detik")
             self.log_admin_activity("CHANGE_INTERVAL", f"Changed refresh interval to {interval} seconds")
             
+    def on_push_status(self, active):
+        """Push channel tersambung/putus: atur ulang interval polling."""
+        self.push_active = active
+        if active:
+            self.add_log("📡 Push notification aktif - polling diperlambat")
+        else:
+            self.add_log("⚠️ Push notification terputus - kembali ke polling")
+        if self.auto_refresh_enabled:
+            self.start_auto_refresh()
+            
+    def on_users_changed(self):
+        """NOTIFY dari tabel users."""
+        if self.auto_refresh_enabled:
+            self.auto_check_new_users()
+            
+    @classmethod
+    def _fetch_new_users(cls, last_id):
+        """(worker thread) Semua user dengan id > last_id (minus overlap). Returns list, atau None jika gagal."""
+        since = max(0, last_id - cls.NEW_USER_ID_OVERLAP)
+        rows = []
+        while True:
+            batch = app_db.fetch_users_since(since, cls.NEW_USER_BATCH)
+            if batch is None:
+                return None
+            rows.extend(batch)
+            if len(batch) < cls.NEW_USER_BATCH:
+                return rows
+            since = batch[-1][0]
+            
     def auto_check_new_users(self):
-        """Cek otomatis apakah ada user baru."""
+        """Cek otomatis user baru lewat feed incremental (id > id terakhir yang tampil), di worker thread."""
+        if self.last_user_id is None:
+            # Muatan awal belum selesai / gagal: list_users sekaligus jadi baseline
+            self.load_users(show_errors=False)
+            return
+        get_async_db().submit(
+            self._fetch_new_users, self.last_user_id,
+            on_result=self._apply_new_users,
+            on_error=lambda e: self.add_log(f"❌ Error saat auto-check: {str(e)}"),
+            owner=self, key="new_users",
+        )
+        
+    def _apply_new_users(self, rows):
+        """Hasil feed user baru (GUI thread): tambahkan baris baru saja dan geser watermark."""
         try:
-            conn = connect()
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM users")
-            current_count = cur.fetchone()[0]
-            conn.close()
-            
-            if self.last_user_count == 0:
-                # First time initialization
-                self.last_user_count = current_count
+            if rows is None:
+                self.add_log("❌ Error saat auto-check: database tidak bisa dihubungi")
                 return
-                
-            if current_count > self.last_user_count:
-                # Ada user baru!
-                new_users = current_count - self.last_user_count
-                self.add_log(f"🚨 ALERT: {new_users} user baru terdeteksi!")
-                self.status_label.setText(f"🔔 {new_users} user baru terdeteksi! Memuat ulang data...")
-                self.status_label.setStyleSheet("color: #dc2626; font-weight: 600; padding: 8px; background: #fef2f2; border-radius: 6px; margin: 4px 0;")
-                
-                # Log new user detection
-                self.log_admin_activity("NEW_USER_DETECTED", f"{new_users} new users detected")
-                
-                # Refresh table
-                self.load_users()
-                self.load_monitoring_data()  # Refresh monitoring data too
-                self.last_user_count = current_count
-                
-                # Show notification
-                QtWidgets.QMessageBox.information(
-                    self, 
-                    "User Baru Terdeteksi!", 
-                    f"🎉 {new_users} user baru telah mendaftar!\n\nTabel telah diperbarui secara otomatis."
-                )
-                
-                # Reset status after 3 seconds
-                QtCore.QTimer.singleShot(3000, self.reset_status_message)
+            new_ids = self.user_model.add_rows(rows)
+            if rows:
+                self.last_user_id = max(self.last_user_id, rows[-1][0])
+            if new_ids:
+                self._alert_new_users(new_ids)
+        except Exception as e:
+            self.add_log(f"❌ Error saat auto-check: {str(e)}")
+            
+    def _alert_new_users(self, new_ids):
+        """Alert + log NEW_USER_DETECTED untuk user yang baru masuk tabel (dari feed atau refresh penuh)."""
+        try:
+            # Ada user baru!
+            new_users = len(new_ids)
+            self.add_log(f"🚨 ALERT: {new_users} user baru terdeteksi!")
+            self.status_label.setText(f"🔔 {new_users} user baru terdeteksi! Ditambahkan ke tabel")
+            self.status_label.setStyleSheet("color: #dc2626; font-weight: 600; padding: 8px; background: #fef2f2; border-radius: 6px; margin: 4px 0;")
+            
+            # Log new user detection
+            self.log_admin_activity("NEW_USER_DETECTED", f"{new_users} new users detected (ids {new_ids[0]}-{new_ids[-1]})")
+            
+            index = self.user_model.index_of(new_ids[-1])
+            if index.isValid():
+                self.table.scrollTo(index)
+            self.load_monitoring_data()  # Refresh monitoring data too
+            
+            # Show notification
+            QtWidgets.QMessageBox.information(
+                self, 
+                "User Baru Terdeteksi!", 
+                f"🎉 {new_users} user baru telah mendaftar!\n\nTabel telah diperbarui secara otomatis."
+            )
+            
+            # Reset status after 3 seconds
+            QtCore.QTimer.singleShot(3000, self.reset_status_message)
                 
         except Exception as e:
             self.add_log(f"❌ Error saat auto-check: {str(e)}")
@@ -723,44 +1206,39 @@ Admin: {self.username}
         self.load_users()
         self.load_monitoring_data()
         
-    def load_users(self):
-        """Ambil semua user dari database dan tampilkan di tabel."""
-        try:
-            conn = connect()
-            cur = conn.cursor()
-            cur.execute("SELECT id, username, role FROM users ORDER BY id DESC")  # DESC untuk user terbaru di atas
-            rows = cur.fetchall()
-            conn.close()
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "DB Error", str(e))
-            self.add_log(f"❌ DB Error: {str(e)}")
+    def load_users(self, show_errors=True):
+        """Ambil semua user di worker thread; tabel diperbarui di _apply_users (diff per baris)."""
+        get_async_db().submit(
+            app_db.list_users,
+            on_result=lambda rows: self._apply_users(rows, show_errors),
+            on_error=lambda e: self._on_users_error(str(e), show_errors),
+            owner=self, key="users",
+        )
+        
+    def _on_users_error(self, message, show_errors):
+        self.add_log(f"❌ DB Error: {message}")
+        if show_errors:
+            QtWidgets.QMessageBox.critical(self, "DB Error", message)
+        
+    def _apply_users(self, rows, show_errors=True):
+        """Hasil list_users (GUI thread). Urutan diatur UserTableModel."""
+        if rows is None:
+            self._on_users_error("database tidak bisa dihubungi", show_errors)
             return
-
-        self.table.setRowCount(0)
-        for r, (uid, uname, role) in enumerate(rows):
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(uid)))
-            self.table.setItem(r, 1, QtWidgets.QTableWidgetItem(uname))
-            self.table.setItem(r, 2, QtWidgets.QTableWidgetItem(role))
-            
-            # Status column - highlight user baru (ID tinggi)
-            if uid > self.last_user_count - len(rows) + 5:  # Rough estimation for "new"
-                status_item = QtWidgets.QTableWidgetItem("🆕 Baru")
-                status_item.setBackground(QtCore.Qt.yellow)
-            else:
-                status_item = QtWidgets.QTableWidgetItem("✅ Lama")
-            
-            self.table.setItem(r, 3, status_item)
-            
-            # Last login info (placeholder - could be enhanced with actual login tracking)
-            last_login_item = QtWidgets.QTableWidgetItem("N/A")
-            self.table.setItem(r, 4, last_login_item)
-            
-        self.table.resizeColumnsToContents()
         
-        # Update last user count
-        if rows:
-            self.last_user_count = len(rows)
+        inserted, updated, removed = self.user_model.set_rows(rows)
+        if updated or removed:
+            self.add_log(f"🔄 Tabel user: {inserted} baru, {updated} berubah, {removed} dihapus")
+        
+        # Watermark feed user baru (auto_check_new_users). Refresh ini bisa
+        # mendahului hasil feed; user di atas watermark lama tetap di-alert di
+        # sini (feed lalu tidak menemukan apa-apa lagi). Muatan awal: tanpa alert.
+        previous_id = self.last_user_id
+        self.last_user_id = max([previous_id or 0] + [r[0] for r in rows])
+        if previous_id is not None:
+            new_ids = sorted(r[0] for r in rows if r[0] > previous_id)
+            if new_ids:
+                self._alert_new_users(new_ids)
             
         # Log user view action
         self.log_admin_activity("VIEW_USERS", f"Viewed user list - {len(rows)} users total")
@@ -772,18 +1250,15 @@ Admin: {self.username}
             QtWidgets.QMessageBox.information(self, "Info", "Pilih minimal satu baris.")
             return
         lines = []
-        for idx in sel:
-            rid = self.table.item(idx.row(), 0).text()
-            uname = self.table.item(idx.row(), 1).text()
-            role = self.table.item(idx.row(), 2).text()
-            status = self.table.item(idx.row(), 3).text()
+        records = [self.user_model.record(idx.row()) for idx in sel]
+        for rid, uname, role, status in records:
             lines.append(f"{rid}\t{uname}\t{role}\t{status}")
         QtWidgets.QApplication.clipboard().setText("\n".join(lines))
         QtWidgets.QMessageBox.information(self, "Disalin", "Data user sudah disalin ke clipboard.")
         self.add_log(f"📋 Data {len(sel)} user disalin ke clipboard")
         
         # Log copy action
-        copied_users = [self.table.item(idx.row(), 1).text() for idx in sel]
+        copied_users = [uname for _, uname, _, _ in records]
         self.log_admin_activity("COPY_USER_DATA", f"Copied data for users: {', '.join(copied_users)}")
         
     def add_log(self, message):
@@ -799,6 +1274,9 @@ Admin: {self.username}
     def closeEvent(self, event):
         """Override close event untuk stop timer dan log logout."""
         self.stop_auto_refresh()
+        self.retention_timer.stop()
+        self.retention_cancel.set()
+        self.export_cancel.set()
         self.add_log("🔴 Enhanced Admin dashboard ditutup")
         self.log_admin_activity("ADMIN_LOGOUT", f"Admin {self.username} logged out from dashboard")
         event.accept()
\ No newline at end of file
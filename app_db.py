@@ -1,249 +1,1135 @@
 # app_db.py — Railway PostgreSQL helpers + presence + news (penerbit)
-import os, sys, configparser, hashlib
-from typing import Optional, Tuple, List
+import os, sys, re, configparser, hashlib, threading, atexit, socket, json, base64
+import csv, io, datetime
+import functools, inspect
+from contextlib import contextmanager
+from typing import Optional, Tuple, List, Dict
 import psycopg2
+from psycopg2 import OperationalError, DatabaseError
+
+from db_pool import ConnectionPool, PooledConnection, PoolTimeout
+from db_cache import QueryCache
+from db_migrations import NOTIFY_CHANNEL, SCHEMA_VERSION, current_version, run_migrations
 
 # ---------- Config ----------
 def _app_dir() -> str:
+    """Get application directory (works for both script and frozen exe)"""
     if getattr(sys, "frozen", False):
         return os.path.dirname(sys.executable)  # saat sudah jadi EXE
     return os.path.dirname(os.path.abspath(__file__))
 
-def _load_database_url() -> Optional[str]:
-    # 1) config.ini (tahan BOM)
+def _read_config() -> Optional[configparser.ConfigParser]:
+    """Read config.ini (BOM-safe). Returns None if missing or unreadable."""
     ini = os.path.join(_app_dir(), "config.ini")
-    if os.path.exists(ini):
+    if not os.path.exists(ini):
+        return None
+    try:
         cfg = configparser.ConfigParser()
         cfg.read(ini, encoding="utf-8-sig")
-        if "server" in cfg and "DATABASE_URL" in cfg["server"]:
-            return cfg["server"]["DATABASE_URL"].strip()
+        return cfg
+    except Exception as e:
+        print(f"⚠️ Error reading config.ini: {e}")
+        return None
+
+def _load_database_url() -> Optional[str]:
+    """Load DATABASE_URL from config.ini, environment, or .env file"""
+    # 1) config.ini
+    cfg = _read_config()
+    if cfg is not None and "server" in cfg and "DATABASE_URL" in cfg["server"]:
+        url = cfg["server"]["DATABASE_URL"].strip()
+        if url and url.startswith("postgresql://"):
+            return url
+        print("⚠️ Invalid DATABASE_URL format in config.ini")
 
     # 2) ENV
     url = os.getenv("DATABASE_URL")
-    if url:
+    if url and url.startswith("postgresql://"):
         return url
 
     # 3) .env (opsional)
     envp = os.path.join(_app_dir(), ".env")
     if os.path.exists(envp):
-        with open(envp, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip().startswith("DATABASE_URL="):
-                    return line.split("=", 1)[1].strip().strip('"').strip("'")
+        try:
+            with open(envp, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip().startswith("DATABASE_URL="):
+                        return line.split("=", 1)[1].strip().strip('"').strip("'")
+        except Exception as e:
+            print(f"⚠️ Error reading .env: {e}")
     return None
 
+def _load_pool_settings() -> dict:
+    """Pool settings from the optional [pool] section of config.ini."""
+    settings = {"min_size": 1, "max_size": 5, "max_idle_seconds": 300.0}
+    cfg = _read_config()
+    if cfg is not None and "pool" in cfg:
+        sec = cfg["pool"]
+        try:
+            settings["min_size"] = sec.getint("MIN_SIZE", settings["min_size"])
+            settings["max_size"] = sec.getint("MAX_SIZE", settings["max_size"])
+            settings["max_idle_seconds"] = sec.getfloat("MAX_IDLE_SECONDS", settings["max_idle_seconds"])
+        except ValueError as e:
+            print(f"⚠️ Invalid [pool] setting in config.ini: {e}")
+    return settings
+
+def _load_relay_settings() -> Optional[dict]:
+    """Heartbeat relay from the optional [relay] section. None = kirim langsung ke DB."""
+    cfg = _read_config()
+    if cfg is None or "relay" not in cfg or not cfg["relay"].get("PORT", "").strip():
+        return None
+    sec = cfg["relay"]
+    try:
+        return {
+            "host": sec.get("HOST", "127.0.0.1").strip(),
+            "port": sec.getint("PORT"),
+            "flush_seconds": sec.getfloat("FLUSH_SECONDS", 5.0),
+            "timeout": sec.getfloat("TIMEOUT_SECONDS", 1.0),
+            "token": sec.get("TOKEN", "").strip(),
+        }
+    except ValueError as e:
+        print(f"⚠️ Invalid [relay] setting in config.ini: {e}")
+        return None
+
+# TTL (detik) per query yang di-cache; 0 = tidak di-cache
+CACHE_TTLS: Dict[str, float] = {
+    "list_my_news": 30.0,
+    "list_my_news_page": 30.0,
+    "news_stats": 30.0,
+    "list_published_news": 30.0,
+    "list_published_news_page": 30.0,
+    "latest_presence_per_user": 5.0,
+    "online_users": 5.0,
+}
+
+def _load_cache_settings() -> dict:
+    """
+    Query cache from the optional [cache] section of config.ini.
+    TTL per query bisa di-override dengan TTL_<NAMA_FUNGSI>, mis. TTL_NEWS_STATS=60.
+    """
+    settings = {"enabled": True, "max_entries": 256}
+    cfg = _read_config()
+    if cfg is not None and "cache" in cfg:
+        sec = cfg["cache"]
+        try:
+            settings["enabled"] = sec.getboolean("ENABLED", settings["enabled"])
+            settings["max_entries"] = sec.getint("MAX_ENTRIES", settings["max_entries"])
+            for name in CACHE_TTLS:
+                CACHE_TTLS[name] = sec.getfloat(f"TTL_{name.upper()}", CACHE_TTLS[name])
+        except ValueError as e:
+            print(f"⚠️ Invalid [cache] setting in config.ini: {e}")
+    return settings
+
 DATABASE_URL: Optional[str] = _load_database_url()
+POOL_SETTINGS: dict = _load_pool_settings()
+RELAY_SETTINGS: Optional[dict] = _load_relay_settings()
+CACHE_SETTINGS: dict = _load_cache_settings()
 
-# ---------- Core DB ----------
-def connect() -> Tuple[Optional[psycopg2.extensions.connection], Optional[str]]:
-    if not DATABASE_URL:
-        print("❌ DATABASE_URL tidak ditemukan (cek config.ini / .env)")
+# ---------- Connection pool ----------
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> Optional[ConnectionPool]:
+    """Return the process-wide pool (created lazily). None if DATABASE_URL is missing."""
+    global _pool
+    if _pool is None and DATABASE_URL:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DATABASE_URL,
+                    minconn=POOL_SETTINGS["min_size"],
+                    maxconn=POOL_SETTINGS["max_size"],
+                    max_idle=POOL_SETTINGS["max_idle_seconds"],
+                    sslmode="require",
+                    connect_timeout=10,
+                )
+    return _pool
+
+def pool_stats() -> dict:
+    """Pool counters (checkouts, waits, created, ...). Empty dict if no pool."""
+    pool = _pool
+    return pool.stats() if pool else {}
+
+def close_pool() -> None:
+    """Close all pooled connections (dipanggil otomatis saat proses keluar)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+atexit.register(close_pool)
+
+def _checkout():
+    """Take a connection from the pool, printing a helpful message on failure."""
+    pool = get_pool()
+    if pool is None:
+        print("❌ DATABASE_URL tidak ditemukan!")
+        print("   Pastikan file config.ini ada dan berisi DATABASE_URL yang valid.")
+        print("   Atau set environment variable DATABASE_URL.")
         return None, None
     try:
-        conn = psycopg2.connect(DATABASE_URL, sslmode="require")
-        return conn, "postgres"
+        return pool, pool.getconn()
+    except OperationalError as e:
+        print(f"❌ Database connection failed (Operational Error):")
+        print(f"   {str(e)}")
+        print("\n   Possible causes:")
+        print("   - Internet connection issue")
+        print("   - Wrong credentials in DATABASE_URL")
+        print("   - Database server is down")
+        print("   - Firewall blocking connection")
+    except PoolTimeout as e:
+        print(f"❌ Database pool exhausted: {str(e)}")
+    except DatabaseError as e:
+        print(f"❌ Database error: {str(e)}")
     except Exception as e:
-        print(f"❌ PostgreSQL connection failed: {e}")
-        return None, None
+        print(f"❌ Unexpected error connecting to database: {str(e)}")
+    return pool, None
+
+@contextmanager
+def get_connection():
+    """
+    Pinjam koneksi dari pool:
+
+        with get_connection() as conn:
+            if not conn:
+                return ...
+            cur = conn.cursor()
+            ...
+            conn.commit()
 
-def setup_database() -> None:
-    conn, _ = connect()
-    if not conn:
-        print("✖ Cannot setup database: Connection failed")
+    Yields None if the database is unreachable. The connection goes back to the
+    pool on exit; anything not committed is rolled back.
+    """
+    pool, conn = _checkout()
+    if conn is None:
+        _skip_cache()
+        yield None
         return
-    cur = conn.cursor()
-
-    # Tabel users
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            username VARCHAR(100) UNIQUE NOT NULL,
-            password VARCHAR(256) NOT NULL,
-            role VARCHAR(50) DEFAULT 'user'
-        );
-    """)
-
-    # Tabel presence
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS user_sessions (
-          id SERIAL PRIMARY KEY,
-          username VARCHAR(100) NOT NULL,
-          started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-          last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-          status     VARCHAR(16) NOT NULL DEFAULT 'online'
-        );
-    """)
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_username ON user_sessions(username);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_last_seen ON user_sessions(last_seen);")
-
-    # Tabel berita (khusus role 'penerbit')
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS news (
-          id SERIAL PRIMARY KEY,
-          title VARCHAR(200) NOT NULL,
-          content TEXT NOT NULL,
-          author VARCHAR(100) NOT NULL,                -- username penerbit
-          status VARCHAR(20) NOT NULL DEFAULT 'draft', -- 'draft' / 'published'
-          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-        );
-    """)
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_created_at ON news(created_at DESC);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_author ON news(author);")
-
-    conn.commit()
-    conn.close()
-    print("✅ Database setup completed (postgres)")
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+# ---------- Query cache ----------
+# Hasil baca yang sering diminta beberapa widget sekaligus di-cache per proses.
+# Penulisan lewat app_db (create_news, start/end_session, create_user) dan
+# NOTIFY dari client lain (db_notify) meng-invalidate tag yang terkait.
+_cache = QueryCache(maxsize=CACHE_SETTINGS["max_entries"])
+_cache_local = threading.local()
+
+def _skip_cache() -> None:
+    """Tandai hasil panggilan saat ini (error/fallback) supaya tidak di-cache."""
+    _cache_local.skip = True
+
+def _cached(tags):
+    """
+    Decorator: cache hasil fungsi selama CACHE_TTLS[nama fungsi] detik.
+    tags(args) -> iterable tag untuk invalidate_cache; args = argumen yang
+    sudah di-bind (termasuk default), jadi f(a) dan f(a, limit=50) satu key.
+    """
+    def decorator(fn):
+        name = fn.__name__
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ttl = CACHE_TTLS.get(name, 0)
+            if not CACHE_SETTINGS["enabled"] or ttl <= 0:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple(bound.arguments.items())
+            hit, value = _cache.get(key)
+            if hit:
+                return value
+            generation = _cache.generation
+            _cache_local.skip = False
+            value = fn(*args, **kwargs)
+            if not _cache_local.skip:
+                _cache.set(key, value, ttl, tags(bound.arguments), generation=generation)
+            return value
+        return wrapper
+    return decorator
+
+def _author_news_tags(args) -> tuple:
+    return ("news", f"news:author:{args['author']}")
+
+def _published_news_tags(args) -> tuple:
+    return ("news", "news:published")
+
+def _presence_tags(args) -> tuple:
+    return ("presence",)
+
+def invalidate_cache(table: Optional[str] = None, author: Optional[str] = None) -> None:
+    """
+    Buang entry cache yang terpengaruh perubahan di `table`
+    (tanpa argumen = kosongkan semua). Untuk news, author membatasi ke
+    data author itu + feed publik.
+    """
+    if table is None:
+        _cache.clear()
+    elif table == "news":
+        if author:
+            _cache.invalidate(f"news:author:{author}", "news:published")
+        else:
+            _cache.invalidate("news")
+    elif table in ("users", "user_sessions", "user_presence"):
+        _cache.invalidate("presence")
+
+def cache_stats() -> dict:
+    """Cache counters (hits, misses, evictions, expired, invalidated, size, hit_rate)."""
+    return _cache.stats()
+
+# ---------- Core DB ----------
+def connect() -> Tuple[Optional[PooledConnection], Optional[str]]:
+    """
+    Legacy API: returns (connection, "postgres") or (None, None) on failure.
+    The connection comes from the pool; conn.close() returns it to the pool.
+    """
+    pool, conn = _checkout()
+    if conn is None:
+        return None, None
+    return PooledConnection(pool, conn), "postgres"
+
+def connect_direct():
+    """
+    Koneksi non-pool untuk pemakaian jangka panjang (mis. LISTEN di db_notify).
+    Raises on failure; caller owns and closes the connection.
+    """
+    if not DATABASE_URL:
+        raise OperationalError("DATABASE_URL tidak ditemukan")
+    return psycopg2.connect(DATABASE_URL, sslmode="require", connect_timeout=10)
+
+# ---------- Schema (lihat db_migrations) ----------
+def schema_version() -> Optional[int]:
+    """Versi schema di database (satu query). None jika database tidak bisa dihubungi."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            return current_version(conn)
+    except Exception as e:
+        print(f"❌ Error checking schema version: {str(e)}")
+        return None
+
+def setup_database() -> bool:
+    """
+    Bawa schema ke SCHEMA_VERSION. Returns True if successful, False otherwise.
+    Jika schema sudah terkini, biayanya hanya satu SELECT tanpa DDL.
+    """
+    try:
+        with get_connection() as conn:
+            if not conn:
+                print("✖ Cannot setup database: Connection failed")
+                return False
+            version, applied = run_migrations(conn)
+        if applied:
+            print(f"✅ Database migrated to schema v{version} (applied: {', '.join(map(str, applied))})")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error setting up database tables: {str(e)}")
+        return False
+
+# ---------- Error classification ----------
+# Dengan raise_errors=True, fungsi tulis (create_news, end_session, heartbeat)
+# meneruskan exception ke pemanggil (write_journal) alih-alih mengembalikan
+# False, supaya bisa dibedakan: jaringan/DB sedang bermasalah (coba lagi nanti)
+# vs data yang ditolak server (tidak akan pernah berhasil). False tetap berarti
+# database tidak bisa dihubungi.
+_TERMINAL_ERRORS = (
+    psycopg2.DataError,          # mis. title lebih panjang dari kolomnya
+    psycopg2.IntegrityError,     # constraint / NOT NULL / FK
+    psycopg2.ProgrammingError,   # SQL atau kolom tidak cocok dengan schema
+    psycopg2.NotSupportedError,
+    TypeError, ValueError, KeyError,  # payload rusak
+)
+
+def is_terminal_error(exc: BaseException) -> bool:
+    """True jika tulisan yang gagal dengan exc tidak ada gunanya diulang."""
+    return isinstance(exc, _TERMINAL_ERRORS)
 
 # ---------- Users ----------
 def user_exists(username: str) -> bool:
-    conn, _ = connect()
-    if not conn:
+    """Check if user exists in database. Returns False on error."""
+    if not username:
         return False
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM users WHERE username=%s", (username,))
-    r = cur.fetchone()
-    conn.close()
-    return bool(r)
 
-def create_user(username: str, password: str, role: str = "user") -> bool:
-    conn, _ = connect()
-    if not conn:
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            cur.execute("SELECT 1 FROM users WHERE username=%s", (username,))
+            r = cur.fetchone()
+        return bool(r)
+    except Exception as e:
+        print(f"❌ Error checking user existence: {str(e)}")
         return False
-    cur = conn.cursor()
-    hashed = hashlib.sha256(password.encode()).hexdigest()
-    cur.execute(
-        "INSERT INTO users (username, password, role) VALUES (%s,%s,%s) "
-        "ON CONFLICT (username) DO NOTHING",
-        (username, hashed, role),
-    )
-    conn.commit()
-    conn.close()
-    return True
+
+REGISTER_CREATED = "created"
+REGISTER_TAKEN = "taken"
+REGISTER_ERROR = "error"
+
+def register_user(username: str, password: str, role: str = "user") -> str:
+    """
+    Daftarkan user baru dengan satu INSERT ... ON CONFLICT DO NOTHING RETURNING id.
+    Returns REGISTER_CREATED, REGISTER_TAKEN (username sudah dipakai), atau
+    REGISTER_ERROR (input kosong / DB error). Tidak ada jeda antara cek dan
+    insert, jadi dua pendaftaran bersamaan tidak bisa sama-sama "berhasil".
+    """
+    if not username or not password:
+        print("❌ Username and password are required")
+        return REGISTER_ERROR
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return REGISTER_ERROR
+            cur = conn.cursor()
+            hashed = hashlib.sha256(password.encode()).hexdigest()
+            cur.execute(
+                "INSERT INTO users (username, password, role) VALUES (%s,%s,%s) "
+                "ON CONFLICT (username) DO NOTHING RETURNING id",
+                (username, hashed, role),
+            )
+            row = cur.fetchone()
+            conn.commit()
+        if row is None:
+            return REGISTER_TAKEN
+        invalidate_cache("users")
+        return REGISTER_CREATED
+    except Exception as e:
+        print(f"❌ Error creating user: {str(e)}")
+        return REGISTER_ERROR
+
+def create_user(username: str, password: str, role: str = "user") -> bool:
+    """Create new user. Returns True only if a new row was inserted."""
+    return register_user(username, password, role) == REGISTER_CREATED
 
 def verify_user(username: str, password: str) -> Optional[str]:
-    conn, _ = connect()
-    if not conn:
+    """Verify user credentials. Returns role if valid, None otherwise."""
+    if not username or not password:
+        return None
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            hashed = hashlib.sha256(password.encode()).hexdigest()
+            cur.execute("SELECT role FROM users WHERE username=%s AND password=%s", (username, hashed))
+            row = cur.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"❌ Error verifying user: {str(e)}")
+        return None
+
+def list_users() -> Optional[List[tuple]]:
+    """Semua user: [(id, username, role), ...]; None jika database tidak bisa dihubungi."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            cur.execute("SELECT id, username, role FROM users;")
+            return cur.fetchall()
+    except Exception as e:
+        print(f"❌ Error listing users: {str(e)}")
+        return None
+
+def fetch_users_since(last_id: int, limit: int = 500) -> Optional[List[tuple]]:
+    """
+    User dengan id > last_id, terlama dulu: [(id, username, role), ...] (maks limit).
+    Range scan pada primary key; None jika database tidak bisa dihubungi.
+    """
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT id, username, role FROM users
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s;
+            """, (last_id, limit))
+            return cur.fetchall()
+    except Exception as e:
+        print(f"❌ Error fetching new users: {str(e)}")
         return None
-    cur = conn.cursor()
-    hashed = hashlib.sha256(password.encode()).hexdigest()
-    cur.execute("SELECT role FROM users WHERE username=%s AND password=%s", (username, hashed))
-    row = cur.fetchone()
-    conn.close()
-    return row[0] if row else None
 
 # ---------- Presence (online tracking) ----------
+# user_presence menyimpan satu baris per user (status terkini) dan di-upsert oleh
+# start_session/heartbeat/end_session. user_sessions hanya histori sesi: baris
+# sesi ditutup (status + last_seen final) saat end_session atau saat user yang
+# sama login lagi setelah client crash.
 ONLINE_WINDOW_SECONDS = 45  # dianggap online jika heartbeat < 45 detik
 
 def start_session(username: str) -> Optional[int]:
-    conn, _ = connect()
-    if not conn:
+    """Start user session. Returns session_id or None on error."""
+    if not username:
         return None
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO user_sessions (username, status) VALUES (%s, 'online') RETURNING id;",
-        (username,)
-    )
-    sid = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
-    return sid
-
-def heartbeat(session_id: int) -> bool:
-    conn, _ = connect()
-    if not conn:
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            cur.execute("""
+                WITH prev AS (
+                    -- sesi lama yang tidak sempat end_session (client crash)
+                    UPDATE user_sessions s
+                    SET status = 'offline', last_seen = p.last_seen
+                    FROM user_presence p
+                    WHERE p.username = %(u)s AND s.id = p.session_id AND s.status = 'online'
+                ), new_session AS (
+                    INSERT INTO user_sessions (username, status)
+                    VALUES (%(u)s, 'online')
+                    RETURNING id, username, last_seen
+                )
+                INSERT INTO user_presence (username, session_id, status, last_seen)
+                SELECT username, id, 'online', last_seen FROM new_session
+                ON CONFLICT (username) DO UPDATE
+                    SET session_id = EXCLUDED.session_id,
+                        status     = 'online',
+                        last_seen  = EXCLUDED.last_seen
+                RETURNING session_id;
+            """, {"u": username})
+            sid = cur.fetchone()[0]
+            conn.commit()
+        invalidate_cache("user_sessions")
+        return sid
+    except Exception as e:
+        print(f"❌ Error starting session: {str(e)}")
+        return None
+
+def login(username: str, password: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Cek kredensial + buat sesi dalam satu statement (satu koneksi, satu round-trip).
+    Returns (role, session_id), atau (None, None) jika kredensial salah / DB error.
+    Menggantikan verify_user() lalu start_session().
+    """
+    if not username or not password:
+        return None, None
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None, None
+            cur = conn.cursor()
+            hashed = hashlib.sha256(password.encode()).hexdigest()
+            cur.execute("""
+                WITH auth AS (
+                    SELECT username, role FROM users
+                    WHERE username = %(u)s AND password = %(p)s
+                ), prev AS (
+                    -- sama seperti start_session: tutup sesi lama yang tertinggal
+                    UPDATE user_sessions s
+                    SET status = 'offline', last_seen = p.last_seen
+                    FROM user_presence p, auth a
+                    WHERE p.username = a.username AND s.id = p.session_id AND s.status = 'online'
+                ), new_session AS (
+                    INSERT INTO user_sessions (username, status)
+                    SELECT username, 'online' FROM auth
+                    RETURNING id, username, last_seen
+                ), presence AS (
+                    INSERT INTO user_presence (username, session_id, status, last_seen)
+                    SELECT username, id, 'online', last_seen FROM new_session
+                    ON CONFLICT (username) DO UPDATE
+                        SET session_id = EXCLUDED.session_id,
+                            status     = 'online',
+                            last_seen  = EXCLUDED.last_seen
+                    RETURNING session_id
+                )
+                SELECT a.role, pr.session_id FROM auth a LEFT JOIN presence pr ON TRUE;
+            """, {"u": username, "p": hashed})
+            row = cur.fetchone()
+            conn.commit()
+        if not row:
+            return None, None
+        invalidate_cache("user_sessions")
+        return row[0], row[1]
+    except Exception as e:
+        print(f"❌ Error during login: {str(e)}")
+        return None, None
+
+def _relay_heartbeat(session_id: int) -> bool:
+    """Kirim heartbeat ke heartbeat_relay.py. False jika relay tidak bisa dihubungi."""
+    try:
+        with socket.create_connection((RELAY_SETTINGS["host"], RELAY_SETTINGS["port"]),
+                                      timeout=RELAY_SETTINGS["timeout"]) as s:
+            token = f" {RELAY_SETTINGS['token']}" if RELAY_SETTINGS["token"] else ""
+            s.sendall(f"HB {int(session_id)}{token}\n".encode("ascii"))
+            return s.recv(16).startswith(b"OK")
+    except OSError:
+        return False
+
+def heartbeat(session_id: int, raise_errors: bool = False) -> bool:
+    """
+    Update session heartbeat. Returns True if successful.
+    Jika [relay] dikonfigurasi, heartbeat dikirim ke relay (di-batch di sana);
+    kalau relay mati, otomatis fallback ke UPDATE langsung.
+    raise_errors: lihat is_terminal_error.
+    """
+    if not session_id:
         return False
-    cur = conn.cursor()
-    cur.execute("UPDATE user_sessions SET last_seen = NOW() WHERE id = %s;", (session_id,))
-    conn.commit()
-    conn.close()
-    return True
-
-def end_session(session_id: int) -> None:
-    conn, _ = connect()
-    if not conn:
-        return
-    cur = conn.cursor()
-    cur.execute("UPDATE user_sessions SET status='offline', last_seen=NOW() WHERE id=%s;", (session_id,))
-    conn.commit()
-    conn.close()
 
+    if RELAY_SETTINGS and _relay_heartbeat(session_id):
+        return True
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            # Heartbeat terlambat (setelah end_session) tidak menghidupkan sesi lagi
+            cur.execute(
+                "UPDATE user_presence SET last_seen = NOW() WHERE session_id = %s AND status = 'online';",
+                (session_id,)
+            )
+            conn.commit()
+        return True
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"⚠️ Heartbeat failed: {str(e)}")
+        return False
+
+def heartbeat_batch(items: List[Tuple[int, float]]) -> bool:
+    """
+    Tulis banyak heartbeat sekaligus: [(session_id, age_seconds), ...].
+    age_seconds = berapa detik lalu heartbeat diterima relay. Sesi yang sudah
+    offline tidak dihidupkan lagi dan last_seen tidak pernah mundur.
+    """
+    if not items:
+        return True
+
+    try:
+        from psycopg2.extras import execute_values
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            execute_values(cur, """
+                UPDATE user_presence p
+                SET last_seen = v.seen
+                FROM (
+                    SELECT sid, NOW() - make_interval(secs => age) AS seen
+                    FROM (VALUES %s) AS raw(sid, age)
+                ) AS v
+                WHERE p.session_id = v.sid
+                  AND p.status = 'online'
+                  AND p.last_seen < v.seen;
+            """, items, template="(%s::int, %s::float8)", page_size=1000)
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"⚠️ Batched heartbeat failed: {str(e)}")
+        return False
+
+def end_session(session_id: int, ended_at: Optional[str] = None,
+                raise_errors: bool = False) -> bool:
+    """
+    End user session. Returns True if successful.
+    ended_at (ISO timestamp) dipakai saat replay dari write_journal supaya
+    last_seen = waktu logout sebenarnya, bukan waktu replay.
+    raise_errors: lihat is_terminal_error.
+    """
+    if not session_id:
+        return False
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE user_sessions SET status='offline', last_seen=COALESCE(%s::timestamptz, NOW()) WHERE id=%s;",
+                (ended_at, session_id)
+            )
+            cur.execute(
+                "UPDATE user_presence SET status='offline', last_seen=COALESCE(%s::timestamptz, NOW()) WHERE session_id=%s;",
+                (ended_at, session_id)
+            )
+            conn.commit()
+        invalidate_cache("user_sessions")
+        return True
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"⚠️ End session failed: {str(e)}")
+        return False
+
+@_cached(_presence_tags)
 def latest_presence_per_user() -> List[tuple]:
     """
     Kembalikan [(username, role, is_online, last_seen_utc), ...]
     """
-    conn, _ = connect()
-    if not conn:
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return []
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT p.username,
+                       COALESCE(u.role, 'user') AS role,
+                       (p.status = 'online'
+                        AND p.last_seen > NOW() - make_interval(secs => %s)) AS is_online,
+                       to_char(p.last_seen AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS UTC') AS last_seen_utc
+                FROM user_presence p
+                LEFT JOIN users u ON u.username = p.username
+                ORDER BY p.username;
+            """, (ONLINE_WINDOW_SECONDS,))
+            rows = cur.fetchall()
+        return [(r[0], r[1], bool(r[2]), r[3]) for r in rows]
+    except Exception as e:
+        _skip_cache()
+        print(f"⚠️ Error fetching presence: {str(e)}")
+        return []
+
+@_cached(_presence_tags)
+def online_users() -> List[str]:
+    """Username yang sedang online (index scan pada idx_user_presence_online)."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return []
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT username FROM user_presence
+                WHERE status = 'online'
+                  AND last_seen > NOW() - make_interval(secs => %s)
+                ORDER BY username;
+            """, (ONLINE_WINDOW_SECONDS,))
+            return [r[0] for r in cur.fetchall()]
+    except Exception as e:
+        _skip_cache()
+        print(f"⚠️ Error fetching online users: {str(e)}")
         return []
-    cur = conn.cursor()
-    cur.execute(f"""
-        WITH latest AS (
-            SELECT username, MAX(last_seen) AS ls
-            FROM user_sessions
-            GROUP BY username
-        )
-        SELECT l.username,
-               COALESCE(u.role, 'user') AS role,
-               EXISTS(
-                 SELECT 1 FROM user_sessions s
-                 WHERE s.username = l.username
-                   AND s.last_seen = l.ls
-                   AND s.status = 'online'
-                   AND s.last_seen > NOW() - INTERVAL '{ONLINE_WINDOW_SECONDS} seconds'
-               ) AS is_online,
-               to_char(l.ls AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS UTC') AS last_seen_utc
-        FROM latest l
-        LEFT JOIN users u ON u.username = l.username
-        ORDER BY l.username;
-    """)
-    rows = cur.fetchall()
-    conn.close()
-    return [(r[0], r[1], bool(r[2]), r[3]) for r in rows]
 
 # ---------- NEWS (untuk role 'penerbit') ----------
-def create_news(author: str, title: str, content: str, publish: bool = True) -> bool:
-    """Simpan berita baru. Jika publish=True -> status='published'."""
-    conn, _ = connect()
-    if not conn:
+NEWS_TITLE_MAX_LENGTH = 200  # news.title VARCHAR(200)
+
+def create_news(author: str, title: str, content: str, publish: bool = True,
+                client_key: Optional[str] = None, raise_errors: bool = False) -> bool:
+    """
+    Simpan berita baru. Jika publish=True -> status='published'.
+    client_key (UUID, dari write_journal) membuat insert idempotent: kalau
+    sudah pernah masuk, dianggap sukses tanpa baris baru.
+    raise_errors: lihat is_terminal_error.
+    """
+    if not author or not title or not content:
         return False
-    cur = conn.cursor()
-    status = 'published' if publish else 'draft'
-    cur.execute(
-        "INSERT INTO news (title, content, author, status) VALUES (%s, %s, %s, %s);",
-        (title, content, author, status)
-    )
-    conn.commit(); conn.close()
-    return True
 
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            status = 'published' if publish else 'draft'
+            cur.execute("""
+                INSERT INTO news (title, content, author, status, client_key)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (client_key) DO NOTHING;
+            """, (title, content, author, status, client_key))
+            conn.commit()
+        invalidate_cache("news", author)
+        return True
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"❌ Error creating news: {str(e)}")
+        return False
+
+@_cached(_author_news_tags)
 def list_my_news(author: str, limit: int = 50) -> List[tuple]:
     """Ambil daftar berita milik author (terbaru dulu)."""
-    conn, _ = connect()
-    if not conn:
+    if not author:
+        return []
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return []
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT id, title, status, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')
+                FROM news
+                WHERE author=%s
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s;
+            """, (author, limit))
+            rows = cur.fetchall()
+        return rows  # [(id, title, status, created_at), ...]
+    except Exception as e:
+        _skip_cache()
+        print(f"⚠️ Error fetching news: {str(e)}")
         return []
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id, title, status, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')
-        FROM news
-        WHERE author=%s
-        ORDER BY created_at DESC
-        LIMIT %s;
-    """, (author, limit))
-    rows = cur.fetchall()
-    conn.close()
-    return rows  # [(id, title, status, created_at), ...]
 
+@_cached(_author_news_tags)
+def news_stats(author: str) -> Dict[str, int]:
+    """
+    Jumlah artikel milik author: {"total", "published", "draft"}.
+    Dibaca dari news_author_stats (O(1)); jika author belum punya baris counter,
+    dihitung langsung dengan COUNT(*) FILTER lewat idx_news_author.
+    """
+    stats = {"total": 0, "published": 0, "draft": 0}
+    if not author:
+        return stats
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return stats
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT total, published, draft
+                FROM news_author_stats
+                WHERE author=%s;
+            """, (author,))
+            row = cur.fetchone()
+            if row is None:
+                cur.execute("""
+                    SELECT COUNT(*),
+                           COUNT(*) FILTER (WHERE status = 'published'),
+                           COUNT(*) FILTER (WHERE status = 'draft')
+                    FROM news
+                    WHERE author=%s;
+                """, (author,))
+                row = cur.fetchone()
+        stats["total"], stats["published"], stats["draft"] = (int(v or 0) for v in row)
+        return stats
+    except Exception as e:
+        _skip_cache()
+        print(f"⚠️ Error fetching news stats: {str(e)}")
+        return stats
+
+@_cached(_published_news_tags)
 def list_published_news(limit: int = 50) -> List[tuple]:
-    """(opsional) Ambil feed publik."""
-    conn, _ = connect()
-    if not conn:
+    """Ambil feed publik."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return []
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT id, title, author, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')
+                FROM news
+                WHERE status='published'
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s;
+            """, (limit,))
+            rows = cur.fetchall()
+        return rows
+    except Exception as e:
+        _skip_cache()
+        print(f"⚠️ Error fetching published news: {str(e)}")
+        return []
+
+# ---------- NEWS pagination (keyset) ----------
+# Token "halaman berikutnya" = posisi (created_at, id) baris terakhir, di-encode
+# base64 supaya UI memperlakukannya sebagai string opaque.
+def _encode_cursor(created_at, news_id: int) -> str:
+    if not isinstance(created_at, str):  # news_replica menyimpan ISO string
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, int(news_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode("ascii")
+
+def _decode_cursor(token: str) -> Tuple[str, int]:
+    created_at, news_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    return str(created_at), int(news_id)
+
+def _fetch_news_page(where: str, params: tuple, columns: str,
+                     page_size: int, cursor: Optional[str]) -> Optional[Tuple[List[tuple], Optional[str]]]:
+    """Shared keyset query: newest first, page_size rows after `cursor`. None = offline."""
+    sql = f"SELECT {columns}, created_at FROM news WHERE {where}"
+    if cursor:
+        created_at, news_id = _decode_cursor(cursor)
+        sql += " AND (created_at, id) < (%s::timestamptz, %s)"
+        params = params + (created_at, news_id)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT %s;"
+    params = params + (page_size + 1,)  # +1 untuk tahu masih ada halaman berikutnya
+
+    with get_connection() as conn:
+        if not conn:
+            return None
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_cursor(rows[-1][-1], rows[-1][0])
+    return [r[:-1] for r in rows], next_cursor
+
+def _replica_page(method: str, *args) -> Tuple[List[tuple], Optional[str]]:
+    """Offline fallback: halaman yang sama dari news_replica (SQLite lokal)."""
+    _skip_cache()
+    try:
+        from news_replica import get_replica
+        return getattr(get_replica(), method)(*args)
+    except Exception as e:
+        print(f"⚠️ News replica unavailable: {str(e)}")
+        return [], None
+
+@_cached(_author_news_tags)
+def list_my_news_page(author: str, page_size: int = 50,
+                      cursor: Optional[str] = None) -> Tuple[List[tuple], Optional[str]]:
+    """
+    Satu halaman berita milik author (terbaru dulu).
+    Returns ([(id, title, status, created_at), ...], next_cursor);
+    next_cursor None berarti sudah halaman terakhir.
+    Jika database tidak bisa dihubungi, halaman diambil dari news_replica.
+    """
+    if not author:
+        return [], None
+
+    try:
+        page = _fetch_news_page(
+            "author=%s", (author,),
+            "id, title, status, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')",
+            page_size, cursor,
+        )
+    except Exception as e:
+        print(f"⚠️ Error fetching news page: {str(e)}")
+        page = None
+    if page is None:
+        return _replica_page("list_my_news_page", author, page_size, cursor)
+    return page
+
+@_cached(_published_news_tags)
+def list_published_news_page(page_size: int = 50,
+                             cursor: Optional[str] = None) -> Tuple[List[tuple], Optional[str]]:
+    """
+    Satu halaman feed publik.
+    Returns ([(id, title, author, created_at), ...], next_cursor).
+    Jika database tidak bisa dihubungi, halaman diambil dari news_replica.
+    """
+    try:
+        page = _fetch_news_page(
+            "status='published'", (),
+            "id, title, author, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')",
+            page_size, cursor,
+        )
+    except Exception as e:
+        print(f"⚠️ Error fetching published news page: {str(e)}")
+        page = None
+    if page is None:
+        return _replica_page("list_published_news_page", page_size, cursor)
+    return page
+
+# ---------- Search ----------
+SEARCH_MARK_START = "<mark>"
+SEARCH_MARK_STOP = "</mark>"
+
+def _to_prefix_tsquery(query: str) -> Optional[str]:
+    """'bitcoin hal' -> 'bitcoin:* & hal:*' (prefix match untuk as-you-type)."""
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{t}:*" for t in terms[:8])
+
+def search_news(query: str, author: Optional[str] = None,
+                status: Optional[str] = None, limit: int = 50) -> List[tuple]:
+    """
+    Full-text search di judul + isi berita, diurutkan ts_rank (judul lebih berbobot).
+    Returns [(id, title, author, status, created_at, title_hl, snippet), ...];
+    title_hl dan snippet berisi penanda SEARCH_MARK_START/STOP di sekitar kata yang cocok.
+    """
+    tsquery = _to_prefix_tsquery(query or "")
+    if not tsquery:
+        return []
+
+    where = ["search_vector @@ q"]
+    params: list = [tsquery]
+    if author:
+        where.append("author=%s")
+        params.append(author)
+    if status:
+        where.append("status=%s")
+        params.append(status)
+    params.append(limit)
+
+    # ts_headline mahal (mem-parse ulang content), jadi hanya untuk baris
+    # yang lolos LIMIT di subquery.
+    headline_opts = f"StartSel={SEARCH_MARK_START}, StopSel={SEARCH_MARK_STOP}"
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return []
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT id, title, author, status,
+                       to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC'),
+                       ts_headline('simple', title, q, %s),
+                       ts_headline('simple', content, q, %s)
+                FROM (
+                    SELECT id, title, content, author, status, created_at, q,
+                           ts_rank(search_vector, q) AS rank
+                    FROM news, to_tsquery('simple', %s) AS q
+                    WHERE {" AND ".join(where)}
+                    ORDER BY rank DESC, created_at DESC, id DESC
+                    LIMIT %s
+                ) AS hits
+                ORDER BY rank DESC, created_at DESC, id DESC;
+            """, (f"{headline_opts}, HighlightAll=true",
+                  f"{headline_opts}, MaxWords=25, MinWords=10, MaxFragments=2",
+                  *params))
+            rows = cur.fetchall()
+        return rows
+    except Exception as e:
+        print(f"⚠️ Error searching news: {str(e)}")
         return []
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id, title, author, to_char(created_at AT TIME ZONE 'UTC','YYYY-MM-DD HH24:MI UTC')
-        FROM news
-        WHERE status='published'
-        ORDER BY created_at DESC
-        LIMIT %s;
-    """, (limit,))
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+
+# ---------- Fleet activity log (activity_events) ----------
+# (occurred_at, source, username, action, category, details, target_user, success, client_host)
+ACTIVITY_EVENT_COLUMNS = ("occurred_at", "source", "username", "action", "category",
+                          "details", "target_user", "success", "client_host")
+
+_partitions_month: Optional[str] = None  # bulan terakhir partisi dicek oleh proses ini
+
+def _ensure_activity_partitions(cur) -> None:
+    """Buat partisi bulan ini + 2 bulan ke depan, sekali per bulan per proses."""
+    global _partitions_month
+    month = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m")
+    if _partitions_month != month:
+        cur.execute("SELECT activity_events_ensure_partitions(2);")
+        _partitions_month = month
+
+def ingest_activity_events(events: List[tuple]) -> bool:
+    """
+    Kirim satu batch event (urutan kolom ACTIVITY_EVENT_COLUMNS) dengan COPY,
+    plus upsert rollup harian, dalam satu transaksi. False = batch perlu dikirim ulang.
+    """
+    global _partitions_month
+    if not events:
+        return True
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows(events)
+    buf.seek(0)
+
+    # Rollup dihitung di client: satu upsert per (day, source, category, username)
+    daily: Dict[tuple, List[int]] = {}
+    for occurred_at, source, username, _action, category, _details, _target, success, _host in events:
+        key = (occurred_at[:10], source, category, username or "")
+        counts = daily.setdefault(key, [0, 0])
+        counts[0] += 1
+        counts[1] += 0 if success else 1
+    # Urutan key tetap -> client yang upsert bersamaan tidak saling deadlock
+    rollup = [key + tuple(daily[key]) for key in sorted(daily)]
+
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            _ensure_activity_partitions(cur)
+            cur.copy_expert(
+                f"COPY activity_events ({', '.join(ACTIVITY_EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+            values = ",".join(["(%s, %s, %s, %s, %s, %s)"] * len(rollup))
+            cur.execute(f"""
+                INSERT INTO activity_events_daily AS d (day, source, category, username, events, failures)
+                VALUES {values}
+                ON CONFLICT (day, source, category, username) DO UPDATE
+                SET events = d.events + EXCLUDED.events, failures = d.failures + EXCLUDED.failures;
+            """, [v for row in rollup for v in row])
+            conn.commit()
+        return True
+    except Exception as e:
+        _partitions_month = None  # DDL partisi ikut di-rollback
+        print(f"⚠️ Activity event ingest failed ({len(events)} events): {str(e)}")
+        return False
+
+def fleet_activity_stats() -> Optional[Dict[str, int]]:
+    """
+    Kartu monitoring untuk semua client: {"total_logins", "active_today",
+    "failed_attempts", "admin_actions"}. None jika database tidak bisa dihubungi.
+    """
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT
+                  COALESCE(SUM(events)   FILTER (WHERE source='user' AND category='LOGIN'), 0),
+                  COUNT(DISTINCT username) FILTER (WHERE source='user' AND category='LOGIN'
+                                                   AND day = (NOW() AT TIME ZONE 'UTC')::date),
+                  COALESCE(SUM(failures) FILTER (WHERE source='user' AND category='LOGIN'), 0),
+                  COALESCE(SUM(events)   FILTER (WHERE source='admin'), 0)
+                FROM activity_events_daily;
+            """)
+            total_logins, active_today, failed, admin_actions = cur.fetchone()
+        return {"total_logins": int(total_logins), "active_today": int(active_today),
+                "failed_attempts": int(failed), "admin_actions": int(admin_actions)}
+    except Exception as e:
+        print(f"⚠️ Error reading fleet activity stats: {str(e)}")
+        return None
+
+def recent_activity_events(limit: int = 50, source: str = "user") -> Optional[List[tuple]]:
+    """[(occurred_at, username, action, details, success, client_host), ...] terbaru dulu."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT occurred_at, username, action, details, success, client_host
+                FROM activity_events
+                WHERE source = %s
+                ORDER BY occurred_at DESC
+                LIMIT %s;
+            """, (source, limit))
+            return cur.fetchall()
+    except Exception as e:
+        print(f"⚠️ Error reading recent activity events: {str(e)}")
+        return None
+
+def fleet_activity_report(days: int) -> Optional[dict]:
+    """
+    Ringkasan periode dari rollup harian (presisi 1 hari):
+    {"total": n, "unique_users": n, "top_users": [(username, count), ...]}.
+    """
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return None
+            cur = conn.cursor()
+            since = "(NOW() AT TIME ZONE 'UTC')::date - %s"
+            cur.execute(f"""
+                SELECT COALESCE(SUM(events), 0),
+                       COUNT(DISTINCT username) FILTER (WHERE category = 'LOGIN')
+                FROM activity_events_daily
+                WHERE source = 'user' AND day > {since};
+            """, (days,))
+            total, unique_users = cur.fetchone()
+            cur.execute(f"""
+                SELECT NULLIF(username, ''), SUM(events) AS n
+                FROM activity_events_daily
+                WHERE source = 'user' AND day > {since}
+                GROUP BY username ORDER BY n DESC LIMIT 10;
+            """, (days,))
+            top_users = [(name, int(n)) for name, n in cur.fetchall()]
+        return {"total": int(total), "unique_users": int(unique_users), "top_users": top_users}
+    except Exception as e:
+        print(f"⚠️ Error building fleet activity report: {str(e)}")
+        return None
+
+# ---------- Health Check ----------
+def health_check() -> bool:
+    """Check if database connection is healthy."""
+    try:
+        with get_connection() as conn:
+            if not conn:
+                return False
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            result = cur.fetchone()
+        return result is not None
+    except Exception:
+        return False
@@ -14,10 +14,10 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QPropertyAnimation, QEasingCurve, QParallelAnimationGroup
 
 # Backend
-from app_db_fixed import (
-    verify_user, create_user, user_exists, setup_database,
-    start_session, health_check
+from db_async import (
+    get_async_db, verify_and_start_session, init_database
 )
+from app_db import REGISTER_CREATED, REGISTER_TAKEN
 
 # Modern notification
 from modern_notification import ModernNotification
@@ -95,6 +95,9 @@ class AnimatedButton(QtWidgets.QPushButton):
             self.setText(self._original_text)
             self.setEnabled(True)
     
+    def isLoading(self):
+        return self._loading
+    
     def _update_loading(self):
         """Update loading animation"""
         dots = "." * (self.loading_dots % 4)
@@ -381,21 +384,32 @@ class AuthWindow(QtWidgets.QWidget):
         self._init_database()
 
     def _init_database(self):
-        """Initialize database with error handling"""
-        try:
-            if not health_check():
-                self.show_error(
-                    "Database Connection Failed",
-                    "Tidak dapat terhubung ke database.\n\n"
-                    "Pastikan:\n"
-                    "• File config.ini ada dan berisi DATABASE_URL yang benar\n"
-                    "• Koneksi internet aktif\n"
-                    "• Credential database valid"
-                )
-                return
-            setup_database()
-        except Exception as e:
-            self.show_error("Database Error", f"Error saat inisialisasi database:\n{str(e)}")
+        """Initialize database di background (health check + setup tabel)"""
+        get_async_db().submit(
+            init_database,
+            on_result=self._on_database_ready,
+            on_error=lambda e: self.show_error("Database Error", f"Error saat inisialisasi database:\n{str(e)}"),
+            owner=self,
+        )
+
+    def _on_database_ready(self, result):
+        healthy, setup_ok = result
+        if healthy and not setup_ok:
+            self.show_error(
+                "Database Setup Failed",
+                "Terhubung ke database, tetapi setup/migrasi schema gagal.\n\n"
+                "Pastikan user database punya izin membuat/mengubah tabel,\n"
+                "lalu jalankan ulang aplikasi."
+            )
+        elif not healthy:
+            self.show_error(
+                "Database Connection Failed",
+                "Tidak dapat terhubung ke database.\n\n"
+                "Pastikan:\n"
+                "• File config.ini ada dan berisi DATABASE_URL yang benar\n"
+                "• Koneksi internet aktif\n"
+                "• Credential database valid"
+            )
 
     def switchPage(self, index: int):
         """Switch between login and register with animation"""
@@ -431,19 +445,24 @@ class AuthWindow(QtWidgets.QWidget):
         if not u or not p:
             return self.toast("Isi username dan password.", "warning")
         
-        # Show loading
-        self.btn_login.setLoading(True)
+        if self.btn_login.isLoading():
+            return
         
-        # Simulate async with QTimer (biar ada animasi loading)
-        QtCore.QTimer.singleShot(500, lambda: self._do_login(u, p))
+        # Show loading (query jalan di worker thread, animasi tetap hidup)
+        self.btn_login.setLoading(True)
+        get_async_db().submit(
+            verify_and_start_session, u, p,
+            on_result=lambda result: self._do_login(u, result),
+            on_error=lambda e: self._on_db_error(self.btn_login, e),
+            owner=self,
+        )
     
-    def _do_login(self, u, p):
-        """Actual login logic"""
-        role = verify_user(u, p)
+    def _do_login(self, u, result):
+        """Actual login logic (GUI thread, setelah app_db.login)"""
+        role, sid = result
         self.btn_login.setLoading(False)
         
         if role:
-            sid = start_session(u)
             if sid is None:
                 return self.show_error(
                     "Session Error",
@@ -478,21 +497,25 @@ class AuthWindow(QtWidgets.QWidget):
             return self.toast("Password minimal 4 karakter.", "warning")
         if p1 != p2:
             return self.toast("Konfirmasi password tidak cocok.", "error")
-        if user_exists(u):
-            return self.toast("Username sudah dipakai.", "error")
+        if self.btn_register.isLoading():
+            return
         
         # Show loading
         self.btn_register.setLoading(True)
-        
-        # Simulate async
-        QtCore.QTimer.singleShot(500, lambda: self._do_register(u, p1, role))
+        get_async_db().register_user(
+            u, p1, role,
+            on_result=lambda result: self._do_register(u, role, result),
+            on_error=lambda e: self._on_db_error(self.btn_register, e),
+            owner=self,
+        )
     
-    def _do_register(self, u, p1, role):
-        """Actual registration logic"""
-        ok = create_user(u, p1, role)
+    def _do_register(self, u, role, result):
+        """Actual registration logic (GUI thread, setelah app_db.register_user)"""
         self.btn_register.setLoading(False)
         
-        if ok:
+        if result == REGISTER_TAKEN:
+            return self.toast("Username sudah dipakai.", "error")
+        if result == REGISTER_CREATED:
             self.toast(f"Akun '{u}' (role: {role}) berhasil dibuat!", "success")
             self.re_user.clear()
             self.re_pass.clear()
@@ -503,6 +526,10 @@ class AuthWindow(QtWidgets.QWidget):
         else:
             self.show_error("Registration Failed", "Gagal membuat akun.\nPeriksa koneksi database.")
 
+    def _on_db_error(self, button, error):
+        button.setLoading(False)
+        self.show_error("Database Error", str(error))
+
     def _apply_style(self):
         """Apply beautiful stylesheet"""
         self.setStyleSheet("""
@@ -8,10 +8,10 @@ import os
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 # Backend (app_db_fixed)
-from app_db_fixed import (
-    verify_user, create_user, user_exists, setup_database,
-    start_session, health_check
+from db_async import (
+    get_async_db, verify_and_start_session, init_database
 )
+from app_db_fixed import REGISTER_CREATED, REGISTER_TAKEN
 
 # Modern notification
 from modern_notification import ModernNotification
@@ -253,29 +253,31 @@ class AuthWindow(QtWidgets.QWidget):
         self._init_database()
 
     def _init_database(self):
-        """Initialize database with error handling"""
-        try:
-            # Check database health first
-            if not health_check():
-                self.show_error(
+        """Initialize database di background (health check + setup tabel)"""
+        get_async_db().submit(
+            init_database,
+            on_result=self._on_database_ready,
+            on_error=lambda e: self.show_error("Database Error", f"Error saat inisialisasi database:\n{str(e)}"),
+            owner=self,
+        )
+
+    def _on_database_ready(self, result):
+        healthy, setup_ok = result
+        if not healthy:
+            self.show_error(
                     "Database Connection Failed",
                     "Tidak dapat terhubung ke database.\n\n"
                     "Pastikan:\n"
                     "• File config.ini ada dan berisi DATABASE_URL yang benar\n"
                     "• Koneksi internet aktif\n"
                     "• Credential database valid"
-                )
-                return
-            
-            # Setup tables
-            if not setup_database():
-                self.show_error(
-                    "Database Setup Failed",
-                    "Gagal membuat tabel database.\n"
-                    "Periksa log untuk detail error."
-                )
-        except Exception as e:
-            self.show_error("Database Error", f"Error saat inisialisasi database:\n{str(e)}")
+            )
+        elif not setup_ok:
+            self.show_error(
+                "Database Setup Failed",
+                "Gagal membuat tabel database.\n"
+                "Periksa log untuk detail error."
+            )
 
     # -------- Logic --------
     def switchPage(self, index: int, immediate=False):
@@ -312,11 +314,23 @@ class AuthWindow(QtWidgets.QWidget):
         if not u or not p:
             return self.toast("Isi username dan password.", "warning")
         
-        # Verify credentials
-        role = verify_user(u, p)
+        if not self.loginCard.btn.isEnabled():
+            return
+        
+        # Verify credentials + start session di worker thread
+        self._set_busy(True)
+        get_async_db().submit(
+            verify_and_start_session, u, p,
+            on_result=lambda result: self._on_login_result(u, result),
+            on_error=self._on_db_error,
+            owner=self,
+        )
+
+    def _on_login_result(self, u, result):
+        """Handle login result (GUI thread)"""
+        self._set_busy(False)
+        role, sid = result
         if role:
-            # Start session
-            sid = start_session(u)
             if sid is None:
                 return self.show_error(
                     "Session Error",
@@ -360,12 +374,24 @@ class AuthWindow(QtWidgets.QWidget):
         if p1 != p2:
             return self.toast("Konfirmasi password tidak cocok.", "error")
         
-        if user_exists(u):
-            return self.toast("Username sudah dipakai.", "error")
+        if not self.regCard.btn.isEnabled():
+            return
         
-        # Create user
-        ok = create_user(u, p1, role)
-        if ok:
+        # INSERT ... ON CONFLICT di worker thread (satu query)
+        self._set_busy(True)
+        get_async_db().register_user(
+            u, p1, role,
+            on_result=lambda result: self._on_register_result(u, role, result),
+            on_error=self._on_db_error,
+            owner=self,
+        )
+
+    def _on_register_result(self, u, role, result):
+        """Handle registration result (GUI thread)"""
+        self._set_busy(False)
+        if result == REGISTER_TAKEN:
+            return self.toast("Username sudah dipakai.", "error")
+        if result == REGISTER_CREATED:
             self.toast(f"Akun '{u}' (role: {role}) berhasil dibuat!", "success")
             # Clear form dan switch ke login
             self.re_user.clear()
@@ -381,6 +407,15 @@ class AuthWindow(QtWidgets.QWidget):
                 "Gagal membuat akun.\nPeriksa koneksi database."
             )
 
+    def _set_busy(self, busy: bool):
+        """Kunci tombol selama request DB berjalan (cegah double submit)"""
+        self.loginCard.btn.setEnabled(not busy)
+        self.regCard.btn.setEnabled(not busy)
+
+    def _on_db_error(self, error):
+        self._set_busy(False)
+        self.show_error("Database Error", str(error))
+
     # -------- Style --------
     def _apply_qss(self):
         """Apply stylesheet"""
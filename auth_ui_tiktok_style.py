@@ -16,11 +16,11 @@ from PyQt5.QtCore import (
     QPropertyAnimation, QEasingCurve, QParallelAnimationGroup, QRect
 )
 
-# Backend
-from app_db_fixed import (
-    verify_user, create_user, user_exists, setup_database,
-    start_session, health_check
+# Backend (query dijalankan di worker thread, hasil kembali lewat Qt signal)
+from db_async import (
+    get_async_db, verify_and_start_session, init_database
 )
+from app_db import REGISTER_CREATED, REGISTER_TAKEN
 
 # Modern notification
 from modern_notification import ModernNotification
@@ -53,6 +53,8 @@ class TikTokAuthWindow(QtWidgets.QWidget):
         # Terapkan teks awal
         self.retranslateUi() 
         
+        # True selama ada request login/register yang belum selesai
+        self._db_busy = False
         self._init_database()
         
     def _define_themes(self):
@@ -589,7 +591,7 @@ class TikTokAuthWindow(QtWidgets.QWidget):
             return text
 
     def do_login(self):
-        if self.is_animating: return
+        if self.is_animating or self._db_busy: return
         username_container = self.login_username_container
         password_container = self.login_password_container 
         
@@ -605,9 +607,19 @@ class TikTokAuthWindow(QtWidgets.QWidget):
         if not u or not p: 
             return self.toast(self._get_trans_text("toast_fill_fields"), "warning")
         
-        role = verify_user(u, p)
+        self._set_db_busy(True)
+        get_async_db().submit(
+            verify_and_start_session, u, p,
+            on_result=lambda result: self._on_login_result(u, result),
+            on_error=self._on_db_error,
+            owner=self,
+        )
+    
+    def _on_login_result(self, u, result):
+        """Dipanggil di GUI thread setelah app_db.login selesai"""
+        self._set_db_busy(False)
+        role, sid = result
         if role:
-            sid = start_session(u)
             if sid is None:
                 return self.toast(self._get_trans_text("toast_session_failed"), "error")
             
@@ -624,7 +636,7 @@ class TikTokAuthWindow(QtWidgets.QWidget):
             return self.toast(self._get_trans_text("toast_wrong_user_pass"), "error")
     
     def do_register(self):
-        if self.is_animating: return
+        if self.is_animating or self._db_busy: return
         username_container = self.register_username_container
         email_container = self.register_email_container
         password_container = self.register_password_container 
@@ -647,19 +659,42 @@ class TikTokAuthWindow(QtWidgets.QWidget):
             return self.toast(self._get_trans_text("toast_username_min"), "warning")
         if len(p) < 4: 
             return self.toast(self._get_trans_text("toast_password_min"), "warning")
-        if user_exists(u):
-            return self.toast(self._get_trans_text("toast_username_taken"), "error")
         
-        ok = create_user(u, p, role) 
-        if ok:
+        self._set_db_busy(True)
+        get_async_db().register_user(
+            u, p, role,
+            on_result=lambda result: self._on_register_result(u, result),
+            on_error=self._on_db_error,
+            owner=self,
+        )
+    
+    def _on_register_result(self, u, result):
+        """Dipanggil di GUI thread setelah app_db.register_user selesai"""
+        self._set_db_busy(False)
+        if result == REGISTER_TAKEN:
+            return self.toast(self._get_trans_text("toast_username_taken"), "error")
+        if result == REGISTER_CREATED:
             self.toast(self._get_trans_text_fmt("toast_register_success", u), "success") 
-            username_input.clear()
-            email_input.clear()
-            password_input.clear() 
+            for container in (self.register_username_container,
+                              self.register_email_container,
+                              self.register_password_container):
+                field = container.findChild(QtWidgets.QLineEdit)
+                if field:
+                    field.clear()
             QtCore.QTimer.singleShot(1500, self.switch_to_login)
         else:
             self.toast(self._get_trans_text("toast_register_failed"), "error")
     
+    def _set_db_busy(self, busy: bool):
+        """Kunci tombol selama request DB berjalan (cegah double submit)"""
+        self._db_busy = busy
+        self.btn_login.setEnabled(not busy)
+        self.btn_register.setEnabled(not busy)
+    
+    def _on_db_error(self, error):
+        self._set_db_busy(False)
+        self.toast(f"{self._get_trans_text('toast_db_error')} {str(error)}", "error")
+    
     def toast(self, text: str, notification_type="info"):
         """Show notification"""
         # Judul notifikasi juga diterjemahkan
@@ -678,14 +713,18 @@ class TikTokAuthWindow(QtWidgets.QWidget):
         notif.show_notification()
     
     def _init_database(self):
-        """Initialize database"""
-        try:
-            if not health_check():
-                self.toast(self._get_trans_text("toast_db_failed"), "error")
-                return
-            setup_database()
-        except Exception as e:
-            self.toast(f"{self._get_trans_text('toast_db_error')} {str(e)}", "error")
+        """Initialize database (health check + setup) di background"""
+        get_async_db().submit(
+            init_database,
+            on_result=self._on_database_ready,
+            on_error=lambda e: self.toast(f"{self._get_trans_text('toast_db_error')} {str(e)}", "error"),
+            owner=self,
+        )
+    
+    def _on_database_ready(self, result):
+        healthy, _ = result
+        if not healthy:
+            self.toast(self._get_trans_text("toast_db_failed"), "error")
     
     def _apply_style(self, theme):
         """Apply TikTok-style stylesheet SECARA DINAMIS"""
@@ -0,0 +1,81 @@
+# bench_login.py — Bandingkan latency login lama (verify_user + start_session) vs app_db.login
+"""
+Jalankan dengan akun yang benar-benar ada:
+
+    python bench_login.py --username admin --password rahasia -n 20
+    python bench_login.py --username admin --password rahasia --cold
+
+--cold menutup pool sebelum setiap percobaan, jadi handshake TCP + TLS ikut
+terukur (kondisi login pertama setelah aplikasi dibuka). Tanpa --cold, koneksi
+dari pool dipakai ulang dan yang terukur hanya round-trip query.
+
+Setiap sesi yang dibuat langsung ditutup lagi dengan end_session.
+"""
+
+import argparse
+import statistics
+import time
+
+import app_db
+
+
+def legacy_login(username: str, password: str, cold: bool = False):
+    role = app_db.verify_user(username, password)
+    if not role:
+        return None, None
+    if cold:
+        # Sebelum ada pool, start_session membuka koneksi TLS kedua
+        app_db.close_pool()
+    return role, app_db.start_session(username)
+
+
+def measure(fn, username: str, password: str, runs: int, cold: bool):
+    timings = []
+    for _ in range(runs):
+        if cold:
+            app_db.close_pool()
+        start = time.perf_counter()
+        role, sid = fn(username, password)
+        timings.append((time.perf_counter() - start) * 1000)
+        if not role or not sid:
+            raise SystemExit("❌ Login gagal — cek username/password dan koneksi database")
+        app_db.end_session(sid)
+    return timings
+
+
+def summarize(name: str, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(f"  {name:<28} median {statistics.median(ordered):8.1f} ms   "
+          f"p95 {p95:8.1f} ms   min {ordered[0]:8.1f} ms")
+    return statistics.median(ordered)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login latency benchmark")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--cold", action="store_true",
+                        help="buka koneksi baru di setiap percobaan")
+    args = parser.parse_args()
+
+    if not app_db.DATABASE_URL:
+        raise SystemExit("❌ DATABASE_URL not set")
+
+    # Pemanasan: resolusi DNS, import psycopg2 extras, dsb. tidak ikut terukur
+    measure(app_db.login, args.username, args.password, 1, args.cold)
+
+    mode = "cold (new connection per run)" if args.cold else "warm (pooled connection)"
+    print(f"⏱️  Login latency, {args.runs} runs, {mode}")
+    legacy = summarize("verify_user + start_session",
+                       measure(lambda u, p: legacy_login(u, p, args.cold),
+                               args.username, args.password, args.runs, args.cold))
+    single = summarize("app_db.login",
+                       measure(app_db.login, args.username, args.password, args.runs, args.cold))
+    if single > 0:
+        print(f"  → app_db.login is {legacy / single:.2f}x faster (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# bench_startup.py — Ukur waktu startup semua launcher (offscreen Qt)
+"""
+Menjalankan setiap launcher di proses terpisah dengan QT_QPA_PLATFORM=offscreen
+dan `python -X importtime`, lalu mencatat:
+
+- first_window_ms : waktu sampai window top-level pertama tampil (mis. splash)
+- main_window_ms  : waktu sampai window pertama yang bukan splash tampil
+- wall_ms         : total waktu proses, dari spawn sampai window utama tampil
+- imports         : waktu import kumulatif per modul project (+ PyQt5/psycopg2)
+
+Waktu diukur dari awal proses anak; koneksi database ikut terukur kalau
+launcher menunggu database (mis. warm-up di main.py).
+
+Usage:
+    python bench_startup.py                      # semua launcher, bandingkan dengan baseline
+    python bench_startup.py main.py -n 5         # satu launcher, median dari 5 run
+    python bench_startup.py --save-baseline      # simpan hasil sebagai baseline baru
+    python bench_startup.py --threshold 0.15     # regresi = lebih lambat > 15%
+
+Exit code 1 jika ada regresi terhadap baseline.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(APP_DIR, "startup_baseline.json")
+
+LAUNCHERS = (
+    "main.py",
+    "main_enhanced.py",
+    "main_beautiful.py",
+    "main_tiktok_style.py",
+    "integrated_main.py",
+    "integrated_main_with_monitoring.py",
+)
+
+# Modul pihak ketiga yang ikut dilaporkan selain modul project
+HEAVY_MODULES = ("PyQt5.QtWidgets", "PyQt5.QtGui", "PyQt5.QtCore", "psycopg2", "sqlite3")
+
+METRICS = ("first_window_ms", "main_window_ms", "wall_ms")
+
+
+# ---------- Child process ----------
+def _run_child(launcher: str, out_path: str) -> None:
+    """
+    Dijalankan di proses anak: pasang hook pada QApplication, jalankan launcher
+    seperti `python launcher.py`, dan tulis hasil ke out_path.
+    """
+    t0 = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from PyQt5 import QtCore, QtWidgets
+
+    result = {"launcher": launcher, "status": "timeout", "windows": []}
+
+    def write_result():
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+
+    class _ShowWatcher(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if (event.type() == QtCore.QEvent.Show and isinstance(obj, QtWidgets.QWidget)
+                    and obj.isWindow()):
+                ms = (time.perf_counter() - t0) * 1000
+                name = type(obj).__name__
+                result["windows"].append([name, round(ms, 1)])
+                result.setdefault("first_window_ms", round(ms, 1))
+                if isinstance(obj, QtWidgets.QMessageBox):
+                    result["status"] = "error"
+                    result["error"] = obj.text()
+                    # quit() juga menghentikan event loop modal milik msg.exec_()
+                    QtCore.QTimer.singleShot(0, QtWidgets.QApplication.quit)
+                elif "splash" not in name.lower() and "main_window_ms" not in result:
+                    result["main_window_ms"] = round(ms, 1)
+                    result["main_window_epoch"] = time.time()
+                    result["status"] = "ok"
+                    QtCore.QTimer.singleShot(0, QtWidgets.QApplication.quit)
+            return False
+
+    base = QtWidgets.QApplication
+
+    class _BenchApplication(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._bench_watcher = _ShowWatcher()
+            self.installEventFilter(self._bench_watcher)
+
+    # Launcher memakai QtWidgets.QApplication maupun `from PyQt5.QtWidgets import QApplication`
+    QtWidgets.QApplication = _BenchApplication
+
+    import runpy
+    try:
+        runpy.run_path(os.path.join(APP_DIR, launcher), run_name="__main__")
+    except SystemExit:
+        pass
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["exit_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        write_result()
+
+
+# ---------- Parent ----------
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def _project_modules() -> set:
+    return {name[:-3] for name in os.listdir(APP_DIR) if name.endswith(".py")}
+
+
+def _parse_importtime(stderr: str) -> dict:
+    """Cumulative import time (ms) untuk modul project dan HEAVY_MODULES."""
+    wanted = _project_modules() | set(HEAVY_MODULES)
+    imports = {}
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m and m.group(4) in wanted:
+            imports[m.group(4)] = round(int(m.group(2)) / 1000, 1)
+    return imports
+
+
+def run_once(launcher: str, timeout: float) -> dict:
+    fd, out_path = tempfile.mkstemp(suffix=".json", prefix="bench_startup_")
+    os.close(fd)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__),
+           "--child", launcher, "--out", out_path]
+    spawned = time.time()
+    try:
+        proc = subprocess.run(cmd, env=env, cwd=APP_DIR, capture_output=True,
+                              text=True, timeout=timeout)
+        stderr = proc.stderr
+        with open(out_path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        result = json.loads(raw) if raw else {"launcher": launcher, "status": "crashed"}
+        if result.get("status") == "crashed":
+            result["error"] = stderr.strip().splitlines()[-1] if stderr.strip() else "no output"
+    except subprocess.TimeoutExpired as e:
+        stderr = e.stderr.decode() if isinstance(e.stderr, bytes) else (e.stderr or "")
+        result = {"launcher": launcher, "status": "timeout"}
+    finally:
+        os.remove(out_path)
+    if "main_window_epoch" in result:
+        # Termasuk start interpreter + import sebelum hook terpasang
+        result["wall_ms"] = round((result.pop("main_window_epoch") - spawned) * 1000, 1)
+    result["imports"] = _parse_importtime(stderr)
+    return result
+
+
+def summarize_runs(runs: list) -> dict:
+    """Median per metrik dari run yang berhasil."""
+    ok = [r for r in runs if r.get("status") == "ok"]
+    summary = {"runs": len(runs), "ok_runs": len(ok)}
+    if not ok:
+        summary["status"] = runs[-1].get("status", "error")
+        summary["error"] = runs[-1].get("error", "")
+        return summary
+    summary["status"] = "ok"
+    for metric in METRICS:
+        values = [r[metric] for r in ok if metric in r]
+        if values:
+            summary[metric] = round(statistics.median(values), 1)
+    modules = {m for r in ok for m in r["imports"]}
+    summary["imports"] = {
+        m: round(statistics.median([r["imports"].get(m, 0.0) for r in ok]), 1)
+        for m in sorted(modules)
+    }
+    return summary
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """Returns daftar pesan regresi (kosong = aman)."""
+    regressions = []
+    for launcher, current in results.items():
+        old = baseline.get("launchers", {}).get(launcher)
+        if not old or old.get("status") != "ok":
+            continue
+        if current.get("status") != "ok":
+            regressions.append(f"{launcher}: {current.get('status')} (baseline ok)")
+            continue
+        for metric in METRICS:
+            if metric not in old or metric not in current:
+                continue
+            delta = current[metric] - old[metric]
+            if delta > min_delta_ms and delta > old[metric] * threshold:
+                regressions.append(
+                    f"{launcher}: {metric} {old[metric]:.0f} → {current[metric]:.0f} ms "
+                    f"(+{delta / old[metric] * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup / import-time benchmark for all launchers")
+    parser.add_argument("launchers", nargs="*", help=f"default: {', '.join(LAUNCHERS)}")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="runs per launcher (median)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per run")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="relative slowdown counted as regression (default 0.20 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0,
+                        help="ignore slowdowns smaller than this (noise)")
+    parser.add_argument("--json", help="also write this run's results to a JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args.child, args.out)
+        return 0
+
+    launchers = args.launchers or list(LAUNCHERS)
+    results = {}
+    for launcher in launchers:
+        if not os.path.exists(os.path.join(APP_DIR, launcher)):
+            print(f"⚠️ {launcher}: not found, skipped")
+            continue
+        runs = [run_once(launcher, args.timeout) for _ in range(args.runs)]
+        results[launcher] = summary = summarize_runs(runs)
+        if summary["status"] == "ok":
+            top = sorted(summary["imports"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+            print(f"⏱️ {launcher:<36} first window {summary.get('first_window_ms', 0):7.0f} ms   "
+                  f"main window {summary['main_window_ms']:7.0f} ms   wall {summary['wall_ms']:7.0f} ms")
+            print(f"   slowest imports: " + ", ".join(f"{m} {ms:.0f} ms" for m, ms in top))
+        else:
+            print(f"❌ {launcher:<36} {summary['status']}: {summary.get('error', '')}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "launchers": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != "launchers"})
+        baseline.setdefault("launchers", {}).update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline yet — run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print("❌ Startup regressions vs baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print("✅ No startup regressions vs baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+bulk_import_users.py
+Import banyak user sekaligus (satu kelas / satu cohort customer) dari file CSV
+atau JSONL, dalam satu koneksi dan satu transaksi.
+
+Format input:
+    CSV   : header wajib berisi username,password (role opsional)
+    JSONL : satu object per baris: {"username": "...", "password": "...", "role": "user"}
+
+Usage:
+    python bulk_import_users.py users.csv more_users.jsonl
+    python bulk_import_users.py users.csv --skip-existing --workers 8
+    python bulk_import_users.py users.csv --dry-run
+
+Alur: baca + validasi -> hash password (SHA256, sama dengan app_db) di process
+pool -> COPY ke tabel staging sementara -> satu INSERT ... ON CONFLICT ke users.
+DATABASE_URL dibaca dengan cara yang sama seperti aplikasi (config.ini / env / .env).
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+import psycopg2
+
+import app_db
+
+VALID_ROLES = ("user", "admin", "penerbit")
+
+
+def hash_pw(pw: str) -> str:
+    return hashlib.sha256(pw.encode()).hexdigest()
+
+
+def _read_csv(path: str) -> Iterator[Tuple[int, dict]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = {"username", "password"} - set(reader.fieldnames or ())
+        if missing:
+            raise SystemExit(f"ERROR: {path}: missing column(s) {', '.join(sorted(missing))}")
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _read_jsonl(path: str) -> Iterator[Tuple[int, dict]]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                print(f"⚠️ {path}:{line_no}: invalid JSON ({e})")
+                continue
+            if not isinstance(record, dict):
+                print(f"⚠️ {path}:{line_no}: expected an object")
+                continue
+            yield line_no, record
+
+
+def read_users(paths: List[str], default_role: str, lowercase: bool) -> Tuple[Dict[str, tuple], int]:
+    """
+    Returns ({username: (password, role)}, jumlah baris yang dilewati).
+    Username duplikat: baris terakhir yang dipakai.
+    """
+    users: Dict[str, tuple] = {}
+    skipped = 0
+    for path in paths:
+        reader = _read_jsonl if path.lower().endswith((".jsonl", ".ndjson")) else _read_csv
+        for line_no, record in reader(path):
+            username = str(record.get("username") or "").strip()
+            password = str(record.get("password") or "")
+            role = str(record.get("role") or default_role).strip().lower()
+            if lowercase:
+                username = username.lower()
+            problem = None
+            if not username or not password:
+                problem = "username and password are required"
+            elif len(username) > 100:
+                problem = "username longer than 100 characters"
+            elif role not in VALID_ROLES:
+                problem = f"unknown role '{role}'"
+            if problem:
+                print(f"⚠️ {path}:{line_no}: {problem} — skipped")
+                skipped += 1
+                continue
+            users[username] = (password, role)
+    return users, skipped
+
+
+def hash_passwords(passwords: List[str], workers: int) -> List[str]:
+    """Hash di process pool; workers=0 berarti di proses ini saja."""
+    if workers == 0 or len(passwords) < 1000:
+        return [hash_pw(p) for p in passwords]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(hash_pw, passwords, chunksize=chunksize))
+
+
+def open_database():
+    """
+    Buka koneksi sebelum hashing (bisa makan menit untuk file besar), supaya
+    DATABASE_URL yang hilang / salah langsung ketahuan. Gagal -> SystemExit.
+    """
+    try:
+        conn = app_db.connect_direct()
+    except psycopg2.Error as e:
+        raise SystemExit(f"ERROR: cannot connect to the database: {str(e).strip()}")
+    try:
+        conn.cursor().execute("SELECT 1")
+        conn.rollback()
+    except psycopg2.Error as e:
+        conn.close()
+        raise SystemExit(f"ERROR: database check failed: {str(e).strip()}")
+    return conn
+
+
+def load_users(conn, rows: List[Tuple[str, str, str]], skip_existing: bool) -> Tuple[int, int]:
+    """
+    COPY rows ke staging lalu merge ke users dalam satu transaksi.
+    Menutup conn (dari open_database). Returns (inserted, updated).
+    """
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+
+    conflict = ("DO NOTHING" if skip_existing else
+                "DO UPDATE SET password = EXCLUDED.password, role = EXCLUDED.role")
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TEMP TABLE users_staging (
+                username VARCHAR(100) NOT NULL,
+                password VARCHAR(256) NOT NULL,
+                role     VARCHAR(50)  NOT NULL
+            ) ON COMMIT DROP;
+        """)
+        cur.copy_expert("COPY users_staging (username, password, role) FROM STDIN WITH (FORMAT csv)", buf)
+        # xmax = 0 -> baris baru; selain itu baris lama yang di-update
+        cur.execute(f"""
+            INSERT INTO users (username, password, role)
+            SELECT username, password, role FROM users_staging
+            ON CONFLICT (username) {conflict}
+            RETURNING (xmax = 0);
+        """)
+        results = [r[0] for r in cur.fetchall()]
+        conn.commit()
+    finally:
+        conn.close()
+    inserted = sum(1 for r in results if r)
+    return inserted, len(results) - inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV/JSONL files")
+    parser.add_argument("files", nargs="+", help="CSV (username,password[,role]) or .jsonl files")
+    parser.add_argument("--default-role", default="user", choices=VALID_ROLES,
+                        help="role for rows without one (default: user)")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="leave existing users untouched instead of resetting password/role")
+    parser.add_argument("--lowercase", action="store_true", help="lowercase usernames")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="hashing processes (0 = hash in this process)")
+    parser.add_argument("--dry-run", action="store_true", help="validate and hash only, no database writes")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    users, skipped = read_users(args.files, args.default_role, args.lowercase)
+    t_read = time.perf_counter()
+    if not users:
+        raise SystemExit("ERROR: no valid rows to import.")
+
+    conn = None if args.dry_run else open_database()
+
+    names = list(users)
+    try:
+        hashes = hash_passwords([users[u][0] for u in names], args.workers)
+    except BaseException:
+        if conn is not None:
+            conn.close()
+        raise
+    rows = [(u, h, users[u][1]) for u, h in zip(names, hashes)]
+    t_hash = time.perf_counter()
+
+    inserted = updated = 0
+    if conn is not None:
+        inserted, updated = load_users(conn, rows, args.skip_existing)
+    t_load = time.perf_counter()
+
+    total = t_load - t0
+    if args.dry_run:
+        summary = "dry run, nothing written"
+    else:
+        summary = f"{inserted} inserted, {updated} updated"
+        if args.skip_existing:
+            summary += f", {len(rows) - inserted} already existed"
+    print(f"✅ {len(rows)} user(s) processed: {summary}; {skipped} invalid row(s) skipped")
+    print(f"   read {t_read - t0:.2f}s · hash {t_hash - t_read:.2f}s · "
+          f"copy+merge {t_load - t_hash:.2f}s · total {total:.2f}s "
+          f"→ {len(rows) / total if total > 0 else 0:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
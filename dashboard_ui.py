@@ -69,11 +69,11 @@ class AdminDashboardSimple(QtWidgets.QMainWindow):
         self._setup_simple_ui()
         self._apply_dark_style()
         
-        # Heartbeat
+        # Heartbeat lewat write_journal (dikirim worker, tidak memblokir event loop)
         if session_id:
-            from app_db import heartbeat
+            from write_journal import get_journal
             self.hb_timer = QtCore.QTimer(self)
-            self.hb_timer.timeout.connect(lambda: heartbeat(session_id))
+            self.hb_timer.timeout.connect(lambda: get_journal().heartbeat(session_id))
             self.hb_timer.start(20000)
     
     def _setup_simple_ui(self):
@@ -90,7 +90,7 @@ class AdminDashboardSimple(QtWidgets.QMainWindow):
         layout.addWidget(header)
         
         # Presence table
-        from app_db import latest_presence_per_user
+        from db_async import get_async_db
         
         group = QtWidgets.QGroupBox("Users Presence")
         v = QtWidgets.QVBoxLayout(group)
@@ -102,9 +102,8 @@ class AdminDashboardSimple(QtWidgets.QMainWindow):
         
         layout.addWidget(group)
         
-        # Load data
-        def load_presence():
-            rows = latest_presence_per_user()
+        # Load data (query di worker thread, isi tabel di GUI thread)
+        def fill_presence(rows):
             self.table.setRowCount(len(rows))
             for i, (uname, role, online, last_seen) in enumerate(rows):
                 self.table.setItem(i, 0, QtWidgets.QTableWidgetItem(uname))
@@ -117,13 +116,35 @@ class AdminDashboardSimple(QtWidgets.QMainWindow):
                 
                 self.table.setItem(i, 3, QtWidgets.QTableWidgetItem(last_seen or ""))
         
+        def load_presence():
+            get_async_db().latest_presence_per_user(
+                on_result=fill_presence, owner=self, key="presence"
+            )
+        
         load_presence()
         
-        # Auto-refresh
+        # Auto-refresh. Login/logout datang lewat push (NOTIFY user_sessions);
+        # polling tetap jalan untuk mendeteksi heartbeat yang kedaluwarsa.
+        from db_notify import get_change_listener
         self.refresh_timer = QtCore.QTimer(self)
         self.refresh_timer.timeout.connect(load_presence)
         self.refresh_timer.start(10000)
         
+        def set_poll_interval(push_active):
+            self.refresh_timer.setInterval(30000 if push_active else 10000)
+        
+        listener = get_change_listener()
+        listener.sessions_changed.connect(load_presence)
+        listener.users_changed.connect(load_presence)
+        listener.push_active.connect(set_poll_interval)
+        set_poll_interval(listener.is_active)
+        
+        def disconnect_push():
+            listener.sessions_changed.disconnect(load_presence)
+            listener.users_changed.disconnect(load_presence)
+            listener.push_active.disconnect(set_poll_interval)
+        self.destroyed.connect(disconnect_push)
+        
         # Logout
         self.logout_btn = QtWidgets.QPushButton("Logout")
         self.logout_btn.setStyleSheet("""
@@ -214,9 +235,9 @@ class UserDashboardSimple(QtWidgets.QMainWindow):
         # Dark theme
         self.setStyleSheet("QMainWindow, QWidget { background: #0e0f12; color: #eaeaea; }")
         
-        # Heartbeat
+        # Heartbeat lewat write_journal (dikirim worker, tidak memblokir event loop)
         if session_id:
-            from app_db import heartbeat
+            from write_journal import get_journal
             self.hb_timer = QtCore.QTimer(self)
-            self.hb_timer.timeout.connect(lambda: heartbeat(session_id))
+            self.hb_timer.timeout.connect(lambda: get_journal().heartbeat(session_id))
             self.hb_timer.start(20000)
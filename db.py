@@ -4,6 +4,9 @@ from app_db import (
     setup_database,
     user_exists,
     create_user,
+    register_user,
+    REGISTER_CREATED,
+    REGISTER_TAKEN,
     verify_user,
     DATABASE_URL,
 )
@@ -0,0 +1,160 @@
+# db_async.py — Non-blocking DB execution layer untuk dashboard Qt
+"""
+Fasad async di atas app_db.
+
+Semua fungsi app_db (verify_user, heartbeat, list_my_news, ...) bersifat
+blocking. Kalau dipanggil langsung dari slot/timer Qt, window freeze sampai
+query selesai (atau sampai connect_timeout 10 detik saat jaringan lambat).
+
+AsyncDb menjalankan fungsi tersebut di worker thread pool lalu mengirim
+hasilnya kembali ke GUI thread lewat Qt signal:
+
+    adb = get_async_db()
+    adb.list_my_news(self.username, 100,
+                     on_result=self._fill_table, owner=self)
+
+Setiap submit juga mengembalikan concurrent.futures.Future untuk kode
+non-GUI yang ingin menunggu hasilnya.
+"""
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Optional, Tuple
+
+from PyQt5 import QtCore
+
+try:
+    from PyQt5 import sip
+except ImportError:  # PyQt5 < 5.11
+    import sip
+
+import app_db
+
+
+class _Dispatcher(QtCore.QObject):
+    """Lives in the GUI thread; queued signal hops callbacks onto the event loop."""
+
+    _deliver = QtCore.pyqtSignal(object, object, object)
+
+    def __init__(self):
+        super().__init__()
+        self._deliver.connect(self._on_deliver, QtCore.Qt.QueuedConnection)
+
+    def post(self, callback: Callable, value: Any, owner: Optional[QtCore.QObject]) -> None:
+        self._deliver.emit(callback, value, owner)
+
+    @QtCore.pyqtSlot(object, object, object)
+    def _on_deliver(self, callback, value, owner):
+        # Window bisa saja sudah ditutup sebelum query selesai
+        if owner is not None and sip.isdeleted(owner):
+            return
+        callback(value)
+
+
+class AsyncDb:
+    """
+    Runs blocking DB calls on a thread pool and delivers results on the GUI thread.
+
+    Args:
+        max_workers: jumlah worker; defaultnya sama dengan ukuran maksimal pool
+                     koneksi supaya worker tidak saling menunggu koneksi.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_workers = max(1, app_db.POOL_SETTINGS["max_size"])
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="app-db")
+        self._dispatcher = _Dispatcher()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               owner: Optional[QtCore.QObject] = None,
+               key: Optional[str] = None,
+               **kwargs) -> Future:
+        """
+        Jalankan fn(*args, **kwargs) di worker thread.
+
+        on_result / on_error dipanggil di GUI thread. Jika owner (QObject) sudah
+        dihapus saat hasil tiba, callback dilewati. Jika key diberikan dan task
+        dengan key yang sama masih berjalan, task lama yang dikembalikan —
+        dipakai timer (heartbeat, auto-refresh) supaya request tidak menumpuk
+        saat jaringan lambat.
+        """
+        if key is not None:
+            with self._pending_lock:
+                running = self._pending.get(key)
+                if running is not None and not running.done():
+                    return running
+
+        future = self._executor.submit(fn, *args, **kwargs)
+
+        if key is not None:
+            with self._pending_lock:
+                self._pending[key] = future
+
+        def _done(f: Future):
+            if key is not None:
+                with self._pending_lock:
+                    if self._pending.get(key) is f:
+                        del self._pending[key]
+            if f.cancelled():
+                return
+            error = f.exception()
+            if error is not None:
+                if on_error is not None:
+                    self._dispatcher.post(on_error, error, owner)
+                else:
+                    print(f"⚠️ Async DB task {getattr(fn, '__name__', fn)} failed: {error}")
+            elif on_result is not None:
+                self._dispatcher.post(on_result, f.result(), owner)
+
+        future.add_done_callback(_done)
+        return future
+
+    def __getattr__(self, name: str):
+        """adb.verify_user(...) == adb.submit(app_db.verify_user, ...)"""
+        fn = getattr(app_db, name)
+        if not callable(fn):
+            raise AttributeError(name)
+        return functools.partial(self.submit, fn)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_instance: Optional[AsyncDb] = None
+
+
+def get_async_db() -> AsyncDb:
+    """Process-wide AsyncDb. Must be first called from the GUI thread."""
+    global _instance
+    if _instance is None:
+        _instance = AsyncDb()
+    return _instance
+
+
+# ---------- Composite tasks ----------
+def verify_and_start_session(username: str, password: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Login flow dalam satu task worker (app_db.login: satu statement, satu koneksi).
+    Returns (role, session_id); role None = kredensial salah atau DB error.
+    """
+    return app_db.login(username, password)
+
+
+def init_database() -> Tuple[bool, bool]:
+    """
+    Startup check: returns (healthy, setup_ok).
+    Cek versi schema sekaligus jadi health check; migrasi hanya jalan jika perlu.
+    """
+    version = app_db.schema_version()
+    if version is None:
+        return False, False
+    if version >= app_db.SCHEMA_VERSION:
+        return True, True
+    return True, bool(app_db.setup_database())
@@ -0,0 +1,99 @@
+# db_cache.py — In-process TTL + LRU cache untuk hasil query app_db
+"""
+Cache kecil untuk hasil query yang sering diminta beberapa widget sekaligus
+(feed, kartu statistik, tabel artikel, daftar presence).
+
+- TTL per entry (ditentukan pemanggil per jenis query)
+- batas ukuran LRU: entry yang paling lama tidak dipakai dibuang duluan
+- tag untuk invalidasi (mis. "news:author:budi" setelah create_news)
+- statistik: hits, misses, evictions, expired, invalidated
+
+Nilai yang disimpan dikembalikan apa adanya (tidak di-copy), jadi pemanggil
+tidak boleh mengubah list/dict hasil query.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Thread-safe TTL + LRU cache.
+
+    Args:
+        maxsize: jumlah entry maksimal sebelum LRU eviction
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0,
+                          "expired": 0, "invalidated": 0}
+
+    @property
+    def generation(self) -> int:
+        """Naik setiap invalidate/clear; lihat set(generation=...)."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Returns (hit, value). Entry kadaluarsa dihapus dan dihitung miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value, _ = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return True, value
+                del self._data[key]
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any, ttl: float,
+            tags: Iterable[str] = (), generation: Optional[int] = None) -> bool:
+        """
+        Simpan value selama ttl detik. Jika generation diberikan dan cache sudah
+        di-invalidate sejak itu (query dimulai sebelum data berubah), value
+        dibuang supaya data basi tidak masuk cache. Returns True jika disimpan.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._data[key] = (time.monotonic() + ttl, value, frozenset(tags))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+            return True
+
+    def invalidate(self, *tags: str) -> int:
+        """Hapus semua entry yang punya salah satu tag. Returns jumlah entry dihapus."""
+        wanted = set(tags)
+        with self._lock:
+            self._generation += 1
+            stale = [k for k, (_, _, t) in self._data.items() if t & wanted]
+            for k in stale:
+                del self._data[k]
+            self._counters["invalidated"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._counters["invalidated"] += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return dict(
+                self._counters,
+                size=len(self._data),
+                maxsize=self.maxsize,
+                hit_rate=(self._counters["hits"] / lookups) if lookups else 0.0,
+            )
@@ -0,0 +1,364 @@
+# db_migrations.py — Versioned schema migrations untuk PostgreSQL
+"""
+Schema database dikelola sebagai daftar migrasi berurutan (MIGRATIONS).
+Versi yang sudah diterapkan dicatat di tabel schema_version.
+
+- Startup normal: satu SELECT MAX(version) — tidak ada DDL sama sekali.
+- Jika ada migrasi baru: runner mengambil pg_advisory_lock, membaca ulang
+  versinya (client lain mungkin baru saja selesai), lalu menjalankan migrasi
+  yang tersisa, masing-masing dalam transaksinya sendiri.
+
+Menambah perubahan schema = menambah fungsi baru di akhir MIGRATIONS.
+Jangan mengubah migrasi yang sudah dirilis; database yang sudah menjalankannya
+tidak akan menjalankannya lagi.
+
+Migrasi 1-6 berasal dari setup_database() lama dan memakai IF NOT EXISTS,
+jadi database yang sudah ada cukup "diadopsi" tanpa perubahan.
+"""
+
+from typing import Callable, List, Tuple
+
+from psycopg2 import errors
+
+NOTIFY_CHANNEL = "app_changes"
+
+# Kunci pg_advisory_lock untuk runner migrasi (konstanta bebas, unik per aplikasi)
+MIGRATION_LOCK_KEY = 0x43494E53  # "CINS"
+
+
+# ---------- Helpers ----------
+def _ensure_trigger(cur, name: str, table: str, function: str,
+                    events: str = "INSERT OR UPDATE OR DELETE") -> None:
+    """AFTER ... FOR EACH ROW trigger, dibuat hanya jika belum ada."""
+    cur.execute(f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = '{name}' AND tgrelid = '{table}'::regclass
+            ) THEN
+                CREATE TRIGGER {name}
+                AFTER {events} ON {table}
+                FOR EACH ROW EXECUTE PROCEDURE {function};
+            END IF;
+        END $$;
+    """)
+
+
+# ---------- Migrations ----------
+def _m001_base_schema(cur) -> None:
+    # Tabel users
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(256) NOT NULL,
+            role VARCHAR(50) DEFAULT 'user'
+        );
+    """)
+
+    # Histori sesi
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_sessions (
+          id SERIAL PRIMARY KEY,
+          username VARCHAR(100) NOT NULL,
+          started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+          last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+          status     VARCHAR(16) NOT NULL DEFAULT 'online'
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_username ON user_sessions(username);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_last_seen ON user_sessions(last_seen);")
+
+    # Tabel berita (khusus role 'penerbit')
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS news (
+          id SERIAL PRIMARY KEY,
+          title VARCHAR(200) NOT NULL,
+          content TEXT NOT NULL,
+          author VARCHAR(100) NOT NULL,                -- username penerbit
+          status VARCHAR(20) NOT NULL DEFAULT 'draft', -- 'draft' / 'published'
+          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_created_at ON news(created_at DESC);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_author ON news(author);")
+
+
+def _m002_user_presence(cur) -> None:
+    # Presence terkini: satu baris per user (user_sessions = histori saja)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_presence (
+          username   VARCHAR(100) PRIMARY KEY,
+          session_id INTEGER,
+          status     VARCHAR(16) NOT NULL DEFAULT 'offline',
+          last_seen  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_presence_session ON user_presence(session_id);")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_presence_online
+        ON user_presence(last_seen) WHERE status = 'online';
+    """)
+    # Backfill dari histori (hanya saat user_presence masih kosong)
+    cur.execute("""
+        INSERT INTO user_presence (username, session_id, status, last_seen)
+        SELECT DISTINCT ON (username) username, id, status, last_seen
+        FROM user_sessions
+        WHERE NOT EXISTS (SELECT 1 FROM user_presence)
+        ORDER BY username, last_seen DESC
+        ON CONFLICT (username) DO NOTHING;
+    """)
+
+
+def _m003_news_keyset_indexes(cur) -> None:
+    # Keyset pagination (created_at, id) per author dan untuk feed publik
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_news_author_keyset
+        ON news(author, created_at DESC, id DESC);
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_news_published_keyset
+        ON news(created_at DESC, id DESC) WHERE status = 'published';
+    """)
+
+
+def _m004_change_notify_triggers(cur) -> None:
+    """
+    Trigger NOTIFY untuk users, news, dan user_sessions (db_notify.ChangeListener).
+    Payload JSON {"table", "op"} (+ "author" untuk news). Postgres menggabungkan
+    payload identik dalam satu transaksi, jadi bulk insert tetap satu notifikasi.
+    """
+    cur.execute(f"""
+        CREATE OR REPLACE FUNCTION app_notify_change() RETURNS trigger AS $$
+        DECLARE
+            payload json;
+        BEGIN
+            IF TG_TABLE_NAME = 'news' THEN
+                payload := json_build_object(
+                    'table', TG_TABLE_NAME, 'op', TG_OP,
+                    'author', CASE WHEN TG_OP = 'DELETE' THEN OLD.author ELSE NEW.author END
+                );
+            ELSE
+                payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP);
+            END IF;
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', payload::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in ("users", "news", "user_sessions"):
+        _ensure_trigger(cur, f"trg_{table}_notify", table, "app_notify_change()")
+
+
+def _m005_news_author_stats(cur) -> None:
+    """
+    Counter per author (total/published/draft) yang dijaga trigger di news,
+    supaya kartu statistik penerbit cukup membaca satu baris.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS news_author_stats (
+          author    VARCHAR(100) PRIMARY KEY,
+          total     INTEGER NOT NULL DEFAULT 0,
+          published INTEGER NOT NULL DEFAULT 0,
+          draft     INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION news_author_stats_maintain() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.author = NEW.author AND OLD.status = NEW.status THEN
+                RETURN NULL;  -- edit judul/isi tidak mengubah counter
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE news_author_stats
+                SET total     = total - 1,
+                    published = published - (OLD.status = 'published')::int,
+                    draft     = draft - (OLD.status = 'draft')::int
+                WHERE author = OLD.author;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO news_author_stats AS s (author, total, published, draft)
+                VALUES (NEW.author, 1, (NEW.status = 'published')::int, (NEW.status = 'draft')::int)
+                ON CONFLICT (author) DO UPDATE
+                SET total     = s.total + 1,
+                    published = s.published + EXCLUDED.published,
+                    draft     = s.draft + EXCLUDED.draft;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    _ensure_trigger(cur, "trg_news_author_stats", "news", "news_author_stats_maintain()")
+    # Backfill dari news (hanya saat tabel counter masih kosong)
+    cur.execute("""
+        INSERT INTO news_author_stats (author, total, published, draft)
+        SELECT author,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'published'),
+               COUNT(*) FILTER (WHERE status = 'draft')
+        FROM news
+        WHERE NOT EXISTS (SELECT 1 FROM news_author_stats)
+        GROUP BY author
+        ON CONFLICT (author) DO NOTHING;
+    """)
+
+
+def _m006_news_search(cur) -> None:
+    # Full-text search (app_db.search_news): tsvector tersimpan + GIN index.
+    # 'simple' dipakai karena konten campuran Indonesia/Inggris.
+    cur.execute("""
+        ALTER TABLE news ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED;
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_news_search ON news USING GIN(search_vector);")
+
+
+def _m007_news_client_key(cur) -> None:
+    # Idempotency key dari write_journal: replay create_news tidak menggandakan artikel
+    cur.execute("ALTER TABLE news ADD COLUMN IF NOT EXISTS client_key UUID;")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_client_key ON news(client_key);")
+
+
+def _m008_activity_events(cur) -> None:
+    """
+    Log aktivitas seluruh client (activity_shipper -> app_db.ingest_activity_events).
+    Dipartisi per bulan supaya query rentang waktu hanya menyentuh partisi
+    yang relevan dan data lama bisa di-DROP per bulan; partisi DEFAULT
+    menampung event di luar partisi yang sudah dibuat.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS activity_events (
+          occurred_at TIMESTAMPTZ NOT NULL,
+          source      VARCHAR(8)  NOT NULL,              -- 'user' / 'admin'
+          username    VARCHAR(100),
+          action      VARCHAR(64) NOT NULL,
+          category    VARCHAR(16) NOT NULL,              -- activity_logger.CATEGORY_RULES
+          details     TEXT,
+          target_user VARCHAR(100),
+          success     BOOLEAN NOT NULL DEFAULT TRUE,
+          client_host VARCHAR(255)
+        ) PARTITION BY RANGE (occurred_at);
+    """)
+    cur.execute("CREATE TABLE IF NOT EXISTS activity_events_default PARTITION OF activity_events DEFAULT;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_time ON activity_events(occurred_at);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_category ON activity_events(category, occurred_at);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_username ON activity_events(username, occurred_at);")
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION activity_events_ensure_partitions(months_ahead INTEGER DEFAULT 2)
+        RETURNS void AS $$
+        DECLARE
+            month_utc TIMESTAMP;  -- awal bulan (UTC), aritmetika tanpa zona waktu/DST
+            part_name TEXT;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('activity_events_ensure_partitions'));
+            FOR i IN 0..months_ahead LOOP
+                month_utc := date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => i);
+                part_name := 'activity_events_' || to_char(month_utc, '"y"YYYY"m"MM');
+                IF to_regclass(part_name) IS NULL THEN
+                    BEGIN
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF activity_events FOR VALUES FROM (%L) TO (%L)',
+                            part_name,
+                            month_utc AT TIME ZONE 'UTC',
+                            (month_utc + interval '1 month') AT TIME ZONE 'UTC'
+                        );
+                    EXCEPTION WHEN others THEN
+                        -- mis. partisi DEFAULT sudah berisi event bulan itu
+                        RAISE WARNING 'activity_events partition % not created: %', part_name, SQLERRM;
+                    END;
+                END IF;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    cur.execute("SELECT activity_events_ensure_partitions(2);")
+    # Rollup harian, di-upsert di transaksi yang sama dengan COPY batch-nya
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS activity_events_daily (
+          day      DATE         NOT NULL,
+          source   VARCHAR(8)   NOT NULL,
+          category VARCHAR(16)  NOT NULL,
+          username VARCHAR(100) NOT NULL DEFAULT '',
+          events   BIGINT NOT NULL DEFAULT 0,
+          failures BIGINT NOT NULL DEFAULT 0,
+          PRIMARY KEY (day, source, category, username)
+        );
+    """)
+
+
+# (version, description, fn(cursor)) — urut, jangan diubah setelah rilis
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "base schema: users, user_sessions, news", _m001_base_schema),
+    (2, "user_presence (one row per user)", _m002_user_presence),
+    (3, "news keyset pagination indexes", _m003_news_keyset_indexes),
+    (4, "LISTEN/NOTIFY change triggers", _m004_change_notify_triggers),
+    (5, "news_author_stats counters", _m005_news_author_stats),
+    (6, "news full-text search column", _m006_news_search),
+    (7, "news client_key for idempotent writes", _m007_news_client_key),
+    (8, "fleet-wide activity_events (monthly partitions)", _m008_activity_events),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------- Runner ----------
+def current_version(conn) -> int:
+    """Versi schema terpasang (0 jika schema_version belum ada). Satu query."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version;")
+        version = cur.fetchone()[0]
+    except errors.UndefinedTable:
+        version = 0
+    conn.rollback()  # jangan tinggalkan transaksi terbuka di koneksi pool
+    return version
+
+
+def run_migrations(conn) -> Tuple[int, List[int]]:
+    """
+    Terapkan migrasi yang belum ada. Returns (versi akhir, [versi yang diterapkan]).
+    Aman dijalankan beberapa client bersamaan: DDL diserialisasi lewat advisory lock.
+    """
+    if current_version(conn) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION, []
+
+    applied: List[int] = []
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_KEY,))
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+              version     INTEGER PRIMARY KEY,
+              description TEXT NOT NULL,
+              applied_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+        """)
+        conn.commit()
+        # Baca ulang setelah dapat lock: client lain mungkin sudah migrasi
+        version = current_version(conn)
+        for number, description, migrate in MIGRATIONS:
+            if number <= version:
+                continue
+            try:
+                migrate(cur)
+                cur.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s);",
+                    (number, description),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(number)
+            version = number
+        return version, applied
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+        except Exception:
+            pass  # koneksi putus -> lock sudah dilepas server
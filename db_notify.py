@@ -0,0 +1,122 @@
+# db_notify.py — LISTEN/NOTIFY push channel untuk dashboard Qt
+"""
+Background listener untuk channel app_db.NOTIFY_CHANNEL.
+
+Trigger di tabel users, news, dan user_sessions (lihat db_migrations)
+mengirim NOTIFY setiap ada perubahan. ChangeListener memegang satu koneksi
+khusus (di luar pool) di thread terpisah dan meneruskan notifikasi sebagai
+Qt signal, sehingga dashboard hanya refresh saat data benar-benar berubah.
+
+    listener = get_change_listener()
+    listener.news_changed.connect(self._on_news_changed)
+    listener.push_active.connect(self._on_push_status)
+
+Polling tetap dipakai sebagai fallback: push_active(False) dikirim saat koneksi
+listener putus, dan listener mencoba reconnect dengan backoff.
+"""
+
+import json
+import select
+import threading
+from typing import Optional
+
+from PyQt5 import QtCore
+
+import app_db
+import news_replica
+
+
+class ChangeListener(QtCore.QObject):
+    """Emits Qt signals for database change notifications."""
+
+    changed = QtCore.pyqtSignal(str, dict)     # (table, payload)
+    users_changed = QtCore.pyqtSignal()
+    news_changed = QtCore.pyqtSignal(str)      # author
+    sessions_changed = QtCore.pyqtSignal()
+    push_active = QtCore.pyqtSignal(bool)      # True = LISTEN tersambung
+
+    POLL_TIMEOUT = 5.0
+    MAX_BACKOFF = 60.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._active = False
+
+    @property
+    def is_active(self) -> bool:
+        return self._active
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---------- worker thread ----------
+    def _set_active(self, active: bool) -> None:
+        if active != self._active:
+            self._active = active
+            self.push_active.emit(active)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = app_db.connect_direct()
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {app_db.NOTIFY_CHANNEL};")
+                self._set_active(True)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    select.select([conn], [], [], self.POLL_TIMEOUT)
+                    conn.poll()  # juga mendeteksi koneksi putus saat timeout
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"⚠️ Change listener disconnected: {e} (retry in {backoff:.0f}s)")
+            finally:
+                self._set_active(False)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    def _dispatch(self, raw: str) -> None:
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return
+        table = payload.get("table", "")
+        # Buang cache dulu supaya slot yang langsung reload mendapat data baru
+        app_db.invalidate_cache(table, payload.get("author"))
+        self.changed.emit(table, payload)
+        if table == "users":
+            self.users_changed.emit()
+        elif table == "news":
+            news_replica.on_news_changed(payload.get("op", ""))
+            self.news_changed.emit(payload.get("author") or "")
+        elif table == "user_sessions":
+            self.sessions_changed.emit()
+
+
+_instance: Optional[ChangeListener] = None
+
+
+def get_change_listener() -> ChangeListener:
+    """Process-wide listener, started on first use. Call from the GUI thread."""
+    global _instance
+    if _instance is None:
+        _instance = ChangeListener()
+        _instance.start()
+    return _instance
@@ -0,0 +1,242 @@
+# db_pool.py — Process-wide PostgreSQL connection pool
+"""
+Connection pool kecil untuk psycopg2.
+
+Setiap helper di app_db dulu membuka koneksi TLS baru ke Railway lalu
+menutupnya lagi. Pool ini menyimpan koneksi yang sudah terbuka supaya
+dipakai ulang:
+- min/max size
+- idle eviction (koneksi nganggur terlalu lama ditutup)
+- liveness check saat checkout
+- context manager: `with pool.connection() as conn: ...`
+- statistik: checkouts, waits, created, discarded
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available before the timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled psycopg2 connection.
+    close() returns the connection to the pool instead of closing the socket,
+    so legacy code that does `conn, _ = connect(); ...; conn.close()` keeps working.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Args:
+        dsn: PostgreSQL connection string
+        minconn: jumlah koneksi yang dipertahankan walau idle
+        maxconn: batas koneksi terbuka (idle + dipakai)
+        max_idle: detik sebelum koneksi idle (di atas minconn) ditutup
+        check_after: koneksi yang idle lebih lama dari ini dicek dengan SELECT 1
+        timeout: detik maksimal menunggu koneksi bebas saat pool penuh
+        **connect_kwargs: diteruskan ke psycopg2.connect (sslmode, connect_timeout, ...)
+    """
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 5,
+                 max_idle: float = 300.0, check_after: float = 30.0,
+                 timeout: float = 10.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("invalid pool size (need 0 <= minconn <= maxconn, maxconn >= 1)")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = deque()   # (conn, last_used) — kanan = paling baru dipakai
+        self._size = 0         # koneksi terbuka + slot yang sedang dibuat
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._created = 0
+        self._discarded = 0
+
+    # ---------- internal ----------
+    def _new_conn(self):
+        conn = psycopg2.connect(self.dsn, **self.connect_kwargs)
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _is_alive(self, conn, last_used: float) -> bool:
+        """Liveness check: closed flag always, SELECT 1 only if idle for a while."""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self) -> None:
+        """Close connections idle longer than max_idle, keeping minconn open."""
+        now = time.monotonic()
+        while self._idle and self._size > self.minconn:
+            conn, last_used = self._idle[0]
+            if now - last_used < self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._discarded += 1
+            self._close_quietly(conn)
+
+    # ---------- public API ----------
+    def getconn(self, timeout: Optional[float] = None):
+        """Check out a live connection. Raises PoolTimeout if the pool stays exhausted."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+
+        with self._cond:
+            if self._closed:
+                raise psycopg2.InterfaceError("connection pool is closed")
+            self._evict_idle_locked()
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1  # reservasi slot, koneksi dibuat di luar lock
+                    conn, last_used = None, None
+                    break
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no free connection after {timeout:.1f}s (max={self.maxconn})")
+                self._cond.wait(remaining)
+            self._checkouts += 1
+
+        if conn is not None and not self._is_alive(conn, last_used):
+            self._close_quietly(conn)
+            with self._cond:
+                self._discarded += 1
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._new_conn()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Return a connection. Broken or discarded connections are closed."""
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._discarded += 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._evict_idle_locked()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Context manager untuk checkout/checkin otomatis.
+        Transaksi yang belum di-commit akan di-rollback saat dikembalikan.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.putconn(conn, discard=bool(conn.closed))
+            raise
+        else:
+            self.putconn(conn)
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters."""
+        with self._cond:
+            return {
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "created": self._created,
+                "discarded": self._discarded,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+            }
+
+    def closeall(self) -> None:
+        """Close idle connections and refuse new checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
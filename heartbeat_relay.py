@@ -0,0 +1,157 @@
+# heartbeat_relay.py — Relay lokal yang mengumpulkan heartbeat dari banyak client
+"""
+Heartbeat relay (opsional).
+
+Tanpa relay, setiap dashboard yang terbuka mengirim UPDATE ke Railway setiap
+20 detik. Dengan relay, client cukup mengirim satu baris TCP ke proses ini
+(biasanya di server kantor / LAN), lalu relay menggabungkan semua heartbeat
+dan menulisnya sebagai satu UPDATE ... FROM (VALUES ...) setiap beberapa detik.
+
+Protokol (satu perintah per baris; <token> hanya jika relay memakai TOKEN):
+    HB <session_id> [<token>]   -> OK
+    STATS [<token>]             -> {"received": ..., "flushed": ..., ...}
+
+Default relay hanya mendengar di 127.0.0.1. Untuk dipakai dari LAN, relay
+wajib diberi token bersama (siapa pun yang bisa menghubungi relay bisa
+menandai session id apa pun online):
+    python heartbeat_relay.py --host 0.0.0.0 --port 8765 --token <rahasia>
+
+Lalu di config.ini client:
+    [relay]
+    HOST=192.168.1.10
+    PORT=8765
+    TOKEN=<rahasia>
+"""
+
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import sys
+import time
+from typing import Dict, Optional
+
+import app_db
+
+# Perintah valid hanya puluhan byte; baris lebih panjang dari ini ditolak
+LINE_LIMIT = 1024
+
+
+class HeartbeatRelay:
+    """Buffers heartbeats in memory and flushes them in batches."""
+
+    def __init__(self, interval: float = 5.0, token: Optional[str] = None):
+        self.interval = interval
+        self.token = token or None
+        self._pending: Dict[int, float] = {}  # session_id -> monotonic time terakhir diterima
+        self.stats = {"received": 0, "flushed": 0, "batches": 0, "failed_batches": 0, "rejected": 0}
+
+    def _authorized(self, parts: list) -> Optional[list]:
+        """Perintah tanpa token (atau None jika token wajib tapi salah/tidak ada)."""
+        if not self.token:
+            return parts
+        if len(parts) < 2 or not hmac.compare_digest(parts[-1].encode(), self.token.encode()):
+            return None
+        return parts[:-1]
+
+    # ---------- server ----------
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = self._authorized(line.decode("ascii", "replace").split())
+                if parts is None:
+                    self.stats["rejected"] += 1
+                    writer.write(b"DENIED\n")
+                elif len(parts) == 2 and parts[0] == "HB" and parts[1].isdigit():
+                    self._pending[int(parts[1])] = time.monotonic()
+                    self.stats["received"] += 1
+                    writer.write(b"OK\n")
+                elif parts == ["STATS"]:
+                    payload = dict(self.stats, pending=len(self._pending))
+                    writer.write(json.dumps(payload).encode() + b"\n")
+                else:
+                    writer.write(b"ERR\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except (ValueError, asyncio.LimitOverrunError):
+            # Baris melebihi LINE_LIMIT (readline() -> ValueError): putuskan koneksi
+            self.stats["rejected"] += 1
+        finally:
+            writer.close()
+
+    # ---------- flushing ----------
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        now = time.monotonic()
+        # Kirim umur heartbeat (bukan timestamp lokal) supaya jam relay yang
+        # meleset tidak mempengaruhi last_seen di database.
+        items = [(sid, max(0.0, now - seen)) for sid, seen in batch.items()]
+        ok = await asyncio.get_running_loop().run_in_executor(None, app_db.heartbeat_batch, items)
+        if ok:
+            self.stats["flushed"] += len(items)
+            self.stats["batches"] += 1
+        else:
+            self.stats["failed_batches"] += 1
+            # Kembalikan ke buffer, kecuali sudah ada heartbeat yang lebih baru
+            for sid, seen in batch.items():
+                if self._pending.get(sid, 0.0) < seen:
+                    self._pending[sid] = seen
+
+    async def flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+async def serve(host: str, port: int, interval: float, token: Optional[str] = None) -> None:
+    relay = HeartbeatRelay(interval, token)
+    server = await asyncio.start_server(relay.handle_client, host, port, limit=LINE_LIMIT)
+    print(f"💓 Heartbeat relay listening on {host}:{port} (flush every {interval:g}s)")
+    flusher = asyncio.create_task(relay.flush_loop())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        await relay.flush()
+
+
+def main():
+    relay_cfg = app_db.RELAY_SETTINGS or {}
+    parser = argparse.ArgumentParser(description="Batching heartbeat relay for Crypto Insight")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="alamat listen; selain loopback wajib memakai --token")
+    parser.add_argument("--port", type=int, default=relay_cfg.get("port", 8765))
+    parser.add_argument("--interval", type=float, default=relay_cfg.get("flush_seconds", 5.0),
+                        help="seconds between batched UPDATEs")
+    parser.add_argument("--token", default=relay_cfg.get("token", ""),
+                        help="shared token yang wajib dikirim client (default: TOKEN di [relay])")
+    args = parser.parse_args()
+    if not args.token and not _is_loopback(args.host):
+        print(f"❌ Relay di {args.host} tanpa token akan menerima heartbeat dari siapa pun; "
+              "set --token atau TOKEN di [relay]")
+        sys.exit(2)
+    try:
+        asyncio.run(serve(args.host, args.port, args.interval, args.token))
+    except KeyboardInterrupt:
+        print("👋 Heartbeat relay stopped")
+
+
+if __name__ == "__main__":
+    main()
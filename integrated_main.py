@@ -2,7 +2,7 @@
 import sys
 import uuid
 from PyQt5 import QtWidgets, QtCore, QtGui
-from db import init_db, connect, user_exists, create_user
+from db import init_db, connect, register_user, REGISTER_CREATED, REGISTER_TAKEN
 from admin_dashboard import AdminDashboard
 from user_dashboard import UserDashboard
 from logger_system import crypto_logger, log_login, log_logout, log_activity, log_admin, log_security
@@ -156,13 +156,14 @@ class RegisterDialog(QtWidgets.QDialog):
             self.msg.setText("Konfirmasi password tidak cocok.")
             log_security("REGISTRATION_FAILED", u, "Password confirmation mismatch", severity="INFO")
             return
-        if user_exists(u):
-            self.msg.setText("Username sudah dipakai.")
-            log_security("REGISTRATION_FAILED", u, "Username already exists", severity="WARNING")
-            return
-
         try:
-            create_user(u, p, role)
+            result = register_user(u, p, role)
+            if result == REGISTER_TAKEN:
+                self.msg.setText("Username sudah dipakai.")
+                log_security("REGISTRATION_FAILED", u, "Username already exists", severity="WARNING")
+                return
+            if result != REGISTER_CREATED:
+                raise RuntimeError("database error")
             # Log successful registration
             log_activity("SYSTEM", "USER_REGISTERED", f"New user registered: {u} with role: {role}")
             log_security("USER_REGISTERED", u, f"Successfully registered with role: {role}", severity="INFO")
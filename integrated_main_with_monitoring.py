@@ -1,11 +1,10 @@
 # integrated_main_with_monitoring.py - Main file dengan Enhanced Admin Dashboard
 import sys
 from PyQt5 import QtWidgets, QtCore, QtGui
-from db import init_db, connect, user_exists, create_user
+from db import init_db, connect, register_user, REGISTER_CREATED, REGISTER_TAKEN
 from admin_dashboard import EnhancedAdminDashboard
 from user_dashboard import UserDashboard
-import sqlite3
-import datetime
+from activity_logger import get_activity_logger
 
 ACCENT = "#4F46E5"   # indigo
 ACCENT_HOVER = "#4338CA"
@@ -77,15 +76,8 @@ def ghost_button(text):
     return btn
 
 def log_user_activity(username, action, details="", success=True):
-    """Log user activity to monitoring database."""
-    try:
-        with sqlite3.connect("admin_monitoring.db") as conn:
-            conn.execute("""
-                INSERT INTO user_activities (username, action, details, success)
-                VALUES (?, ?, ?, ?)
-            """, (username, action, details, success))
-    except Exception as e:
-        print(f"Logging error: {e}")
+    """Log user activity to monitoring database (antre, ditulis batch di background)."""
+    get_activity_logger().log_user(username, action, details, success)
 
 class RegisterDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
@@ -167,13 +159,14 @@ class RegisterDialog(QtWidgets.QDialog):
             self.msg.setText("Konfirmasi password tidak cocok.")
             log_user_activity(u, "REGISTRATION_FAILED", "Password confirmation mismatch", False)
             return
-        if user_exists(u):
-            self.msg.setText("Username sudah dipakai.")
-            log_user_activity(u, "REGISTRATION_FAILED", "Username already exists", False)
-            return
-
         try:
-            create_user(u, p, role)
+            result = register_user(u, p, role)
+            if result == REGISTER_TAKEN:
+                self.msg.setText("Username sudah dipakai.")
+                log_user_activity(u, "REGISTRATION_FAILED", "Username already exists", False)
+                return
+            if result != REGISTER_CREATED:
+                raise RuntimeError("database error")
             log_user_activity(u, "USER_REGISTERED", f"Successfully registered with role: {role}", True)
         except Exception as e:
             self.msg.setText(f"Gagal membuat akun: {e}")
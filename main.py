@@ -1,8 +1,20 @@
 # main_enhanced.py — Launcher untuk Enhanced Auth UI
+import os
 import sys
+import time
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QTimer
 
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Splash ditutup saat semua warm-up selesai, paling lambat setelah deadline ini
+STARTUP_DEADLINE_MS = 6000
+
+# Modul dashboard yang dibuka setelah login (di-import di background)
+DASHBOARD_MODULES = ("dashboard_ui", "penerbit_dashboard", "admin_dashboard", "user_dashboard")
+
 class SplashScreen(QtWidgets.QWidget):
     """Splash screen dengan animasi loading"""
     def __init__(self):
@@ -99,11 +111,130 @@ class SplashScreen(QtWidgets.QWidget):
             }
         """)
     
+        self.status = "Loading"
+    
     def _update_loading(self):
         """Update loading animation"""
         self.dots = (self.dots + 1) % 4
         dots_text = "." * self.dots
-        self.loading_label.setText(f"Loading{dots_text}")
+        self.loading_label.setText(f"{self.status}{dots_text}")
+    
+    def set_status(self, text):
+        self.status = text
+        self.loading_label.setText(text)
+
+
+# ---------- Startup warm-up ----------
+def _warm_db_connection():
+    """Buka koneksi pertama ke pool (TCP + TLS handshake) sebelum login."""
+    import app_db
+    with app_db.get_connection() as conn:
+        if not conn:
+            raise RuntimeError("database unreachable")
+    return True
+
+def _warm_schema():
+    """Cek versi schema (migrasi hanya jika perlu). Returns (healthy, setup_ok)."""
+    from db_async import init_database
+    return init_database()
+
+def _warm_dashboards():
+    """Import modul dashboard supaya window pertama setelah login tidak menunggu import."""
+    loaded = []
+    for name in DASHBOARD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError as e:
+            print(f"⚠️ Warm-up: cannot import {name}: {e}")
+    return loaded
+
+def _warm_assets():
+    """Decode logo di background (QImage aman dipakai di luar GUI thread)."""
+    path = os.path.join(APP_DIR, "logo.jpg")
+    image = QtGui.QImage(path)
+    return None if image.isNull() else image
+
+
+class StartupWarmup(QtCore.QObject):
+    """
+    Menjalankan tugas warm-up secara paralel di thread pool dan memancarkan
+    `finished(results, timed_out)` saat semuanya selesai atau deadline lewat.
+    Durasi setiap tugas dicatat ke console (lihat log()).
+    """
+    
+    task_done = QtCore.pyqtSignal(str, object, object)  # (name, result, error)
+    finished = QtCore.pyqtSignal(dict, bool)            # (results, timed_out)
+    
+    def __init__(self, deadline_ms=STARTUP_DEADLINE_MS, parent=None):
+        super().__init__(parent)
+        self.deadline_ms = deadline_ms
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.pending = set()
+        self.done = False
+        self._started = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="warmup")
+        self.task_done.connect(self._on_task_done)
+    
+    def start(self):
+        self._started = time.perf_counter()
+        # Schema check memakai koneksi yang baru dibuka, jadi dijalankan setelahnya
+        self._submit(("db connection", _warm_db_connection), ("schema", _warm_schema))
+        self._submit(("dashboards", _warm_dashboards))
+        self._submit(("assets", _warm_assets))
+        QTimer.singleShot(self.deadline_ms, lambda: self._finish(timed_out=True))
+    
+    def _submit(self, *chain):
+        self.pending.update(name for name, _ in chain)
+        self._executor.submit(self._run_chain, chain)
+    
+    def _run_chain(self, chain):
+        """Worker thread: jalankan tugas berurutan; sisanya dilewati jika satu gagal."""
+        error = None
+        for name, fn in chain:
+            if error is None:
+                t0 = time.perf_counter()
+                try:
+                    result = fn()
+                except Exception as e:
+                    result, error = None, e
+                self.timings[name] = time.perf_counter() - t0
+            else:
+                result = None
+            self.task_done.emit(name, result, error)  # queued ke GUI thread
+    
+    def _on_task_done(self, name, result, error):
+        self.pending.discard(name)
+        if error is None:
+            self.results[name] = result
+        else:
+            self.errors[name] = error
+        if not self.pending:
+            self._finish(timed_out=False)
+    
+    def _finish(self, timed_out):
+        if self.done:
+            return
+        self.done = True
+        self._executor.shutdown(wait=False)  # tugas yang lambat tetap jalan di background
+        self.log(timed_out)
+        self.finished.emit(self.results, timed_out)
+    
+    def log(self, timed_out):
+        total = (time.perf_counter() - self._started) * 1000
+        parts = []
+        for name in ("db connection", "schema", "dashboards", "assets"):
+            if name in self.errors:
+                parts.append(f"{name} failed ({self.errors[name]})")
+            elif name in self.pending:
+                parts.append(f"{name} still running")
+            elif name in self.timings:
+                parts.append(f"{name} {self.timings[name] * 1000:.0f} ms")
+        status = f"deadline {self.deadline_ms} ms hit" if timed_out else "ready"
+        print(f"⏱️ Startup warm-up {status} in {total:.0f} ms: " + ", ".join(parts))
+
 
 def main():
     """Launch Enhanced Auth UI"""
@@ -127,11 +258,15 @@ def main():
         # Show splash
         splash.show()
         
-        # Create main window
-        main_window = EnhancedAuthWindow()
+        # Create main window (DB dicek oleh warm-up, bukan oleh window)
+        main_window = EnhancedAuthWindow(init_db=False)
         
         # Function to switch windows
-        def show_main_window():
+        def show_main_window(results, timed_out):
+            assets = results.get("assets")
+            if assets is not None:
+                app.setWindowIcon(QtGui.QIcon(QtGui.QPixmap.fromImage(assets)))
+            
             splash.loading_timer.stop()
             splash.close()
             
@@ -141,9 +276,24 @@ def main():
             main_window.move(center_pos)
             
             main_window.show()
-
-        # Switch after 2.5 seconds
-        QTimer.singleShot(2500, show_main_window)
+            
+            if "schema" in results:
+                main_window._on_database_ready(results["schema"])
+            elif not timed_out:
+                main_window._on_database_ready((False, False))
+            else:
+                # Database belum menjawab sebelum deadline: lanjutkan cek seperti biasa
+                main_window._init_database()
+        
+        def on_task_done(name, result, error):
+            if warmup.pending:
+                splash.set_status(f"Loading ({len(warmup.pending)} left)")
+        
+        # Tutup splash begitu warm-up selesai (atau deadline lewat)
+        warmup = StartupWarmup(parent=app)
+        warmup.task_done.connect(on_task_done)
+        warmup.finished.connect(show_main_window)
+        warmup.start()
         
         sys.exit(app.exec_())
         
@@ -0,0 +1,178 @@
+# monitoring_export.py — Export admin_monitoring.db ke JSONL / CSV (opsional gzip), streaming
+"""
+Export lama melakukan SELECT * ke dict lalu json.dump(indent=2) di GUI thread;
+jutaan baris = jutaan objek di memori dan UI beku. export_monitoring_data()
+membaca per EXPORT_BATCH baris (fetchmany) dan langsung menulis ke file, jadi
+memori konstan. Dijalankan dari background thread.
+
+Format ditentukan dari nama file:
+- *.jsonl / *.jsonl.gz : baris pertama {"export_info": {...}}, lalu satu objek
+  per baris dengan kunci "table" + kolom tabel.
+- *.csv / *.csv.gz     : satu header (table + gabungan kolom kedua tabel);
+  kolom yang tidak dimiliki tabel dikosongkan.
+Akhiran .gz -> dikompres gzip saat ditulis.
+
+Filter waktu since/until (UTC, format timestamp SQLite 'YYYY-MM-DD HH:MM:SS';
+since inklusif, until eksklusif) memakai index timestamp. File ditulis ke
+<out_path>.part dan di-rename setelah selesai; dibatalkan/gagal -> dihapus.
+
+    summary = export_monitoring_data("monitoring.jsonl.gz", since="2025-01-01 00:00:00")
+"""
+
+import csv
+import datetime
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from activity_logger import MONITORING_DB
+
+EXPORT_BATCH = 5000          # baris per fetchmany
+PROGRESS_INTERVAL = 1.0      # detik antar pesan throughput
+EXPORT_TABLES = ("user_activities", "admin_actions")
+
+
+def export_format(out_path: str) -> tuple:
+    """(format, gzip?) dari nama file, mis. 'x.csv.gz' -> ('csv', True)."""
+    name = out_path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    fmt = "csv" if name.endswith(".csv") else "jsonl"
+    return fmt, compress
+
+
+def _time_filter(since: Optional[str], until: Optional[str]) -> tuple:
+    clauses, params = [], []
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+def _open(path: str, compress: bool):
+    # newline="" supaya csv module yang mengatur akhir baris
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_monitoring_data(out_path: str,
+                           path: str = MONITORING_DB,
+                           since: Optional[str] = None,
+                           until: Optional[str] = None,
+                           admin: str = "",
+                           batch_size: int = EXPORT_BATCH,
+                           progress: Optional[Callable[[int, int], None]] = None,
+                           message: Optional[Callable[[str], None]] = None,
+                           cancel: Optional[threading.Event] = None) -> dict:
+    """
+    Export kedua tabel monitoring ke out_path. progress(done, total) tiap
+    batch; message(str) berisi throughput tiap PROGRESS_INTERVAL detik.
+    Returns ringkasan: format, baris per tabel, bytes, detik, rows_per_sec, cancelled.
+    """
+    fmt, compress = export_format(out_path)
+    progress = progress or (lambda done, total: None)
+    message = message or (lambda text: None)
+    cancel = cancel or threading.Event()
+    where, params = _time_filter(since, until)
+
+    started = time.perf_counter()
+    summary = {"path": out_path, "format": fmt + (".gz" if compress else ""),
+               "user_activities": 0, "admin_actions": 0, "bytes": 0, "cancelled": False}
+    part_path = out_path + ".part"
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        # Satu transaksi baca: jumlah baris dan isi export dari snapshot yang sama
+        conn.execute("BEGIN")
+        totals, columns = {}, {}
+        for table in EXPORT_TABLES:
+            totals[table] = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+            columns[table] = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        total = sum(totals.values())
+        done, last_report = 0, started
+        progress(done, total)
+
+        with _open(part_path, compress) as f:
+            if fmt == "csv":
+                header = ["table"]
+                for table in EXPORT_TABLES:
+                    header += [c for c in columns[table] if c not in header]
+                writer = csv.writer(f)
+                writer.writerow(header)
+            else:
+                info = {
+                    "generated_at": datetime.datetime.now().isoformat(),
+                    "admin_user": admin,
+                    "since": since,
+                    "until": until,
+                    "total_activities": totals["user_activities"],
+                    "total_admin_actions": totals["admin_actions"],
+                }
+                f.write(json.dumps({"export_info": info}) + "\n")
+
+            for table in EXPORT_TABLES:
+                names = columns[table]
+                if fmt == "csv":
+                    slots = [header.index(c) for c in names]
+                    blank = [""] * len(header)
+                cursor = conn.execute(
+                    f"SELECT {', '.join(names)} FROM {table}{where} ORDER BY timestamp, id", params)
+                while not cancel.is_set():
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if fmt == "csv":
+                        out = []
+                        for row in rows:
+                            record = blank[:]
+                            record[0] = table
+                            for slot, value in zip(slots, row):
+                                record[slot] = value
+                            out.append(record)
+                        writer.writerows(out)
+                    else:
+                        f.write("".join(
+                            json.dumps({"table": table, **dict(zip(names, row))}, default=str) + "\n"
+                            for row in rows))
+                    summary[table] += len(rows)
+                    done += len(rows)
+                    progress(done, total)
+                    now = time.perf_counter()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        message(f"📤 Export {done:,}/{total:,} baris "
+                                f"({done / (now - started):,.0f} baris/detik)")
+                cursor.close()
+                if cancel.is_set():
+                    break
+    except BaseException:
+        _remove(part_path)
+        raise
+    finally:
+        conn.close()
+
+    summary["cancelled"] = cancel.is_set()
+    if summary["cancelled"]:
+        _remove(part_path)
+    else:
+        summary["bytes"] = os.path.getsize(part_path)
+        os.replace(part_path, out_path)
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = round(elapsed, 2)
+    summary["rows_per_sec"] = round(done / elapsed) if elapsed > 0 else done
+    return summary
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
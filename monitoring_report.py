@@ -0,0 +1,132 @@
+# monitoring_report.py — Detailed monitoring report, ditulis streaming ke file
+"""
+Report detail dulu fetchall() seluruh user_activities + admin_actions, lalu
+menyusun satu string raksasa di GUI thread. write_detailed_report() membaca
+per REPORT_BATCH baris (fetchmany) dan langsung menulis ke file, jadi memori
+tetap kecil berapa pun umur log-nya. Dijalankan dari background thread;
+progress(done, total) dipanggil tiap batch dan cancel (threading.Event)
+dicek di antara batch.
+
+File ditulis ke <out_path>.part lalu di-rename saat selesai; kalau dibatalkan
+atau gagal, file .part dihapus. Baris-baris awal (maks PREVIEW_LINES) ikut
+dikembalikan untuk preview di dialog.
+
+    summary = write_detailed_report("report.txt", admin="admin", progress=print)
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from activity_logger import MONITORING_DB
+
+REPORT_BATCH = 2000    # baris per fetchmany
+PREVIEW_LINES = 200    # baris yang ditampilkan di dialog
+
+
+def _user_activity_line(row: tuple) -> str:
+    timestamp, username, action, details, success = row
+    status = "✅" if success else "❌"
+    return f"{timestamp} | {username} | {action} | {details} {status}\n"
+
+
+def _admin_action_line(row: tuple) -> str:
+    timestamp, admin_user, action, target, details = row
+    return f"{timestamp} | {admin_user} | {action} | Target: {target} | {details}\n"
+
+
+SECTIONS = (
+    # (tabel, judul, query, formatter)
+    ("user_activities", "📋 ALL USER ACTIVITIES",
+     """SELECT timestamp, username, action, details, success
+        FROM user_activities ORDER BY timestamp DESC""",
+     _user_activity_line),
+    ("admin_actions", "🔧 ADMIN ACTIONS",
+     """SELECT timestamp, admin_username, action, target_user, details
+        FROM admin_actions ORDER BY timestamp DESC""",
+     _admin_action_line),
+)
+
+
+def write_detailed_report(out_path: str,
+                          path: str = MONITORING_DB,
+                          admin: str = "",
+                          batch_size: int = REPORT_BATCH,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          cancel: Optional[threading.Event] = None) -> dict:
+    """
+    Tulis report lengkap ke out_path. Returns ringkasan: jumlah baris per
+    tabel, ukuran file, durasi, cancelled, dan preview (baris-baris awal;
+    preview_truncated jika report lebih panjang dari PREVIEW_LINES).
+    """
+    progress = progress or (lambda done, total: None)
+    cancel = cancel or threading.Event()
+    started = time.perf_counter()
+    summary = {"path": out_path, "user_activities": 0, "admin_actions": 0,
+               "bytes": 0, "cancelled": False, "preview": "", "preview_truncated": False}
+    preview = []
+
+    def emit(f, lines):
+        f.writelines(lines)
+        room = PREVIEW_LINES - len(preview)
+        preview.extend(lines[:max(room, 0)])
+        if len(lines) > room:
+            summary["preview_truncated"] = True
+
+    part_path = out_path + ".part"
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        # Satu transaksi baca: count dan isi report dari snapshot yang sama
+        conn.execute("BEGIN")
+        totals = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table, *_ in SECTIONS}
+        total = sum(totals.values())
+        done = 0
+        progress(done, total)
+
+        with open(part_path, "w", encoding="utf-8") as f:
+            emit(f, [
+                "\n",
+                "=== COMPREHENSIVE MONITORING REPORT ===\n",
+                f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"Admin: {admin}\n",
+            ])
+            for table, title, query, line in SECTIONS:
+                emit(f, ["\n", f"{title} ({totals[table]} total):\n"])
+                cursor = conn.execute(query)
+                while not cancel.is_set():
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    emit(f, [line(row) for row in rows])
+                    summary[table] += len(rows)
+                    done += len(rows)
+                    progress(done, total)
+                cursor.close()
+                if cancel.is_set():
+                    break
+            summary["bytes"] = f.tell()
+    except BaseException:
+        _remove(part_path)
+        raise
+    finally:
+        conn.close()
+
+    summary["cancelled"] = cancel.is_set()
+    if summary["cancelled"]:
+        _remove(part_path)
+    else:
+        os.replace(part_path, out_path)
+    summary["preview"] = "".join(preview)
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
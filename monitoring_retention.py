@@ -0,0 +1,151 @@
+# monitoring_retention.py — Retensi & kompaksi admin_monitoring.db
+"""
+admin_monitoring.db dulu tumbuh tanpa batas. run_retention():
+
+1. user_activities lebih tua dari RETENTION_DAYS dihapus. Statistiknya sudah
+   tersimpan di activity_daily / activity_hourly (dijaga trigger sejak insert).
+2. admin_actions lebih tua dari RETENTION_DAYS dirangkum ke
+   admin_actions_rollup (per hari, admin, action) lalu dihapus.
+3. activity_hourly dipangkas setelah max(RETENTION_DAYS, HOURLY_MIN_DAYS) hari
+   (report periode butuh 30 hari); activity_daily disimpan selamanya.
+4. Halaman kosong dikembalikan ke OS dengan PRAGMA incremental_vacuum.
+   DB baru dibuat dengan auto_vacuum=INCREMENTAL (ensure_schema). DB lama
+   butuh satu VACUUM penuh (lock eksklusif, bisa lama) untuk beralih; itu
+   hanya dilakukan jika full_vacuum=True (tombol manual), tidak dari timer.
+
+Penghapusan berjalan per batch (PRUNE_BATCH baris, satu transaksi singkat per
+batch) supaya writer thread activity_logger tidak tertahan lama. Bisa
+dibatalkan lewat threading.Event; batch yang sudah selesai tetap tersimpan.
+
+    summary = run_retention(progress=print)
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from activity_logger import MONITORING_DB, _load_monitoring_settings, ensure_schema
+
+HOURLY_MIN_DAYS = 31   # report "Last 30 days" membaca activity_hourly
+BATCH_PAUSE = 0.05     # detik antar batch, beri giliran ke writer thread
+
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"  # sama dengan CURRENT_TIMESTAMP SQLite
+
+
+def _cutoff(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime(_TS_FORMAT)
+
+
+def _prune_batches(conn: sqlite3.Connection, table: str, cutoff: str, batch_size: int,
+                   progress: Callable[[str], None], cancel: threading.Event,
+                   before_delete: Optional[str] = None) -> int:
+    """
+    Hapus baris table dengan timestamp < cutoff, batch_size baris per transaksi.
+    before_delete (SQL dengan parameter lo, hi, cutoff) dijalankan di transaksi
+    yang sama sebelum DELETE, mis. untuk merangkum baris yang akan dihapus.
+    """
+    deleted = 0
+    while not cancel.is_set():
+        ids = conn.execute(
+            f"SELECT id FROM {table} WHERE timestamp < ? ORDER BY id LIMIT ?",
+            (cutoff, batch_size),
+        ).fetchall()
+        if not ids:
+            break
+        bounds = (ids[0][0], ids[-1][0], cutoff)
+        with conn:
+            if before_delete:
+                conn.execute(before_delete, bounds)
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE id BETWEEN ? AND ? AND timestamp < ?", bounds
+            )
+        deleted += cur.rowcount
+        progress(f"🧹 {table}: {deleted:,} baris lama dihapus...")
+        if len(ids) < batch_size:
+            break
+        time.sleep(BATCH_PAUSE)
+    return deleted
+
+
+def _incremental_vacuum(conn: sqlite3.Connection, pages: int,
+                        progress: Callable[[str], None], full_vacuum: bool = False) -> int:
+    """Kembalikan halaman kosong ke OS. Returns jumlah halaman yang dibebaskan."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        if not full_vacuum:
+            # VACUUM penuh mengunci DB; writer activity_logger bisa timeout dan kehilangan batch
+            progress("🧹 auto_vacuum belum INCREMENTAL; jalankan Compact Monitoring DB manual "
+                     "untuk VACUUM penuh (sekali saja)")
+            return 0
+        # Sekali saja: auto_vacuum baru berlaku setelah VACUUM penuh
+        progress("🧹 Mengaktifkan auto_vacuum=INCREMENTAL (VACUUM penuh, sekali saja)...")
+        before = conn.execute("PRAGMA page_count").fetchone()[0]
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return max(0, before - conn.execute("PRAGMA page_count").fetchone()[0])
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not free:
+        return 0
+    conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def run_retention(path: str = MONITORING_DB,
+                  retention_days: Optional[int] = None,
+                  batch_size: Optional[int] = None,
+                  vacuum_pages: Optional[int] = None,
+                  progress: Optional[Callable[[str], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  full_vacuum: bool = False) -> dict:
+    """
+    Jalankan satu putaran retensi. Parameter None = nilai dari [monitoring] config.ini.
+    full_vacuum: izinkan VACUUM penuh sekali untuk DB lama (hanya dari aksi manual).
+    Returns ringkasan: baris yang dihapus per tabel, halaman yang dibebaskan, durasi.
+    """
+    settings = _load_monitoring_settings()
+    days = retention_days if retention_days is not None else settings["retention_days"]
+    batch_size = batch_size or settings["prune_batch"]
+    vacuum_pages = vacuum_pages or settings["vacuum_pages"]
+    progress = progress or (lambda message: None)
+    cancel = cancel or threading.Event()
+
+    started = time.perf_counter()
+    summary = {"retention_days": days, "user_activities": 0, "admin_actions": 0,
+               "activity_hourly": 0, "pages_freed": 0, "cancelled": False}
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        ensure_schema(conn)
+        cutoff = _cutoff(days)
+        progress(f"🧹 Retensi dimulai: data sebelum {cutoff} UTC ({days} hari)")
+
+        summary["user_activities"] = _prune_batches(
+            conn, "user_activities", cutoff, batch_size, progress, cancel)
+        summary["admin_actions"] = _prune_batches(
+            conn, "admin_actions", cutoff, batch_size, progress, cancel,
+            before_delete="""
+                INSERT INTO admin_actions_rollup (day, admin_username, action, events)
+                SELECT date(timestamp), COALESCE(admin_username, ''), COALESCE(action, ''), COUNT(*)
+                FROM admin_actions
+                WHERE id BETWEEN ?1 AND ?2 AND timestamp < ?3
+                GROUP BY 1, 2, 3
+                ON CONFLICT (day, admin_username, action) DO UPDATE
+                SET events = events + excluded.events
+            """)
+        if not cancel.is_set():
+            hourly_cutoff = _cutoff(max(days, HOURLY_MIN_DAYS))
+            with conn:
+                summary["activity_hourly"] = conn.execute(
+                    "DELETE FROM activity_hourly WHERE bucket < ?", (hourly_cutoff,)
+                ).rowcount
+            summary["pages_freed"] = _incremental_vacuum(conn, vacuum_pages, progress, full_vacuum)
+        summary["cancelled"] = cancel.is_set()
+    finally:
+        conn.close()
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+
+    status = "dibatalkan" if summary["cancelled"] else "selesai"
+    progress(f"✅ Retensi {status}: {summary['user_activities']:,} aktivitas, "
+             f"{summary['admin_actions']:,} admin action, {summary['activity_hourly']:,} rollup jam "
+             f"dihapus; {summary['pages_freed']:,} halaman dibebaskan ({summary['seconds']}s)")
+    return summary
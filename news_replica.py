@@ -0,0 +1,273 @@
+# news_replica.py — Replika lokal (SQLite) untuk tabel news
+"""
+Salinan lokal news di news_replica.db (folder aplikasi) supaya dashboard tetap
+bisa menampilkan feed saat Railway tidak bisa dihubungi, dan halaman pertama
+bisa langsung tampil dari disk saat startup.
+
+Isi replika:
+- scope "published"   : semua berita berstatus published (feed publik)
+- scope "author:<u>"  : semua berita milik author u (termasuk draft)
+
+Sinkronisasi bersifat incremental: per scope disimpan watermark (created_at, id)
+baris terakhir yang sudah disalin, lalu sync berikutnya hanya mengambil baris
+yang lebih baru. Watermark dimundurkan SYNC_OVERLAP_SECONDS supaya transaksi
+yang commit terlambat (created_at lebih tua dari baris yang sudah tersalin)
+tetap ikut; baris di-upsert jadi overlap tidak menggandakan data.
+
+UPDATE/DELETE tidak terlihat dari watermark, jadi invalidate() (dipanggil saat
+ada NOTIFY UPDATE/DELETE di news) mengosongkan watermark -> sync ulang penuh.
+Isi artikel (content) tidak disalin; replika hanya untuk daftar/feed.
+
+    replica = get_replica()
+    replica.start(author="budi")          # sync di background tiap SYNC_INTERVAL
+    rows, cursor = replica.list_published_news_page(50)
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+import app_db
+
+REPLICA_FILE = "news_replica.db"
+SYNC_INTERVAL = 60.0         # detik antar sync background
+SYNC_BATCH = 1000            # baris per query saat sync
+SYNC_OVERLAP_SECONDS = 60    # mundurkan watermark untuk commit yang terlambat
+
+# ISO UTC dengan mikrodetik tetap, supaya urutan string == urutan waktu
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f+00:00"
+_EPOCH = "1970-01-01T00:00:00.000000+00:00"
+
+
+def _to_iso(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime(_TS_FORMAT)
+
+
+def _display(iso: str) -> str:
+    """Format tampilan sama dengan query server: 'YYYY-MM-DD HH:MM UTC'."""
+    return f"{iso[:10]} {iso[11:16]} UTC"
+
+
+class NewsReplica:
+    """Local SQLite copy of news with incremental background sync."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(app_db._app_dir(), REPLICA_FILE)
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._authors = set()
+        self.last_sync_ok: Optional[bool] = None
+        self._init_schema()
+
+    # ---------- storage ----------
+    @contextmanager
+    def _connect(self):
+        """Koneksi SQLite singkat: commit jika sukses, selalu ditutup."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            # WAL: sync thread menulis tanpa memblokir pembacaan dari GUI thread
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS news (
+                    id         INTEGER PRIMARY KEY,
+                    title      TEXT NOT NULL,
+                    author     TEXT NOT NULL,
+                    status     TEXT NOT NULL,
+                    created_at TEXT NOT NULL      -- ISO UTC, lihat _TS_FORMAT
+                );
+                CREATE INDEX IF NOT EXISTS idx_news_author_keyset
+                    ON news(author, created_at DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_news_published_keyset
+                    ON news(created_at DESC, id DESC) WHERE status = 'published';
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    scope        TEXT PRIMARY KEY,
+                    created_at   TEXT NOT NULL,
+                    id           INTEGER NOT NULL,
+                    synced_at    TEXT
+                );
+            """)
+
+    # ---------- reads (format sama dengan app_db.list_*_page) ----------
+    def _page(self, where: str, params: tuple, columns: str,
+              page_size: int, cursor: Optional[str]) -> Tuple[List[tuple], Optional[str]]:
+        sql = f"SELECT {columns}, created_at FROM news WHERE {where}"
+        if cursor:
+            created_at, news_id = app_db._decode_cursor(cursor)
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params = params + (_to_iso(datetime.fromisoformat(created_at)),) * 2 + (news_id,)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params = params + (page_size + 1,)
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ News replica read failed: {e}")
+            return [], None
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = app_db._encode_cursor(rows[-1][-1], rows[-1][0])
+        return [r[:-2] + (_display(r[-2]),) for r in rows], next_cursor
+
+    def list_my_news_page(self, author: str, page_size: int = 50,
+                          cursor: Optional[str] = None) -> Tuple[List[tuple], Optional[str]]:
+        """[(id, title, status, created_at), ...] milik author, dari disk."""
+        return self._page("author = ?", (author,), "id, title, status, created_at",
+                          page_size, cursor)
+
+    def list_published_news_page(self, page_size: int = 50,
+                                 cursor: Optional[str] = None) -> Tuple[List[tuple], Optional[str]]:
+        """[(id, title, author, created_at), ...] feed publik, dari disk."""
+        return self._page("status = 'published'", (), "id, title, author, created_at",
+                          page_size, cursor)
+
+    # ---------- sync ----------
+    def _watermark(self, conn: sqlite3.Connection, scope: str) -> Tuple[str, int]:
+        row = conn.execute("SELECT created_at, id FROM sync_state WHERE scope = ?",
+                           (scope,)).fetchone()
+        return (row[0], row[1]) if row else (_EPOCH, 0)
+
+    def _sync_scope(self, scope: str, where: str, params: tuple) -> int:
+        """Salin baris baru untuk satu scope. Returns jumlah baris yang ditulis."""
+        with self._connect() as local:
+            mark_ts, mark_id = self._watermark(local, scope)
+        if mark_ts != _EPOCH:
+            since = datetime.fromisoformat(mark_ts) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+            after = (_to_iso(since), 0)
+        else:
+            after = (mark_ts, 0)
+        newest = (mark_ts, mark_id)
+
+        copied = 0
+        while True:
+            with app_db.get_connection() as conn:
+                if not conn:
+                    raise ConnectionError("database unreachable")
+                cur = conn.cursor()
+                cur.execute(f"""
+                    SELECT id, title, author, status, created_at
+                    FROM news
+                    WHERE {where} AND (created_at, id) > (%s::timestamptz, %s)
+                    ORDER BY created_at, id
+                    LIMIT %s;
+                """, params + (after[0], after[1], SYNC_BATCH))
+                rows = cur.fetchall()
+                conn.rollback()
+            if not rows:
+                break
+            batch = [(r[0], r[1], r[2], r[3], _to_iso(r[4])) for r in rows]
+            after = (batch[-1][4], batch[-1][0])
+            newest = max(newest, after)
+            with self._connect() as local:
+                local.executemany("""
+                    INSERT INTO news (id, title, author, status, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        title = excluded.title, author = excluded.author,
+                        status = excluded.status, created_at = excluded.created_at
+                """, batch)
+                local.execute("""
+                    INSERT INTO sync_state (scope, created_at, id, synced_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(scope) DO UPDATE SET
+                        created_at = excluded.created_at, id = excluded.id,
+                        synced_at = excluded.synced_at
+                """, (scope, newest[0], newest[1], _to_iso(datetime.now(timezone.utc))))
+            copied += len(batch)
+            if len(rows) < SYNC_BATCH:
+                break
+        return copied
+
+    def sync(self, author: Optional[str] = None) -> bool:
+        """Sync feed publik (+ berita author jika diberikan). False jika database tidak bisa dihubungi."""
+        authors = set(self._authors)
+        if author:
+            authors.add(author)
+        with self._sync_lock:
+            try:
+                copied = self._sync_scope("published", "status = 'published'", ())
+                for name in sorted(authors):
+                    copied += self._sync_scope(f"author:{name}", "author = %s", (name,))
+                self.last_sync_ok = True
+                if copied:
+                    print(f"🗄️ News replica synced {copied} row(s)")
+                return True
+            except Exception as e:
+                self.last_sync_ok = False
+                print(f"⚠️ News replica sync failed: {e}")
+                return False
+
+    def invalidate(self) -> None:
+        """Lupakan semua watermark; sync berikutnya menyalin ulang semuanya."""
+        with self._sync_lock:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM sync_state")
+                conn.execute("DELETE FROM news")
+        self.sync_soon()
+
+    # ---------- background ----------
+    def start(self, author: Optional[str] = None, interval: float = SYNC_INTERVAL) -> None:
+        """Mulai sync periodik di daemon thread (idempotent; author ditambahkan ke scope)."""
+        if author:
+            self._authors.add(author)
+        if self._thread is not None and self._thread.is_alive():
+            self.sync_soon()
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,),
+                                        name="news-replica", daemon=True)
+        self._thread.start()
+
+    def sync_soon(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            self.sync()
+            self._wake.wait(interval)
+            self._wake.clear()
+
+
+_instance: Optional[NewsReplica] = None
+_instance_lock = threading.Lock()
+
+
+def get_replica() -> NewsReplica:
+    """Process-wide replica (dibuat saat pertama dipakai)."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = NewsReplica()
+    return _instance
+
+
+def on_news_changed(op: str) -> None:
+    """Hook untuk NOTIFY news: INSERT -> sync incremental, UPDATE/DELETE -> sync ulang."""
+    replica = _instance
+    if replica is None or replica._thread is None or not replica._thread.is_alive():
+        return
+    if op in ("UPDATE", "DELETE"):
+        threading.Thread(target=replica.invalidate, daemon=True).start()
+    else:
+        replica.sync_soon()
@@ -8,12 +8,14 @@ Enhanced Penerbit (Publisher) Dashboard dengan:
 - Beautiful dark theme
 """
 
+import html
 from PyQt5 import QtCore, QtGui, QtWidgets
 from typing import Optional
-from app_db_fixed import (
-    heartbeat, end_session, 
-    create_news, list_my_news, list_published_news
-)
+from app_db import NEWS_TITLE_MAX_LENGTH, SEARCH_MARK_START, SEARCH_MARK_STOP
+from db_async import get_async_db
+from db_notify import get_change_listener
+from news_replica import get_replica
+from write_journal import get_journal
 
 class StatCard(QtWidgets.QFrame):
     """Modern statistics card widget"""
@@ -212,13 +214,117 @@ class ModernTextEditor(QtWidgets.QWidget):
         self.editor.clear()
 
 
+class InfiniteScroll:
+    """
+    Infinite scroll untuk QTableWidget dengan keyset pagination.
+
+    fetch(page_size, cursor, **submit_kwargs) harus memanggil fungsi *_page di
+    AsyncDb (hasil: (rows, next_cursor)); append_rows(rows) menambah baris ke
+    tabel. Halaman berikutnya diambil saat scrollbar mendekati bawah.
+    
+    local_fetch(page_size) (opsional) mengembalikan halaman pertama dari
+    news_replica; ditampilkan langsung saat reload lalu diganti hasil server.
+    """
+    
+    def __init__(self, table, fetch, append_rows, key, page_size=50, local_fetch=None):
+        self.table = table
+        self.fetch = fetch
+        self.local_fetch = local_fetch
+        self.append_rows = append_rows
+        self.key = key
+        self.page_size = page_size
+        self.next_cursor = None
+        self.loading = False
+        self.generation = 0  # naik setiap reload; hasil halaman lama diabaikan
+        table.verticalScrollBar().valueChanged.connect(self._on_scroll)
+    
+    def reload(self):
+        """Kosongkan tabel dan ambil halaman pertama"""
+        self.generation += 1
+        self.next_cursor = None
+        if self.local_fetch and self.table.rowCount() == 0:
+            # Tampilkan salinan lokal dulu; scroll menunggu halaman server
+            rows, _ = self.local_fetch(self.page_size)
+            self.append_rows(rows)
+        self._request(None, reset=True)
+    
+    def load_more(self):
+        if self.loading or not self.next_cursor:
+            return
+        self._request(self.next_cursor, reset=False)
+    
+    def _request(self, cursor, reset):
+        generation = self.generation
+        self.loading = True
+        self.fetch(
+            self.page_size, cursor,
+            on_result=lambda result: self._on_page(generation, result, reset),
+            on_error=lambda e: self._on_error(generation),
+            owner=self.table,
+            key=f"{self.key}:{generation}:{cursor or 'first'}",
+        )
+    
+    def _on_page(self, generation, result, reset):
+        if generation != self.generation:
+            return
+        rows, self.next_cursor = result
+        self.loading = False
+        if reset:
+            self.table.setRowCount(0)
+        self.append_rows(rows)
+        # Halaman pertama belum memenuhi layar -> scrollbar tidak muncul,
+        # jadi ambil halaman berikutnya langsung
+        if self.next_cursor and self.table.verticalScrollBar().maximum() == 0:
+            self.load_more()
+    
+    def suspend(self):
+        """Berhenti memuat halaman (mis. saat tabel dipakai untuk hasil search)"""
+        self.generation += 1
+        self.next_cursor = None
+        self.loading = False
+    
+    def _on_error(self, generation):
+        if generation == self.generation:
+            self.loading = False
+    
+    def _on_scroll(self, value):
+        bar = self.table.verticalScrollBar()
+        if value >= bar.maximum() - bar.pageStep():
+            self.load_more()
+
+
+class _JournalBridge(QtCore.QObject):
+    """Meneruskan jumlah pending write_journal (worker thread) ke GUI thread"""
+    
+    pending_changed = QtCore.pyqtSignal(int)
+
+
 class PenerbitDashboard(QtWidgets.QMainWindow):
     """Modern Penerbit Dashboard"""
     
+    PAGE_SIZE = 50                      # baris per halaman (infinite scroll)
+    POLL_INTERVAL_MS = 30000            # polling saat push tidak aktif
+    PUSH_FALLBACK_INTERVAL_MS = 300000  # safety net saat push aktif
+    SYNC_STATUS_MS = 6000               # lama status "synced" tampil di header
+    SEARCH_DEBOUNCE_MS = 300            # jeda ketik sebelum query search
+    SEARCH_MIN_CHARS = 2
+    SEARCH_LIMIT = 100
+    
     def __init__(self, username: str, session_id: Optional[int] = None):
         super().__init__()
         self.username = username
         self.session_id = session_id
+        self.db = get_async_db()
+        # Salinan lokal news: tampil instan saat startup dan tetap jalan offline
+        self.replica = get_replica()
+        self.replica.start(author=username)
+        # Tulisan (artikel, heartbeat, logout) lewat journal lokal: UI tidak menunggu jaringan
+        self.journal = get_journal()
+        self._pending_writes = 0
+        self._awaiting_sync = {}  # client_key -> (title, publish): konfirmasi setelah sampai server
+        self._listening = False
+        self.hb_timer = None
+        self._search_seq = 0  # hasil search lama (ketikan sebelumnya) diabaikan
         
         self.setWindowTitle(f"Crypto Insight • Penerbit Dashboard")
         self.resize(1400, 900)
@@ -228,16 +334,86 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         self._load_statistics()
         self._load_my_articles()
         
-        # Heartbeat timer
+        # Heartbeat timer (lewat write_journal: di-coalesce, dikirim worker thread)
         if self.session_id:
             self.hb_timer = QtCore.QTimer(self)
-            self.hb_timer.timeout.connect(lambda: heartbeat(self.session_id))
+            self.hb_timer.timeout.connect(lambda: self.journal.heartbeat(self.session_id))
             self.hb_timer.start(20000)
         
-        # Auto-refresh timer
+        # Auto-refresh timer (fallback kalau push LISTEN/NOTIFY tidak aktif)
         self.refresh_timer = QtCore.QTimer(self)
         self.refresh_timer.timeout.connect(self._load_statistics)
-        self.refresh_timer.start(30000)  # Every 30 seconds
+        self.refresh_timer.start(self.POLL_INTERVAL_MS)
+        
+        # Push: refresh hanya saat tabel news benar-benar berubah
+        listener = get_change_listener()
+        listener.news_changed.connect(self._on_news_changed)
+        listener.push_active.connect(self._on_push_status)
+        self._on_push_status(listener.is_active)
+        
+        self._journal_bridge = _JournalBridge(self)
+        self._journal_bridge.pending_changed.connect(self._on_pending_writes)
+        self._pending_callback = self._journal_bridge.pending_changed.emit
+        self.journal.add_listener(self._pending_callback)
+        self._listening = True
+    
+    def _on_push_status(self, active: bool):
+        """Perlambat polling selama push channel tersambung"""
+        self.refresh_timer.setInterval(
+            self.PUSH_FALLBACK_INTERVAL_MS if active else self.POLL_INTERVAL_MS
+        )
+    
+    def _on_pending_writes(self, pending: int):
+        """Update indikator tulisan yang belum sampai ke server"""
+        if pending:
+            self.pending_label.setText(f"⏳ {pending} pending write{'s' if pending != 1 else ''} — will sync when online")
+        self.pending_label.setVisible(pending > 0)
+        if pending < self._pending_writes:
+            # Artikel dari journal sudah masuk server (berguna saat push tidak aktif)
+            self._load_statistics()
+            self._load_my_articles()
+            self._load_feed()
+        self._pending_writes = pending
+        self._check_journal_results()
+    
+    def _check_journal_results(self):
+        """Konfirmasi artikel yang sudah sampai server; laporkan yang ditolak server"""
+        for client_key, (title, publish) in list(self._awaiting_sync.items()):
+            state, _ = self.journal.news_state(client_key)
+            if state == "synced":
+                del self._awaiting_sync[client_key]
+                status = "published" if publish else "saved as draft"
+                self._show_sync_status(f"✅ '{title}' has been {status}", self.SYNC_STATUS_MS)
+        
+        for client_key, payload, error in self.journal.dead_news(self.username):
+            self._awaiting_sync.pop(client_key, None)
+            self.journal.discard_news(client_key)
+            self._show_sync_status(f"❌ '{payload['title']}' was rejected", self.SYNC_STATUS_MS)
+            reply = QtWidgets.QMessageBox.critical(
+                self, "Article Rejected",
+                f"The server rejected article '{payload['title']}':\n{error}\n\n"
+                "Restore it to the editor so you can fix and resend it?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+            )
+            if reply == QtWidgets.QMessageBox.Yes:
+                self.input_title.setText(payload["title"])
+                self.editor.set_text(payload["content"])
+    
+    def _show_sync_status(self, text: str, timeout_ms: int = 0):
+        """Tampilkan status artikel di header; timeout_ms > 0 -> disembunyikan otomatis"""
+        self.sync_label.setText(text)
+        self.sync_label.setVisible(True)
+        if timeout_ms:
+            self._sync_label_timer.start(timeout_ms)
+        else:
+            self._sync_label_timer.stop()
+    
+    def _on_news_changed(self, author: str):
+        """NOTIFY dari trigger news"""
+        if author == self.username:
+            self._load_statistics()
+            self._load_my_articles()
+        self._load_feed()
     
     def _setup_ui(self):
         """Setup UI components"""
@@ -299,6 +475,21 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         layout.addLayout(title_layout)
         layout.addStretch()
         
+        # Tulisan yang masih antre di write_journal (offline / jaringan lambat)
+        self.pending_label = QtWidgets.QLabel()
+        self.pending_label.setObjectName("pendingLabel")
+        self.pending_label.setVisible(False)
+        layout.addWidget(self.pending_label)
+        
+        # Status artikel terakhir (tersimpan / synced) — non-modal, hilang sendiri
+        self.sync_label = QtWidgets.QLabel()
+        self.sync_label.setObjectName("syncLabel")
+        self.sync_label.setVisible(False)
+        layout.addWidget(self.sync_label)
+        self._sync_label_timer = QtCore.QTimer(self)
+        self._sync_label_timer.setSingleShot(True)
+        self._sync_label_timer.timeout.connect(lambda: self.sync_label.setVisible(False))
+        
         # Logout button
         self.btn_logout = QtWidgets.QPushButton("Logout")
         self.btn_logout.setObjectName("logoutBtn")
@@ -349,6 +540,7 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         self.input_title.setObjectName("titleInput")
         self.input_title.setPlaceholderText("Enter your article title...")
         self.input_title.setMinimumHeight(48)
+        self.input_title.setMaxLength(NEWS_TITLE_MAX_LENGTH)
         
         form_layout.addWidget(title_label)
         form_layout.addWidget(self.input_title)
@@ -379,7 +571,7 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         self.btn_clear = QtWidgets.QPushButton("🗑️ Clear")
         self.btn_clear.setObjectName("dangerBtn")
         self.btn_clear.setMinimumHeight(44)
-        self.btn_clear.clicked.connect(self._clear_form)
+        self.btn_clear.clicked.connect(lambda: self._clear_form())
         
         action_row.addWidget(self.btn_save_draft, 1)
         action_row.addWidget(self.btn_publish, 2)
@@ -408,12 +600,21 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         toolbar.addWidget(refresh_btn)
         toolbar.addStretch()
         
-        search_input = QtWidgets.QLineEdit()
-        search_input.setObjectName("searchInput")
-        search_input.setPlaceholderText("🔍 Search articles...")
-        search_input.setFixedWidth(300)
+        self.search_input = QtWidgets.QLineEdit()
+        self.search_input.setObjectName("searchInput")
+        self.search_input.setPlaceholderText("🔍 Search articles...")
+        self.search_input.setFixedWidth(300)
+        self.search_input.setClearButtonEnabled(True)
+        
+        # Debounce: query baru dikirim setelah user berhenti mengetik
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self._run_search)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_input.returnPressed.connect(self._run_search)
         
-        toolbar.addWidget(search_input)
+        toolbar.addWidget(self.search_input)
         
         layout.addLayout(toolbar)
         
@@ -439,6 +640,15 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         
         layout.addWidget(self.table_articles)
         
+        self.articles_pager = InfiniteScroll(
+            self.table_articles,
+            lambda size, cursor, **kw: self.db.list_my_news_page(self.username, size, cursor, **kw),
+            self._append_article_rows,
+            key=f"articles:{self.username}",
+            page_size=self.PAGE_SIZE,
+            local_fetch=lambda size: self.replica.list_my_news_page(self.username, size),
+        )
+        
         return widget
     
     def _create_feed_tab(self):
@@ -472,6 +682,15 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
         
         layout.addWidget(self.table_feed)
         
+        self.feed_pager = InfiniteScroll(
+            self.table_feed,
+            self.db.list_published_news_page,
+            self._append_feed_rows,
+            key="feed",
+            page_size=self.PAGE_SIZE,
+            local_fetch=self.replica.list_published_news_page,
+        )
+        
         # Auto-refresh button
         refresh_btn = QtWidgets.QPushButton("🔄 Refresh Feed")
         refresh_btn.setObjectName("secondaryBtn")
@@ -493,6 +712,14 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
             self.input_title.setFocus()
             return
         
+        if len(title) > NEWS_TITLE_MAX_LENGTH:
+            QtWidgets.QMessageBox.warning(
+                self, "Title Too Long",
+                f"Article titles can be at most {NEWS_TITLE_MAX_LENGTH} characters."
+            )
+            self.input_title.setFocus()
+            return
+        
         if not content:
             QtWidgets.QMessageBox.warning(
                 self, "Missing Content",
@@ -501,60 +728,111 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
             self.editor.editor.setFocus()
             return
         
-        # Save to database
-        success = create_news(self.username, title, content, publish=publish)
-        
-        if success:
-            status = "published" if publish else "saved as draft"
-            QtWidgets.QMessageBox.information(
-                self, "Success",
-                f"Article '{title}' has been {status}!"
-            )
-            
-            self._clear_form()
-            self._load_statistics()
-            self._load_my_articles()
-            
-            if publish:
-                self._load_feed()
+        # Catat di journal lokal (langsung kembali); worker mengirim ke server
+        try:
+            saved = self.journal.create_news(self.username, title, content, publish=publish)
+        except Exception as e:
+            print(f"❌ Error journaling news: {str(e)}")
+            saved = None
+        self._on_article_saved(title, publish, saved)
+    
+    def _on_article_saved(self, title, publish, client_key):
+        """Handle hasil penyimpanan artikel ke journal (GUI thread); konfirmasi server menyusul"""
+        if client_key:
+            # Baru tersimpan lokal; "published" dikonfirmasi _check_journal_results
+            # lewat status header (tanpa dialog), hanya penolakan server yang modal
+            self._awaiting_sync[client_key] = (title, publish)
+            action = "publish" if publish else "save as draft"
+            self._show_sync_status(f"💾 '{title}' saved — will {action} once synced")
+            # Isi form sudah aman di journal: kosongkan tanpa konfirmasi
+            self._clear_form(confirm=False)
         else:
             QtWidgets.QMessageBox.critical(
                 self, "Error",
-                "Failed to save article. Please check database connection."
+                "Failed to save article to the local journal. Please check disk space."
             )
     
-    def _clear_form(self):
+    def _clear_form(self, confirm=True):
         """Clear article form"""
-        reply = QtWidgets.QMessageBox.question(
-            self, "Clear Form",
-            "Are you sure you want to clear the form?\nAll unsaved changes will be lost.",
-            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-        )
+        if confirm:
+            reply = QtWidgets.QMessageBox.question(
+                self, "Clear Form",
+                "Are you sure you want to clear the form?\nAll unsaved changes will be lost.",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+            )
+            if reply != QtWidgets.QMessageBox.Yes:
+                return
         
-        if reply == QtWidgets.QMessageBox.Yes:
-            self.input_title.clear()
-            self.editor.clear()
-            self.input_title.setFocus()
+        self.input_title.clear()
+        self.editor.clear()
+        self.input_title.setFocus()
     
     def _load_statistics(self):
-        """Load and update statistics"""
-        articles = list_my_news(self.username, limit=1000)
-        
-        total = len(articles)
-        published = len([a for a in articles if a[2] == 'published'])
-        draft = len([a for a in articles if a[2] == 'draft'])
-        
-        self.card_total.update_value(total)
-        self.card_published.update_value(published)
-        self.card_draft.update_value(draft)
+        """Load and update statistics (dihitung di server)"""
+        self.db.news_stats(self.username,
+                           on_result=self._apply_statistics,
+                           owner=self, key=f"stats:{self.username}")
+    
+    def _apply_statistics(self, stats):
+        self.card_total.update_value(stats["total"])
+        self.card_published.update_value(stats["published"])
+        self.card_draft.update_value(stats["draft"])
     
     def _load_my_articles(self):
-        """Load my articles into table"""
-        articles = list_my_news(self.username, limit=100)
+        """Load my articles into table (halaman pertama, sisanya saat scroll)"""
+        if self.search_input.text().strip():
+            self._run_search()
+        else:
+            self.articles_pager.reload()
+    
+    def _run_search(self):
+        """Full-text search di artikel sendiri; kosong = kembali ke daftar biasa"""
+        self.search_timer.stop()
+        self._search_seq += 1
+        query = self.search_input.text().strip()
+        if not query:
+            self.articles_pager.reload()
+            return
+        if len(query) < self.SEARCH_MIN_CHARS:
+            return
         
-        self.table_articles.setRowCount(len(articles))
+        self.articles_pager.suspend()
+        seq = self._search_seq
+        self.db.search_news(query, author=self.username, limit=self.SEARCH_LIMIT,
+                            on_result=lambda rows: self._show_search_results(seq, rows),
+                            owner=self)
+    
+    def _show_search_results(self, seq, rows):
+        if seq != self._search_seq:
+            return
+        self.table_articles.setRowCount(0)
+        self._append_article_rows([(aid, title, status, created)
+                                   for aid, title, _, status, created, _, _ in rows])
+        
+        for row, (_, _, _, _, _, title_hl, snippet) in enumerate(rows):
+            label = QtWidgets.QLabel(
+                f"{self._highlight(title_hl)}<br>"
+                f"<span style='color:#6b7280; font-size:11px;'>{self._highlight(snippet)}</span>"
+            )
+            label.setTextFormat(QtCore.Qt.RichText)
+            label.setContentsMargins(8, 4, 8, 4)
+            self.table_articles.item(row, 1).setText("")  # teks di bawah label
+            self.table_articles.setCellWidget(row, 1, label)
+        self.table_articles.resizeRowsToContents()
+    
+    @staticmethod
+    def _highlight(text):
+        """Escape HTML lalu ubah penanda ts_headline jadi highlight"""
+        escaped = html.escape(text or "")
+        return (escaped
+                .replace(html.escape(SEARCH_MARK_START), "<b style='background:#fde68a;'>")
+                .replace(html.escape(SEARCH_MARK_STOP), "</b>"))
+    
+    def _append_article_rows(self, articles):
+        start = self.table_articles.rowCount()
+        self.table_articles.setRowCount(start + len(articles))
         
-        for row, (aid, title, status, created) in enumerate(articles):
+        for row, (aid, title, status, created) in enumerate(articles, start):
             # ID
             id_item = QtWidgets.QTableWidgetItem(str(aid))
             self.table_articles.setItem(row, 0, id_item)
@@ -622,29 +900,33 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
             self.table_articles.setCellWidget(row, 4, actions_widget)
     
     def _load_feed(self):
-        """Load published feed"""
-        articles = list_published_news(limit=100)
-        
-        self.table_feed.setRowCount(len(articles))
+        """Load published feed (halaman pertama, sisanya saat scroll)"""
+        self.feed_pager.reload()
+    
+    def _append_feed_rows(self, articles):
+        start = self.table_feed.rowCount()
+        self.table_feed.setRowCount(start + len(articles))
         
-        for row, (aid, title, author, published) in enumerate(articles):
+        for row, (aid, title, author, published) in enumerate(articles, start):
             self.table_feed.setItem(row, 0, QtWidgets.QTableWidgetItem(str(aid)))
             self.table_feed.setItem(row, 1, QtWidgets.QTableWidgetItem(title))
             self.table_feed.setItem(row, 2, QtWidgets.QTableWidgetItem(author))
             self.table_feed.setItem(row, 3, QtWidgets.QTableWidgetItem(published or "N/A"))
     
     def _logout(self):
-        """Logout and close dashboard"""
+        """Logout and close dashboard (session diakhiri di closeEvent)"""
+        self.close()
+    
+    def _end_session(self):
+        """Akhiri session dan lepas listener journal (sekali saja; juga saat ditutup dengan X)"""
         if self.hb_timer and self.hb_timer.isActive():
             self.hb_timer.stop()
         
-        if self.session_id:
-            try:
-                end_session(self.session_id)
-            except:
-                pass
-        
-        self.close()
+        if self._listening:
+            self.journal.remove_listener(self._pending_callback)
+            self._listening = False
+            if self.session_id:
+                self.journal.end_session(self.session_id)
     
     def _apply_style(self):
         """Apply beautiful dark theme"""
@@ -833,6 +1115,18 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
                 color: white;
             }
             
+            #pendingLabel {
+                color: #f59e0b;
+                font-size: 13px;
+                margin-right: 16px;
+            }
+            
+            #syncLabel {
+                color: #10b981;
+                font-size: 13px;
+                margin-right: 16px;
+            }
+            
             #logoutBtn {
                 background: #ef4444;
                 color: white;
@@ -966,7 +1260,7 @@ class PenerbitDashboard(QtWidgets.QMainWindow):
     
     def closeEvent(self, event):
         """Handle close event"""
-        self._logout()
+        self._end_session()
         event.accept()
 
 
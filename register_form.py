@@ -1,7 +1,7 @@
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QGraphicsDropShadowEffect
 from PyQt5 import QtGui
-from db import user_exists, create_user
+from db import register_user, REGISTER_CREATED, REGISTER_TAKEN
 
 class RegisterDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
@@ -103,20 +103,15 @@ class RegisterDialog(QtWidgets.QDialog):
             return
 
         try:
-            if user_exists(u):
-                self.msg.setText("Username sudah terdaftar.")
-                return
-        except Exception as e:
-            self.msg.setText(f"DB error (cek user): {e}")
-            return
-
-        try:
-            ok = create_user(u, p, "user")
+            result = register_user(u, p, "user")
         except Exception as e:
             self.msg.setText(f"DB error (buat user): {e}")
             return
 
-        if not ok:
+        if result == REGISTER_TAKEN:
+            self.msg.setText("Username sudah terdaftar.")
+            return
+        if result != REGISTER_CREATED:
             self.msg.setText("Gagal membuat user.")
             return
 
@@ -7,6 +7,7 @@ Usage:
     1) Ensure DATABASE_URL environment variable is set (Railway provides it).
     2) Run: python set_admin_pw.py
 This will create or update the user with the given username and password.
+For many users at once use bulk_import_users.py (CSV/JSONL, one COPY + upsert).
 """
 
 import os
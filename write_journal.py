@@ -0,0 +1,324 @@
+# write_journal.py — Write-behind journal (SQLite WAL) untuk create_news, end_session, heartbeat
+"""
+Tulisan ke Postgres dari UI dicatat dulu di write_journal.db (folder aplikasi),
+lalu langsung kembali ke UI. Worker thread me-replay journal ke Postgres lewat
+fungsi app_db yang sama; kalau gagal (jaringan putus, Railway down) entry
+tetap di disk dan dicoba lagi dengan exponential backoff — juga setelah
+aplikasi ditutup dan dibuka lagi.
+
+Entry yang ditolak server (app_db.is_terminal_error: data/constraint error)
+tidak akan pernah berhasil, jadi tidak boleh menahan antrean: entry itu
+ditandai dead (last_error disimpan) dan replay lanjut ke entry berikutnya.
+Artikel yang dead diambil UI lewat dead_news() untuk ditampilkan ke penulis;
+heartbeat/end_session yang dead langsung dibuang (dengan pesan error).
+
+Idempotensi:
+- create_news membawa client_key (UUID) yang disimpan di news.client_key
+  (UNIQUE); replay ulang setelah commit yang "hilang" di jaringan tidak
+  menggandakan artikel.
+- heartbeat di-coalesce: satu entry per session (yang terbaru), dan dibuang
+  kalau sudah lebih tua dari ONLINE_WINDOW_SECONDS (tidak ada artinya lagi).
+- end_session membuang heartbeat yang masih antre untuk session itu dan
+  memakai waktu logout asli, bukan waktu replay.
+
+    journal = get_journal()
+    journal.add_listener(lambda pending: print(pending, "pending"))
+    key = journal.create_news("budi", "Judul", "Isi", publish=True)
+    journal.news_state(key)   # ("pending" | "dead" | "synced", last_error)
+"""
+
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+import app_db
+
+JOURNAL_FILE = "write_journal.db"
+BACKOFF_BASE = 2.0      # detik, retry pertama
+BACKOFF_MAX = 300.0     # detik, batas atas backoff
+IDLE_INTERVAL = 30.0    # detik, worker bangun sendiri walau tidak ada entry baru
+EXIT_DRAIN_SECONDS = 2.0
+
+OP_CREATE_NEWS = "create_news"
+OP_END_SESSION = "end_session"
+OP_HEARTBEAT = "heartbeat"
+
+
+def _backoff(attempts: int) -> float:
+    """Exponential backoff dengan jitter (hindari semua client retry bersamaan)."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class WriteJournal:
+    """Durable local queue of pending Postgres writes, replayed by a background worker."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(app_db._app_dir(), JOURNAL_FILE)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[int], None]] = []
+        self._init_schema()
+
+    # ---------- storage ----------
+    @contextmanager
+    def _connect(self):
+        """Koneksi SQLite singkat: commit jika sukses, selalu ditutup."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            # FULL: entry sudah di disk saat UI diberi tahu "tersimpan"
+            conn.execute("PRAGMA synchronous=FULL;")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                    op          TEXT NOT NULL,
+                    payload     TEXT NOT NULL,          -- JSON kwargs untuk app_db
+                    idem_key    TEXT NOT NULL UNIQUE,
+                    recorded_at REAL NOT NULL,          -- time.time() saat dicatat
+                    attempts    INTEGER NOT NULL DEFAULT 0,
+                    next_try_at REAL NOT NULL DEFAULT 0,
+                    last_error  TEXT,
+                    dead        INTEGER NOT NULL DEFAULT 0  -- 1 = ditolak server, tidak di-replay
+                );
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(journal)")}
+            if "dead" not in columns:
+                conn.execute("ALTER TABLE journal ADD COLUMN dead INTEGER NOT NULL DEFAULT 0")
+            conn.execute("DROP INDEX IF EXISTS idx_journal_due")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_live ON journal(dead, next_try_at, id)")
+
+    def _record(self, conn: sqlite3.Connection, op: str, payload: dict, idem_key: str) -> None:
+        conn.execute("""
+            INSERT INTO journal (op, payload, idem_key, recorded_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(idem_key) DO UPDATE SET
+                payload = excluded.payload, recorded_at = excluded.recorded_at,
+                attempts = 0, next_try_at = 0, last_error = NULL, dead = 0
+        """, (op, json.dumps(payload), idem_key, time.time()))
+
+    def _recorded(self) -> None:
+        self._idle.clear()
+        self._wake.set()
+        self._notify()
+
+    # ---------- public writes (kembali langsung) ----------
+    def create_news(self, author: str, title: str, content: str, publish: bool = True) -> Optional[str]:
+        """Catat artikel baru. Returns client_key, atau None jika input tidak valid."""
+        if not author or not title or not content:
+            return None
+        if len(title) > app_db.NEWS_TITLE_MAX_LENGTH:
+            # Pasti ditolak server; jangan sampai masuk antrean
+            return None
+        client_key = str(uuid.uuid4())
+        payload = {"author": author, "title": title, "content": content,
+                   "publish": bool(publish), "client_key": client_key}
+        with self._connect() as conn:
+            self._record(conn, OP_CREATE_NEWS, payload, f"news:{client_key}")
+        self._recorded()
+        return client_key
+
+    def end_session(self, session_id: int) -> bool:
+        if not session_id:
+            return False
+        ended_at = datetime.now(timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM journal WHERE idem_key = ?", (f"heartbeat:{int(session_id)}",))
+            self._record(conn, OP_END_SESSION,
+                         {"session_id": int(session_id), "ended_at": ended_at},
+                         f"end_session:{int(session_id)}")
+        self._recorded()
+        return True
+
+    def heartbeat(self, session_id: int) -> bool:
+        """Heartbeat terbaru per session menggantikan yang masih antre."""
+        if not session_id:
+            return False
+        with self._connect() as conn:
+            self._record(conn, OP_HEARTBEAT, {"session_id": int(session_id)},
+                         f"heartbeat:{int(session_id)}")
+        self._recorded()
+        return True
+
+    # ---------- status ----------
+    def pending_count(self) -> int:
+        """Jumlah tulisan yang masih menunggu dikirim ke Postgres (heartbeat dan entry dead tidak dihitung)."""
+        try:
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM journal WHERE op != ? AND dead = 0",
+                                    (OP_HEARTBEAT,)).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def news_state(self, client_key: str) -> Tuple[str, Optional[str]]:
+        """("pending" | "dead" | "synced", last_error) untuk artikel dari create_news."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT dead, last_error FROM journal WHERE idem_key = ?",
+                               (f"news:{client_key}",)).fetchone()
+        if row is None:
+            return "synced", None
+        return ("dead" if row[0] else "pending"), row[1]
+
+    def dead_news(self, author: Optional[str] = None) -> List[Tuple[str, dict, str]]:
+        """Artikel yang ditolak server: [(client_key, payload, last_error), ...]."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT payload, last_error FROM journal WHERE op = ? AND dead = 1 ORDER BY id",
+                                (OP_CREATE_NEWS,)).fetchall()
+        result = []
+        for payload, error in rows:
+            data = json.loads(payload)
+            if author is None or data.get("author") == author:
+                result.append((data.get("client_key"), data, error))
+        return result
+
+    def discard_news(self, client_key: str) -> None:
+        """Buang artikel dead setelah penulis diberi tahu."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM journal WHERE idem_key = ? AND dead = 1", (f"news:{client_key}",))
+
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """callback(pending_count) — dipanggil dari thread mana saja."""
+        self._listeners.append(callback)
+        callback(self.pending_count())
+
+    def remove_listener(self, callback: Callable[[int], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self) -> None:
+        if not self._listeners:
+            return
+        pending = self.pending_count()
+        for callback in list(self._listeners):
+            try:
+                callback(pending)
+            except Exception as e:
+                print(f"⚠️ Journal listener failed: {e}")
+
+    # ---------- replay ----------
+    def _apply(self, op: str, payload: dict, recorded_at: float) -> bool:
+        """False = database tidak bisa dihubungi; exception = ditolak / error lain."""
+        if op == OP_CREATE_NEWS:
+            return app_db.create_news(**payload, raise_errors=True)
+        if op == OP_END_SESSION:
+            return app_db.end_session(payload["session_id"], ended_at=payload["ended_at"],
+                                      raise_errors=True)
+        if op == OP_HEARTBEAT:
+            if time.time() - recorded_at > app_db.ONLINE_WINDOW_SECONDS:
+                return True  # basi: user sudah dianggap offline, buang saja
+            return app_db.heartbeat(payload["session_id"], raise_errors=True)
+        print(f"⚠️ Unknown journal op '{op}' dropped")
+        return True
+
+    def replay(self) -> int:
+        """Replay semua entry yang sudah jatuh tempo. Returns jumlah yang berhasil."""
+        with self._connect() as conn:
+            due = conn.execute("""
+                SELECT id, op, payload, recorded_at, attempts FROM journal
+                WHERE dead = 0 AND next_try_at <= ? ORDER BY id
+            """, (time.time(),)).fetchall()
+
+        done = 0
+        for entry_id, op, payload, recorded_at, attempts in due:
+            terminal = False
+            try:
+                ok, error = self._apply(op, json.loads(payload), recorded_at), None
+            except Exception as e:
+                ok, error = False, f"{type(e).__name__}: {e}".strip()
+                terminal = app_db.is_terminal_error(e)
+            with self._connect() as conn:
+                if ok:
+                    conn.execute("DELETE FROM journal WHERE id = ?", (entry_id,))
+                elif terminal and op == OP_CREATE_NEWS:
+                    # Ditolak server: simpan untuk ditunjukkan ke penulis, jangan tahan antrean
+                    print(f"❌ Journal entry {entry_id} ({op}) rejected by server: {error}")
+                    conn.execute("UPDATE journal SET dead = 1, attempts = ?, last_error = ? WHERE id = ?",
+                                 (attempts + 1, error, entry_id))
+                elif terminal:
+                    print(f"❌ Journal entry {entry_id} ({op}) rejected by server, dropped: {error}")
+                    conn.execute("DELETE FROM journal WHERE id = ?", (entry_id,))
+                else:
+                    conn.execute("""
+                        UPDATE journal SET attempts = ?, next_try_at = ?, last_error = ?
+                        WHERE id = ?
+                    """, (attempts + 1, time.time() + _backoff(attempts + 1),
+                          error or "database unreachable", entry_id))
+            if terminal:
+                continue
+            if not ok:
+                # Kemungkinan besar offline: sisanya menunggu giliran berikutnya
+                break
+            done += 1
+        if due:
+            self._notify()
+        return done
+
+    def _next_wait(self) -> float:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_try_at) FROM journal WHERE dead = 0").fetchone()
+        if row[0] is None:
+            return IDLE_INTERVAL
+        return min(IDLE_INTERVAL, max(0.0, row[0] - time.time()))
+
+    # ---------- background ----------
+    def start(self) -> None:
+        """Mulai worker replay (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def drain(self, timeout: float = EXIT_DRAIN_SECONDS) -> bool:
+        """Tunggu sampai tidak ada entry yang jatuh tempo (maks timeout detik). Sisa entry tetap di disk."""
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.replay()
+                wait = self._next_wait()
+            except sqlite3.Error as e:
+                print(f"⚠️ Write journal error: {e}")
+                wait = IDLE_INTERVAL
+            if wait > 0:
+                self._idle.set()
+            self._wake.wait(wait)
+
+
+_instance: Optional[WriteJournal] = None
+_instance_lock = threading.Lock()
+
+
+def get_journal() -> WriteJournal:
+    """Process-wide journal; worker mulai saat pertama dipakai."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = WriteJournal()
+                _instance.start()
+                atexit.register(_instance.drain)
+    return _instance